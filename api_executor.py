@@ -0,0 +1,104 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtWidgets import QMessageBox
+
+from lazy_import import lazy_module
+
+requests = lazy_module("requests")  # Loaded when the first executor is made
+
+API_BASE = "http://localhost:5000"
+
+logger = logging.getLogger(__name__)
+
+
+class ApiExecutor(QObject):
+    """Runs network calls on a small thread pool, never on the GUI thread.
+
+    Every call shares one keep-alive ``requests.Session``. ``submit()`` returns
+    a Future; ``on_success(result)`` / ``on_error(exception)`` are delivered
+    through a queued signal to the thread that created the executor (the GUI
+    thread), so they may touch widgets. A callback that raises is logged and
+    its exception handed to ``on_error`` (or an error dialog), never left to
+    escape the slot, which would abort the process.
+    """
+
+    _done = pyqtSignal(object, object, object)  # (callback, result or exception, on_error)
+
+    def __init__(self, api_base: str = API_BASE, max_workers: int = 4) -> None:
+        super().__init__()
+        self.api_base = api_base
+        self.session = requests.Session()
+        # Room for AssetClient's per-tag fan-out on top of the pool's own workers
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api")
+        self._done.connect(self._dispatch, Qt.ConnectionType.QueuedConnection)
+
+    def url(self, path: str) -> str:
+        return f"{self.api_base}{path}"
+
+    def submit(self, fn: Callable, *args, on_success: Callable | None = None,
+               on_error: Callable | None = None, **kwargs) -> Future:
+        future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda f: self._deliver(f, on_success, on_error))
+        return future
+
+    def call_in_gui(self, callback: Callable, value, on_error: Callable | None = None) -> None:
+        """Queue ``callback(value)`` on the GUI thread, for workers reporting progress"""
+        self._done.emit(callback, value, on_error)
+
+    def _deliver(self, future: Future, on_success: Callable | None, on_error: Callable | None) -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            if on_error is not None:
+                self._done.emit(on_error, error, None)
+            else:
+                logger.warning("API call failed: %s", error)
+        elif on_success is not None:
+            self._done.emit(on_success, future.result(), on_error)
+
+    def _dispatch(self, callback: Callable, value, on_error: Callable | None) -> None:
+        try:
+            callback(value)
+        except Exception as e:
+            logger.exception("Callback %r failed", callback)
+            if on_error is not None:
+                try:
+                    on_error(e)
+                    return
+                except Exception:
+                    logger.exception("Error handler %r failed", on_error)
+            QMessageBox.critical(None, "Error", f"An error occurred: {str(e)}")
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+_shared: ApiExecutor | None = None
+
+
+def api_executor() -> ApiExecutor:
+    """The executor shared by all pages; first call must come from the GUI thread"""
+    global _shared
+    if _shared is None:
+        _shared = ApiExecutor()
+    return _shared
+
+
+def shutdown_api_executor() -> None:
+    """Stop the shared executor, if any page ever started one"""
+    if _shared is not None:
+        _shared.shutdown()
+
+# # Contoh penggunaan
+# api = api_executor()
+# api.submit(lambda: api.session.get(api.url('/api/assets'), timeout=10).json(),
+#            on_success=lambda assets: print(len(assets)),
+#            on_error=lambda e: print(f"Gagal: {e}"))
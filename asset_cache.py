@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class AssetCache:
+    """In-process EPC -> asset cache with TTL and LRU eviction.
+
+    Entries are keyed by EPC with a secondary UID (TID) index, so a tag can
+    be found by either. Only resolved assets are stored; a tag the backend
+    does not know is asked for again next time. Safe to use from the API
+    worker threads.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 120.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._epc_by_uid: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, epc: str, uid: str = "") -> dict | None:
+        with self._lock:
+            if epc not in self._entries and uid:
+                epc = self._epc_by_uid.get(uid, epc)
+            entry = self._entries.get(epc)
+            if entry is not None and time.monotonic() - entry[0] >= self.ttl:
+                self._remove(epc)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(epc)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, asset: dict) -> None:
+        rfid_tag = asset.get('rfidTag', {})
+        epc = rfid_tag.get('epc', '')
+        if not epc:
+            return
+        with self._lock:
+            self._remove(epc)
+            self._entries[epc] = (time.monotonic(), asset)
+            if rfid_tag.get('uid'):
+                self._epc_by_uid[rfid_tag['uid']] = epc
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, epc: str = "", uid: str = "") -> None:
+        """Drop the entry for an EPC and/or UID, e.g. after the asset was written"""
+        with self._lock:
+            if uid in self._epc_by_uid:
+                self._remove(self._epc_by_uid[uid])
+            if epc:
+                self._remove(epc)
+
+    def invalidate_asset(self, asset: dict) -> None:
+        rfid_tag = asset.get('rfidTag') or {}
+        self.invalidate(rfid_tag.get('epc', ''), rfid_tag.get('uid', ''))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._epc_by_uid.clear()
+
+    def _remove(self, epc: str) -> None:
+        entry = self._entries.pop(epc, None)
+        if entry is not None:
+            uid = entry[1].get('rfidTag', {}).get('uid')
+            if uid and self._epc_by_uid.get(uid) == epc:
+                del self._epc_by_uid[uid]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'size': len(self._entries)}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_shared: AssetCache | None = None
+
+
+def asset_cache() -> AssetCache:
+    """The cache shared by the scanning pages and ManagementPage"""
+    global _shared
+    if _shared is None:
+        _shared = AssetCache()
+    return _shared
+
+# # Contoh penggunaan
+# cache = asset_cache()
+# cache.put({'rfidTag': {'epc': 'E2 00 ...', 'uid': 'E2 80 ...'}, 'name': 'Laptop'})
+# print(cache.get('E2 00 ...'), cache.stats())
+# cache.invalidate(uid='E2 80 ...')  # setelah aset diubah
@@ -0,0 +1,244 @@
+import codecs
+import itertools
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, NamedTuple
+
+from lazy_import import lazy_module
+
+requests = lazy_module("requests")
+
+_SEPARATORS = re.compile(r'[\s,]*')
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator:
+    """Decode a top-level JSON array item by item while its bytes arrive"""
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    started = False
+    for chunk in chunks:
+        buffer += text.decode(chunk)
+        position = 0
+        while True:
+            position = _SEPARATORS.match(buffer, position).end()
+            if position >= len(buffer):
+                break
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError("Response bukan JSON array")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # Item continues in the next chunk
+            if end == len(buffer) and not isinstance(item, (dict, list)):
+                break  # A number may still have more digits coming
+            yield item
+            position = end
+        buffer = buffer[position:]
+    raise ValueError("Response terpotong: JSON array tidak ditutup")
+
+
+class AssetChanges(NamedTuple):
+    assets: list[dict]
+    deleted: list[str]  # Asset ids removed since the watermark
+    next_cursor: str | None
+    snapshot: bool  # True when the backend sent its whole list instead of a delta
+
+
+class AssetClient:
+    """Resolves scanned tags to assets, a whole scan batch per call.
+
+    ``lookup()`` sends every EPC/UID pair in one POST to
+    ``/api/assets/lookup``. Backends without that endpoint (404/405) are
+    remembered and served by concurrent per-tag GETs instead, each doing the
+    usual UID-then-EPC search. With a ``cache``, tags it already knows are
+    answered locally and only the rest go to the backend. A synced
+    ``replica`` is asked first, and when the backend cannot be reached the
+    tags it does not have (or has only stale) come back from it, or as
+    None, instead of failing the scan.
+    """
+
+    def __init__(self, api_base="http://localhost:5000", max_workers=8, timeout=5, session=None, cache=None,
+                 replica=None):
+        self.api_base = api_base
+        self.cache = cache
+        self.replica = replica
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.bulk_supported = None  # None until the first lookup finds out
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def lookup(self, tags: list[dict]) -> dict[str, dict | None]:
+        """Map each tag's EPC to its asset, or None when the backend has none"""
+        if not tags:
+            return {}
+        found = {}
+        missing = tags
+        for store in (self.replica, self.cache):
+            if store is not None and missing:
+                missing = self._answer_from(store, missing, found)
+        if not missing:
+            return found
+
+        try:
+            resolved = self._resolve(missing)
+        except (requests.ConnectionError, requests.Timeout):
+            if self.replica is None or not self.replica.ready:
+                raise
+            # Offline: the replica holds every asset as of its last sync; one written
+            # since (stale) is still better than none. An HTTP error is not offline.
+            found.update((tag['epc'], self.replica.get(tag['epc'], tag.get('uid', ''), stale=True))
+                         for tag in missing)
+            return found
+        for asset in resolved.values():
+            if asset is not None:
+                for store in (self.replica, self.cache):
+                    if store is not None:
+                        store.put(asset)
+        found.update(resolved)
+        return found
+
+    @staticmethod
+    def _answer_from(store, tags: list[dict], found: dict) -> list[dict]:
+        missing = []
+        for tag in tags:
+            asset = store.get(tag['epc'], tag.get('uid', ''))
+            if asset is None:
+                missing.append(tag)
+            else:
+                found[tag['epc']] = asset
+        return missing
+
+    def _resolve(self, tags: list[dict]) -> dict[str, dict | None]:
+        if self.bulk_supported is not False:
+            assets = self._lookup_bulk(tags)
+            if assets is not None:
+                return assets
+        return self._lookup_each(tags)
+
+    def _lookup_bulk(self, tags: list[dict]) -> dict[str, dict | None] | None:
+        response = self.session.post(
+            f"{self.api_base}/api/assets/lookup",
+            json={"tags": [{"epc": tag['epc'], "uid": tag.get('uid', '')} for tag in tags]},
+            timeout=self.timeout
+        )
+        if response.status_code in (404, 405):
+            self.bulk_supported = False
+            return None
+        response.raise_for_status()
+        self.bulk_supported = True
+
+        data = response.json()
+        found = data.get('assets', []) if isinstance(data, dict) else data
+        by_epc = {asset.get('rfidTag', {}).get('epc', ''): asset for asset in found}
+        return {tag['epc']: by_epc.get(tag['epc']) for tag in tags}
+
+    def _lookup_each(self, tags: list[dict]) -> dict[str, dict | None]:
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tags))) as executor:
+            assets = executor.map(lambda tag: self.lookup_one(tag['epc'], tag.get('uid', '')), tags)
+            return {tag['epc']: asset for tag, asset in zip(tags, assets)}
+
+    def lookup_one(self, epc: str, uid: str = "") -> dict | None:
+        """Search by UID (TID) first since it's more unique, then by EPC alone"""
+        if uid:
+            response = self.session.get(f"{self.api_base}/api/assets", params={'uid': uid}, timeout=self.timeout)
+            if response.status_code == 200:
+                assets = response.json()
+                if isinstance(assets, list):
+                    for asset in assets:
+                        if asset.get('rfidTag', {}).get('epc', '') == epc:
+                            return asset
+
+        response = self.session.get(f"{self.api_base}/api/assets", params={'epc': epc}, timeout=self.timeout)
+        response.raise_for_status()
+        assets = response.json()
+        if isinstance(assets, list) and len(assets) > 0:
+            return assets[0]
+        return None
+
+    def iter_assets(self, cursor: str | None = None, limit: int = 200,
+                    max_chunk: int = 200) -> Iterator[tuple[list[dict], str | None]]:
+        """Yield ``(assets, next_cursor)`` chunks of the asset list as they arrive.
+
+        Sends ``limit``/``cursor``; a backend that pages answers
+        ``{"data": [...], "nextCursor": ...}`` and that one page is read. A
+        plain JSON array (no paging) is decoded while it streams in, first
+        ``limit`` assets at once and then in chunks doubling up to
+        ``max_chunk``; its ``next_cursor`` is None. ``timeout`` applies per
+        read, so a long list no longer times out as a whole.
+        """
+        params = {'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        with self.session.get(f"{self.api_base}/api/assets", params=params,
+                              timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            chunks = response.iter_content(chunk_size=65536)
+            first = b''
+            for first in chunks:
+                if first.strip():
+                    break
+            if not first.strip():
+                raise ValueError("Response kosong dari server")
+
+            if first.lstrip()[:1] != b'[':
+                data = json.loads(first + b''.join(chunks))
+                if isinstance(data, dict) and 'data' in data:
+                    yield data['data'], data.get('nextCursor')
+                else:
+                    yield [data], None
+                return
+
+            batch = []
+            size = limit
+            for asset in iter_json_array(itertools.chain([first], chunks)):
+                batch.append(asset)
+                if len(batch) >= size:
+                    yield batch, None
+                    batch = []
+                    size = max(size, min(size * 2, max_chunk))
+            if batch:
+                yield batch, None
+
+    def changes(self, since: str | None = None, cursor: str | None = None, limit: int = 1000) -> AssetChanges:
+        """One page of assets changed since the ``since`` watermark (all assets without it).
+
+        Sends ``updatedSince``/``limit``/``cursor``. A backend that pages
+        answers ``{"data": [...], "deleted": [...], "nextCursor": ...}``; one
+        that answers a plain array sent its whole list, flagged ``snapshot``.
+        """
+        params = {'limit': limit}
+        if since:
+            params['updatedSince'] = since
+        if cursor:
+            params['cursor'] = cursor
+        response = self.session.get(f"{self.api_base}/api/assets", params=params, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        if isinstance(data, list):
+            return AssetChanges(data, [], None, True)
+        return AssetChanges(data.get('data', []), data.get('deleted', []), data.get('nextCursor'),
+                            False)
+
+    def close(self):
+        self.session.close()
+
+# # Contoh penggunaan
+# client = AssetClient()
+# assets = client.lookup([{'epc': 'E2 00 ...', 'uid': 'E2 80 11 70 ...'}])
+# for epc, asset in assets.items():
+#     print(epc, asset['name'] if asset else "tidak ditemukan")
+# for page, next_cursor in client.iter_assets(limit=100):
+#     print(len(page), next_cursor)
@@ -0,0 +1,313 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from asset_client import AssetClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPLICA_PATH = os.path.join(os.path.expanduser("~"), ".asset-management", "assets.sqlite3")
+
+# Searchable columns; TrackingPage's "category" is the backend's kategori
+SEARCH_COLUMNS = {"name": "name", "category": "kategori", "kategori": "kategori",
+                  "location": "location", "status": "status"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    id TEXT PRIMARY KEY,
+    epc TEXT,
+    uid TEXT,
+    name TEXT COLLATE NOCASE,
+    kategori TEXT COLLATE NOCASE,
+    location TEXT COLLATE NOCASE,
+    status TEXT COLLATE NOCASE,
+    updated TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assets_epc ON assets (epc);
+CREATE INDEX IF NOT EXISTS assets_uid ON assets (uid);
+CREATE INDEX IF NOT EXISTS assets_name ON assets (name);
+CREATE INDEX IF NOT EXISTS assets_kategori ON assets (kategori);
+CREATE INDEX IF NOT EXISTS assets_location ON assets (location);
+CREATE INDEX IF NOT EXISTS assets_status ON assets (status);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def asset_version(asset: dict) -> str:
+    """The watermark field of an asset: updatedAt, the field ``updatedSince`` is matched against"""
+    return asset.get('updatedAt') or ''
+
+
+def _row(asset: dict) -> tuple:
+    rfid_tag = asset.get('rfidTag') or {}
+    return (asset.get('_id') or rfid_tag.get('epc', ''), rfid_tag.get('epc', ''), rfid_tag.get('uid', ''),
+            asset.get('name', ''), asset.get('kategori', ''), asset.get('location', ''), asset.get('status', ''),
+            asset_version(asset), json.dumps(asset))
+
+
+class AssetReplica:
+    """Local SQLite copy of the asset collection, indexed for the lookups the pages do.
+
+    EPC, UID (TID), name, kategori, location and status have an index; the
+    full asset is kept as JSON. ``watermark`` is the newest ``updatedAt``
+    the last sync saw, which the next delta sync asks the backend from;
+    other date fields are never mixed in, since they need not share its
+    format. ``ready`` is False until a first full sync completed, so
+    callers know whether a miss means "not an asset". ``invalidate()``
+    marks rows stale instead of dropping them: ``get()`` skips them so the
+    asset is fetched again, but they still answer searches, stock takes and
+    offline lookups until a sync or ``put()`` replaces them.
+    One connection is shared behind a lock; reads take microseconds.
+    """
+
+    def __init__(self, path: str = DEFAULT_REPLICA_PATH) -> None:
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._stale: set[str] = set()  # Row ids written since they were stored
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+
+    def _meta(self, key: str) -> str | None:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def watermark(self) -> str:
+        return self._meta('watermark') or ''
+
+    @property
+    def ready(self) -> bool:
+        return self._meta('synced_at') is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+
+    def get(self, epc: str, uid: str = "", stale: bool = False) -> dict | None:
+        """The asset with this EPC (or UID); a stale one only with ``stale``"""
+        with self._lock:
+            row = self._db.execute("SELECT id, doc FROM assets WHERE epc = ?", (epc,)).fetchone()
+            if row is None and uid:
+                row = self._db.execute("SELECT id, doc FROM assets WHERE uid = ?", (uid,)).fetchone()
+            if row is not None and row[0] in self._stale and not stale:
+                return None
+        return json.loads(row[1]) if row else None
+
+    def search(self, field: str, value: str, exact: bool = False) -> list[dict]:
+        """Assets whose field contains ``value`` (or equals it), ignoring case"""
+        column = SEARCH_COLUMNS[field]
+        if exact:
+            query, parameter = f"SELECT doc FROM assets WHERE {column} = ?", value
+        else:
+            escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query, parameter = f"SELECT doc FROM assets WHERE {column} LIKE ? ESCAPE '\\'", f"%{escaped}%"
+        with self._lock:
+            rows = self._db.execute(query, (parameter,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def tag_locations(self) -> list[tuple[str, str, str]]:
+        """(EPC, location, name) of every asset, for a stock take"""
+        with self._lock:
+            return self._db.execute("SELECT epc, location, name FROM assets WHERE epc != ''").fetchall()
+
+    def locations(self) -> list[str]:
+        with self._lock:
+            rows = self._db.execute("SELECT DISTINCT location FROM assets WHERE location != '' "
+                                    "ORDER BY location").fetchall()
+        return [row[0] for row in rows]
+
+    def apply(self, changed: list[dict], deleted: list[str] = (), watermark: str | None = None,
+              replace: bool = False) -> None:
+        """Write one sync result in a single transaction.
+
+        ``replace`` makes ``changed`` the whole collection (full sync);
+        ``deleted`` are asset ids. The watermark only moves forward.
+        """
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                if replace:
+                    self._db.execute("DELETE FROM assets")
+                    self._stale.clear()
+                self._db.executemany("INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                     (_row(asset) for asset in changed))
+                self._db.executemany("DELETE FROM assets WHERE id = ?", ((id_,) for id_ in deleted))
+                if watermark is not None:
+                    self._db.execute("INSERT INTO meta VALUES ('watermark', ?) ON CONFLICT(key) DO UPDATE "
+                                     "SET value = max(value, excluded.value)", (watermark,))
+                if replace or self._db.execute("SELECT 1 FROM meta WHERE key = 'synced_at'").fetchone():
+                    self._db.execute("INSERT OR REPLACE INTO meta VALUES ('synced_at', ?)", (str(time.time()),))
+                self._db.execute("COMMIT")
+                self._stale.difference_update(_row(asset)[0] for asset in changed)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def put(self, asset: dict) -> None:
+        """Store an asset the backend just returned.
+
+        Watermark and ``synced_at`` are left to the sync: one fresh asset
+        says nothing about how current the rest of the replica is.
+        """
+        if (asset.get('rfidTag') or {}).get('epc') or asset.get('_id'):
+            row = _row(asset)
+            with self._lock:
+                self._db.execute("INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+                self._stale.discard(row[0])
+
+    def invalidate(self, epc: str = "", uid: str = "") -> None:
+        """Mark a row stale after the asset was written, until a lookup or sync brings the new version"""
+        with self._lock:
+            for column, value in (("epc", epc), ("uid", uid)):
+                if value:
+                    self._stale.update(row[0] for row in self._db.execute(
+                        f"SELECT id FROM assets WHERE {column} = ?", (value,)))
+
+    def invalidate_asset(self, asset: dict) -> None:
+        rfid_tag = asset.get('rfidTag') or {}
+        self.invalidate(rfid_tag.get('epc', ''), rfid_tag.get('uid', ''))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class AssetSync:
+    """Keeps an ``AssetReplica`` up to date from the backend in a background thread.
+
+    The first sync (or one without a watermark) pulls the whole list; later
+    ones ask only for assets changed since the watermark, plus deleted ids
+    where the backend reports them. A backend that ignores the delta query
+    and returns the plain list is treated as a full sync. Every
+    ``full_every`` syncs a full one reconciles deletions the deltas could
+    not see. Errors are kept in ``last_error``; the replica keeps serving.
+    """
+
+    def __init__(self, replica: AssetReplica, client: AssetClient, interval: float = 30.0,
+                 page_size: int = 1000, full_every: int = 120) -> None:
+        self.replica = replica
+        self.client = client
+        self.interval = interval
+        self.page_size = page_size
+        self.full_every = full_every
+        self.last_error: Exception | None = None
+        self.last_sync: dict = {}
+        self._syncs = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def full_sync(self) -> int:
+        """Replace the replica with the backend's list; returns the asset count"""
+        start = time.perf_counter()
+        assets = []
+        cursor = None
+        while True:
+            chunk, _, cursor, _ = self.client.changes(cursor=cursor, limit=self.page_size)
+            assets.extend(chunk)
+            if cursor is None:
+                break
+        self.replica.apply(assets, watermark=max(map(asset_version, assets), default=''), replace=True)
+        self.last_sync = {'kind': 'full', 'assets': len(assets), 'deleted': 0,
+                          'seconds': time.perf_counter() - start}
+        return len(assets)
+
+    def delta_sync(self) -> int:
+        """Apply what changed since the watermark; returns the number of changed and deleted assets"""
+        since = self.replica.watermark
+        if not since or not self.replica.ready:
+            return self.full_sync()
+        start = time.perf_counter()
+        changed, deleted = [], []
+        cursor = None
+        while True:
+            chunk, gone, cursor, snapshot = self.client.changes(since=since, cursor=cursor, limit=self.page_size)
+            if snapshot:  # Backend without delta support sent everything
+                self.replica.apply(chunk, watermark=max(map(asset_version, chunk), default=''), replace=True)
+                self.last_sync = {'kind': 'full', 'assets': len(chunk), 'deleted': 0,
+                                  'seconds': time.perf_counter() - start}
+                return len(chunk)
+            changed.extend(chunk)
+            deleted.extend(gone)
+            if cursor is None:
+                break
+        self.replica.apply(changed, deleted, watermark=max(map(asset_version, changed), default=since))
+        self.last_sync = {'kind': 'delta', 'assets': len(changed), 'deleted': len(deleted),
+                          'seconds': time.perf_counter() - start}
+        return len(changed) + len(deleted)
+
+    def sync(self) -> int:
+        self._syncs += 1
+        if self.full_every and self._syncs % self.full_every == 0:
+            return self.full_sync()
+        return self.delta_sync()
+
+    def sync_soon(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="asset-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sync()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e  # Offline: keep serving what we have
+                logger.warning("Asset sync failed: %s", e)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+_shared: AssetReplica | None = None
+_shared_sync: AssetSync | None = None
+
+
+def asset_replica() -> AssetReplica:
+    """The replica shared by all pages"""
+    global _shared
+    if _shared is None:
+        _shared = AssetReplica()
+    return _shared
+
+
+def start_asset_sync(api_base: str, session=None) -> AssetSync:
+    """Start keeping the shared replica in sync with the backend at ``api_base``"""
+    global _shared_sync
+    if _shared_sync is None:
+        _shared_sync = AssetSync(asset_replica(), AssetClient(api_base, session=session))
+    _shared_sync.start()
+    return _shared_sync
+
+
+def stop_asset_sync() -> None:
+    if _shared_sync is not None:
+        _shared_sync.stop()
+
+# # Contoh penggunaan
+# replica = AssetReplica("assets.sqlite3")
+# sync = AssetSync(replica, AssetClient("http://localhost:5000"))
+# sync.full_sync()           # sekali, seluruh koleksi
+# sync.delta_sync()          # berikutnya hanya yang berubah sejak watermark
+# print(replica.get("E2 00 ..."), replica.search("category", "elektronik"))
+# sync.start()               # sinkronisasi di background setiap 30 detik
@@ -0,0 +1,280 @@
+import base64
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+from utils import hex_readable
+
+
+# Transaction endpoints and the status they give the assets in the request
+TRANSACTION_STATUS = {
+    "/api/borrowing/borrow": "borrowed",
+    "/api/borrowing/return": "available",
+    "/api/checkout/checkout": "sold",
+}
+
+def jwt_token(claims: dict) -> str:
+    """Unsigned JWT-shaped token carrying ``claims``, like the backend's for the client's purposes"""
+    encode = lambda part: base64.urlsafe_b64encode(json.dumps(part).encode()).rstrip(b"=").decode()
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode(claims)}.signature"
+
+
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def timestamp(moment: datetime | None = None) -> str:
+    """ISO 8601 in UTC with milliseconds, as the backend writes updatedAt"""
+    moment = moment or datetime.now(timezone.utc)
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def make_assets(count: int, seed: int = 0, status: str = "available", locations: int = 10) -> list[dict]:
+    """Assets shaped like the backend's, with random EPCs and UIDs (TID), spread over ``locations`` rooms"""
+    rng = random.Random(seed)
+    return [{
+        "_id": f"{index:024x}",
+        "name": f"Asset {index}",
+        "status": status,
+        "location": f"Ruang {index % locations + 1}",
+        "price": rng.randrange(1, 100) * 1000,
+        "rfidTag": {
+            "epc": hex_readable(rng.randbytes(12)),
+            "uid": hex_readable(b"\xE2\x80\x11\x70" + rng.randbytes(4)),
+        },
+        "updatedAt": timestamp(_EPOCH + timedelta(seconds=index)),
+    } for index in range(count)]
+
+
+class AssetStubServer:
+    """Local stand-in for the asset API on an ephemeral port.
+
+    Serves ``GET /api/assets?uid=...|epc=...``, the full list, or with
+    ``paginate`` set and a ``limit`` given, one page as ``{"data": [...],
+    "nextCursor": ...}``. With ``delta`` set, ``updatedSince`` pages only
+    the assets whose ``updatedAt`` is at or after it, in that order, plus the
+    ids deleted since then under ``"deleted"``. When ``bulk`` is set it also
+    serves ``POST /api/assets/lookup``; without it the lookup answers 404
+    like an older backend. ``POST /api/assets`` and ``PUT``/``DELETE
+    /api/assets/<uid>`` write to the in-memory list and stamp ``updatedAt``;
+    so do the borrow, return and checkout endpoints, which answer a repeated
+    ``Idempotency-Key`` with the first reply instead of applying it again.
+    ``POST /api/auth/login`` checks ``passwords`` (any password when None),
+    sleeps ``login_cost`` for the password hash and answers a JWT-shaped
+    token that expires after ``token_ttl`` seconds, with a refresh token;
+    ``POST /api/auth/refresh`` trades that for a new token and refresh
+    token (the old one stops working).
+    ``latency`` is added to every request to emulate the database round
+    trip.
+    """
+
+    def __init__(self, assets: list[dict], bulk: bool = True, latency: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0, paginate: bool = True, delta: bool = True,
+                 passwords: dict[str, str] | None = None, login_cost: float = 0.0, token_ttl: float = 3600) -> None:
+        self.assets = assets
+        self.bulk = bulk
+        self.paginate = paginate
+        self.delta = delta
+        self.deleted: list[tuple[str, str]] = []  # (asset id, deletedAt)
+        self.transactions: dict[str, tuple[int, dict]] = {}  # Idempotency-Key -> first reply
+        self.transactions_applied = 0
+        self.passwords = passwords  # email -> password; None accepts any non-empty password
+        self.login_cost = login_cost  # bcrypt time of a login, on top of ``latency``
+        self.token_ttl = token_ttl
+        self.logins = 0
+        self.refreshes = 0
+        self.refresh_tokens: dict[str, str] = {}  # Refresh token -> email
+        self.latency = latency
+        self.requests_handled = 0
+        self._next_id = len(assets)
+        self._by_epc = {asset["rfidTag"]["epc"]: asset for asset in assets}
+        self._by_uid = {asset["rfidTag"]["uid"]: asset for asset in assets}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real backend
+            disable_nagle_algorithm = True  # Headers and body go out as separate writes
+
+            def log_message(self, format, *args):
+                pass
+
+            def _body(self):
+                return json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+            def _reply(self, status: int, body) -> None:
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                stub._handled()
+                url = urlparse(self.path)
+                if url.path != "/api/assets":
+                    return self._reply(404, {"message": "Not found"})
+                query = parse_qs(url.query)
+                if "uid" in query:
+                    asset = stub._by_uid.get(query["uid"][0])
+                elif "epc" in query:
+                    asset = stub._by_epc.get(query["epc"][0])
+                elif stub.delta and "updatedSince" in query:
+                    since = query["updatedSince"][0]
+                    with stub._lock:
+                        changed = sorted((asset for asset in stub.assets if asset.get("updatedAt", "") >= since),
+                                         key=lambda asset: asset["updatedAt"])
+                        deleted = [id_ for id_, at in stub.deleted if at >= since]
+                    offset = int(query.get("cursor", ["0"])[0])
+                    end = offset + int(query.get("limit", [len(changed)])[0])
+                    return self._reply(200, {"data": changed[offset:end],
+                                             "deleted": deleted if offset == 0 else [],
+                                             "nextCursor": str(end) if end < len(changed) else None})
+                elif stub.paginate and "limit" in query:
+                    offset = int(query.get("cursor", ["0"])[0])
+                    end = offset + int(query["limit"][0])
+                    return self._reply(200, {"data": stub.assets[offset:end],
+                                             "nextCursor": str(end) if end < len(stub.assets) else None})
+                else:
+                    return self._reply(200, stub.assets)
+                self._reply(200, [asset] if asset else [])
+
+            def do_POST(self):
+                stub._handled()
+                body = self._body()
+                if self.path == "/api/assets":
+                    with stub._lock:
+                        stub._add(dict(body, _id=f"{stub._next_id:024x}", updatedAt=timestamp()))
+                        stub._next_id += 1
+                    return self._reply(201, {"message": "Asset created"})
+                if self.path == "/api/auth/login":
+                    return self._login(body)
+                if self.path == "/api/auth/refresh":
+                    return self._refresh(body)
+                if self.path in TRANSACTION_STATUS:
+                    return self._transaction(body)
+                if self.path != "/api/assets/lookup" or not stub.bulk:
+                    return self._reply(404, {"message": "Not found"})
+                found = []
+                for tag in body.get("tags", []):
+                    asset = stub._by_epc.get(tag.get("epc")) or stub._by_uid.get(tag.get("uid"))
+                    if asset:
+                        found.append(asset)
+                self._reply(200, {"assets": found})
+
+            def _login(self, body):
+                email, password = body.get("email", ""), body.get("password", "")
+                time.sleep(stub.login_cost)
+                known = stub.passwords.get(email) if stub.passwords is not None else password
+                if not password or password != known:
+                    return self._reply(401, {"message": "Invalid email or password"})
+                with stub._lock:
+                    stub.logins += 1
+                self._reply(200, {**self._tokens(email), "username": email.split("@")[0], "role": "user",
+                                  "userId": email})
+
+            def _refresh(self, body):
+                with stub._lock:
+                    email = stub.refresh_tokens.pop(body.get("refreshToken"), None)
+                    if email is not None:
+                        stub.refreshes += 1
+                if email is None:
+                    return self._reply(401, {"message": "Invalid refresh token"})
+                self._reply(200, self._tokens(email))
+
+            def _tokens(self, email):
+                refresh_token = uuid.uuid4().hex
+                with stub._lock:
+                    stub.refresh_tokens[refresh_token] = email
+                return {"token": jwt_token({"sub": email, "exp": int(time.time() + stub.token_ttl)}),
+                        "refreshToken": refresh_token}
+
+            def _transaction(self, body):
+                key = self.headers.get("Idempotency-Key")
+                with stub._lock:
+                    if key in stub.transactions:  # Retry of one already applied: same answer
+                        return self._reply(*stub.transactions[key])
+                    items = []
+                    for tag in body.get("rfidTags", []):
+                        asset = stub._by_epc.get(tag.get("epc")) or stub._by_uid.get(tag.get("uid"))
+                        if asset is not None:
+                            asset.update(status=TRANSACTION_STATUS[self.path], updatedAt=timestamp())
+                            items.append({"name": asset["name"], "price": asset.get("price", 0)})
+                    if not items:
+                        reply = (400, {"message": "No known assets in request"})
+                    else:
+                        stub.transactions_applied += 1
+                        reply = (200, {"items": items, "totalAmount": sum(item["price"] for item in items)})
+                    if key:
+                        stub.transactions[key] = reply
+                self._reply(*reply)
+
+            def do_PUT(self):
+                stub._handled()
+                body = self._body()
+                with stub._lock:
+                    asset = stub._remove(unquote(self.path.rsplit("/", 1)[-1]))
+                    if asset is None:
+                        return self._reply(404, {"message": "Asset not found"})
+                    asset.update(body, updatedAt=timestamp())
+                    stub._add(asset)
+                self._reply(200, {"message": "Asset updated", "data": asset})
+
+            def do_DELETE(self):
+                stub._handled()
+                with stub._lock:
+                    asset = stub._remove(unquote(self.path.rsplit("/", 1)[-1]))
+                    if asset is not None:
+                        stub.deleted.append((asset["_id"], timestamp()))
+                if asset is None:
+                    return self._reply(404, {"message": "Asset not found"})
+                self._reply(200, {"message": "Asset deleted"})
+
+        return Handler
+
+    def _add(self, asset: dict) -> None:
+        self.assets.append(asset)
+        self._by_epc[asset["rfidTag"]["epc"]] = asset
+        self._by_uid[asset["rfidTag"]["uid"]] = asset
+
+    def _remove(self, uid: str) -> dict | None:
+        asset = self._by_uid.pop(uid, None)
+        if asset is not None:
+            self._by_epc.pop(asset["rfidTag"]["epc"], None)
+            self.assets.remove(asset)
+        return asset
+
+    def _handled(self) -> None:
+        with self._lock:
+            self.requests_handled += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def start(self) -> str:
+        """Serve in a background thread and return the API base URL"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="asset-stub", daemon=True)
+        self._thread.start()
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+# # Contoh penggunaan
+# server = AssetStubServer(make_assets(100), bulk=False)
+# client = AssetClient(server.start())
+# print(client.lookup([{'epc': server.assets[0]['rfidTag']['epc'], 'uid': ''}]))
+# server.stop()
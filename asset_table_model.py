@@ -0,0 +1,297 @@
+from typing import Callable
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+
+ASSET_COLUMNS = [
+    "ID", "Nama", "RFID UID", "Kategori",
+    "Status", "Jumlah", "Unit", "Harga",
+    "Tanggal Pembelian", "Lokasi", "Masa Garansi"
+]
+ID_COLUMN = 0
+NAME_COLUMN = 1
+UID_COLUMN = 2
+QUANTITY_COLUMN = 5
+PRICE_COLUMN = 7
+
+
+def _text(value) -> str:
+    # Null fields from the backend show as empty cells, and every cell (and sort key) is a str
+    return "" if value is None else str(value)
+
+
+def amount(value) -> float:
+    """A price or total from the backend as a number; 0 when missing or not a number"""
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def asset_price(asset: dict) -> float:
+    return amount(asset.get('price'))
+
+
+def asset_row(asset: dict) -> tuple:
+    """Display values of one asset, in ASSET_COLUMNS order"""
+    masa_garansi = asset.get('masaGaransi') or {}
+    garansi_text = ""
+    if masa_garansi:
+        garansi_text = f"{_text(masa_garansi.get('from'))} s/d {_text(masa_garansi.get('to'))}"
+    jumlah = asset.get('jumlah', 1)
+    unit = asset.get('unit', 'pcs')
+    return (
+        _text(asset.get('_id')),
+        _text(asset.get('name')),
+        _text((asset.get('rfidTag') or {}).get('uid')),
+        _text(asset.get('kategori')),
+        _text(asset.get('status')),
+        _text(1 if jumlah is None else jumlah),
+        _text('pcs' if unit is None else unit),
+        f"Rp {asset_price(asset):,.0f}",
+        _text(asset.get('tanggalPembelian')),
+        _text(asset.get('location')),
+        garansi_text,
+    )
+
+
+def _quantity(asset: dict) -> int:
+    try:
+        return int(asset.get('jumlah', 1))
+    except (TypeError, ValueError):
+        return 0
+
+
+class AssetTableModel(QAbstractTableModel):
+    """Assets as a column store: one list per column instead of one item per cell.
+
+    Rows are addressed by the asset ``_id`` through a dict index, so a single
+    create, update or delete patches one row and leaves the rest (and the
+    view's selection) alone. Sorting is done here on plain key lists, since a
+    proxy sort would call ``data()`` from C++ for every comparison; prices and
+    quantities sort numerically. Rows patched in later are placed at their
+    sorted position.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._columns: list[list[str]] = [[] for _ in ASSET_COLUMNS]
+        self._prices: list[float] = []
+        self._quantities: list[int] = []
+        self._search: list[str] = []  # Lower-cased row text for the filter
+        self._row_by_id: dict[str, int] = {}
+        self._sort_column = -1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+        self._fetch_more: Callable[[], None] | None = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._prices)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(ASSET_COLUMNS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self._columns[index.column()][index.row()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return ASSET_COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def set_fetch_more(self, fetch_more: Callable[[], None] | None) -> None:
+        """Let the view pull the next page when it scrolls to the end (None: nothing left)"""
+        self._fetch_more = fetch_more
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetch_more is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        # One call per page; the loader re-arms it when the page has arrived
+        fetch_more, self._fetch_more = self._fetch_more, None
+        if fetch_more is not None and not parent.isValid():
+            fetch_more()
+
+    def value(self, row: int, column: int) -> str:
+        return self._columns[column][row]
+
+    def search_text(self, row: int) -> str:
+        return self._search[row]
+
+    def row_of(self, asset_id: str) -> int | None:
+        return self._row_by_id.get(asset_id)
+
+    def _lists(self) -> list[list]:
+        return self._columns + [self._prices, self._quantities, self._search]
+
+    def _keys(self) -> list:
+        if self._sort_column == PRICE_COLUMN:
+            return self._prices
+        if self._sort_column == QUANTITY_COLUMN:
+            return self._quantities
+        return self._columns[self._sort_column]
+
+    def _reindex(self, start: int = 0, end: int | None = None) -> None:
+        ids = self._columns[ID_COLUMN]
+        for row in range(start, len(ids) if end is None else end):
+            self._row_by_id[ids[row]] = row
+
+    def _sorted_order(self) -> list[int]:
+        keys = self._keys()
+        return sorted(range(len(keys)), key=keys.__getitem__,
+                      reverse=self._sort_order == Qt.SortOrder.DescendingOrder)
+
+    def _apply_order(self, order: list[int]) -> None:
+        for values in self._lists():
+            values[:] = [values[row] for row in order]
+        self._row_by_id = {}
+        self._reindex()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self._sort_column = column
+        self._sort_order = order
+        if column < 0 or not self._prices:
+            return
+        self.layoutAboutToBeChanged.emit()
+        new_order = self._sorted_order()
+        self._apply_order(new_order)
+        new_row = {old: new for new, old in enumerate(new_order)}
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent, [self.index(new_row[index.row()], index.column()) for index in persistent])
+        self.layoutChanged.emit()
+
+    def set_assets(self, assets: list[dict]) -> None:
+        """Replace everything in one model reset"""
+        self.beginResetModel()
+        rows = [asset_row(asset) for asset in assets]
+        self._columns = [list(column) for column in zip(*rows)] if rows else [[] for _ in ASSET_COLUMNS]
+        self._prices = [asset_price(asset) for asset in assets]
+        self._quantities = [_quantity(asset) for asset in assets]
+        self._search = [" ".join(values).lower() for values in rows]
+        if self._sort_column >= 0 and rows:
+            self._apply_order(self._sorted_order())
+        else:
+            self._row_by_id = {}
+            self._reindex()
+        self.endResetModel()
+
+    def add_assets(self, assets: list[dict]) -> None:
+        """Append a chunk of a streamed load; assets already listed are updated in place"""
+        fresh = {}
+        for asset in assets:
+            if _text(asset.get('_id')) in self._row_by_id:
+                self.upsert_asset(asset)
+            else:
+                fresh[_text(asset.get('_id'))] = asset
+        if not fresh:
+            return
+        rows = [asset_row(asset) for asset in fresh.values()]
+        start = len(self._prices)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        for column, values in zip(self._columns, zip(*rows)):
+            column.extend(values)
+        self._prices.extend(asset_price(asset) for asset in fresh.values())
+        self._quantities.extend(_quantity(asset) for asset in fresh.values())
+        self._search.extend(" ".join(values).lower() for values in rows)
+        self.endInsertRows()
+        self._reindex(start)
+        if self._sort_column >= 0:
+            self.sort(self._sort_column, self._sort_order)
+
+    def _position(self, key, skip: int = -1) -> int:
+        """Sorted insert position for ``key``, ignoring row ``skip``"""
+        keys = self._keys()
+        descending = self._sort_order == Qt.SortOrder.DescendingOrder
+        low, high = 0, len(keys) - (1 if skip >= 0 else 0)
+        while low < high:
+            middle = (low + high) // 2
+            other = keys[middle + 1 if 0 <= skip <= middle else middle]
+            if (other < key) if descending else (key < other):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def _row_key(self, values: tuple, price, quantity):
+        if self._sort_column == PRICE_COLUMN:
+            return price
+        if self._sort_column == QUANTITY_COLUMN:
+            return quantity
+        return values[self._sort_column]
+
+    def upsert_asset(self, asset: dict) -> None:
+        """Update the asset's row in place, or insert it if it's new"""
+        values = asset_row(asset)
+        price = asset_price(asset)
+        quantity = _quantity(asset)
+        fields = list(values) + [price, quantity, " ".join(values).lower()]
+        row = self._row_by_id.get(values[ID_COLUMN])
+
+        if row is None:
+            row = len(self._prices)
+            if self._sort_column >= 0:
+                row = self._position(self._row_key(values, price, quantity))
+            self.beginInsertRows(QModelIndex(), row, row)
+            for target, value in zip(self._lists(), fields):
+                target.insert(row, value)
+            self.endInsertRows()
+            self._reindex(row)
+            return
+
+        for target, value in zip(self._lists(), fields):
+            target[row] = value
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(ASSET_COLUMNS) - 1))
+        if self._sort_column >= 0:
+            self._move_row(row, self._position(self._row_key(values, price, quantity), skip=row))
+
+    def _move_row(self, row: int, target: int) -> None:
+        destination = target + 1 if target > row else target
+        if target == row or not self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), destination):
+            return
+        for values in self._lists():
+            values.insert(target, values.pop(row))
+        self.endMoveRows()
+        self._reindex(min(row, target), max(row, target) + 1)
+
+    def remove_asset(self, asset_id: str) -> bool:
+        row = self._row_by_id.pop(asset_id, None)
+        if row is None:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        for values in self._lists():
+            del values[row]
+        self.endRemoveRows()
+        self._reindex(row)
+        return True
+
+
+class AssetFilterProxyModel(QSortFilterProxyModel):
+    """Filters on the model's pre-joined row text and hands sorting to the model"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._filter_text = ""
+
+    def set_filter_text(self, text: str) -> None:
+        self._filter_text = text.strip().lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return not self._filter_text or self._filter_text in self.sourceModel().search_text(source_row)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        # The proxy keeps the source order, which the model sorts itself
+        self.sourceModel().sort(column, order)
+
+# # Contoh penggunaan
+# model = AssetTableModel()
+# proxy = AssetFilterProxyModel()
+# proxy.setSourceModel(model)
+# table_view.setModel(proxy)
+# table_view.setSortingEnabled(True)
+# model.set_assets(assets)
+# model.upsert_asset(updated_asset)  # hanya satu baris yang berubah
+# model.add_assets(next_page)
+# model.set_fetch_more(lambda: load_page(next_cursor))  # dipanggil view saat scroll ke bawah
+# proxy.set_filter_text("laptop")
@@ -0,0 +1,105 @@
+import asyncio
+from typing import AsyncIterator
+
+from async_transport import AsyncTransport
+from command import Command, fixed_frame, CMD_ACTIVE_INVENTORY, CMD_GET_WORK_MODE, CMD_SET_WORK_MODE
+from reader import Reader, TID_START_ADDRESS, TID_WORD_LENGTH
+from response import Response, WorkMode, InventoryTag, STATUS_INVENTORY_MORE_FRAMES
+
+
+class AsyncReader:
+    """``Reader`` with coroutine methods, for running many readers on one event loop.
+
+    Requests are built and replies parsed exactly as in ``Reader``. A lock
+    keeps one request/response exchange in flight per reader, so tasks
+    sharing a reader cannot read each other's replies.
+    """
+
+    def __init__(self, transport: AsyncTransport) -> None:
+        self.transport = transport
+        self._lock = asyncio.Lock()
+
+    async def close(self) -> None:
+        await self.transport.close()
+
+    async def _get_response(self) -> bytearray:
+        # Active-mode tag frames can still be in flight; they never answer a command
+        frame = await self.transport.read_frame()
+        while frame[2] == CMD_ACTIVE_INVENTORY:
+            frame = await self.transport.read_frame()
+        return frame
+
+    async def _request(self, frame: bytes) -> Response:
+        async with self._lock:
+            await self.transport.write_bytes(frame)
+            return Response(await self._get_response())
+
+    async def inventory_answer_mode(self,
+                                    start_address_tid: int | None = None,
+                                    len_tid: int | None = None,
+                                    ) -> list[bytes]:  # 8.2.1 Inventory (Answer Mode)
+        async with self._lock:
+            await self.transport.write_bytes(Reader._inventory_frame(start_address_tid, len_tid))
+            response = Response(await self._get_response())
+            blocks: list[bytes] = list(Reader._iter_tag_blocks(response.data))
+            while response.status == STATUS_INVENTORY_MORE_FRAMES:
+                response = Response(await self._get_response())
+                blocks.extend(Reader._iter_tag_blocks(response.data))
+        return blocks
+
+    async def inventory_with_tid(self,
+                                 start_address_tid: int = TID_START_ADDRESS,
+                                 len_tid: int = TID_WORD_LENGTH,
+                                 ) -> list[InventoryTag]:  # 8.2.1 Inventory with TID
+        return list(Reader._split_tid(await self.inventory_answer_mode(start_address_tid, len_tid), len_tid))
+
+    async def active_frames(self, stop: asyncio.Event | None = None) -> AsyncIterator[list[bytearray]]:
+        while stop is None or not stop.is_set():
+            try:
+                frames = await self.transport.read_frames()
+            except TimeoutError:
+                continue
+            if frames:
+                yield frames
+
+    async def read_memory(self, epc: bytes, memory_bank: int, start_address: int, length: int,
+                          access_password: bytes = bytes(4)) -> Response:  # 8.2.2 Read Data
+        return await self._request(Reader._read_memory_frame(epc, memory_bank, start_address, length,
+                                                             access_password))
+
+    async def write_memory(self, epc: bytes, memory_bank: int, start_address: int,
+                           data_to_write: bytes,
+                           access_password: bytes = bytes(4)) -> Response:  # 8.2.4 Write Data
+        return await self._request(Reader._write_memory_frame(epc, memory_bank, start_address,
+                                                              data_to_write, access_password))
+
+    async def write_epc(self, new_epc: bytes,
+                        access_password: bytes = bytes(4)) -> Response:  # 8.2.5 Write EPC
+        return await self._request(Reader._write_epc_frame(new_epc, access_password))
+
+    async def lock(self, epc: bytes, select: int, set_protect: int,
+                   access_password: bytes) -> Response:  # 8.2.6 Lock
+        return await self._request(Reader._lock_frame(epc, select, set_protect, access_password))
+
+    async def set_power(self, power: int) -> Response:  # 8.4.6 Set Power
+        return await self._request(Reader._set_power_frame(power))
+
+    async def work_mode(self) -> WorkMode:  # 8.4.10 Get WorkMode
+        return WorkMode((await self._request(fixed_frame(CMD_GET_WORK_MODE))).data)
+
+    async def set_work_mode(self, work_mode: WorkMode) -> Response:  # 8.4.9 Set WorkMode
+        return await self._request(Command(CMD_SET_WORK_MODE, data=work_mode.to_bytes()).serialize())
+
+# # Contoh penggunaan: beberapa reader dan lookup backend di satu event loop
+# async def scan(host, port):
+#     reader = AsyncReader(await AsyncTcpTransport.open(host, port))
+#     tags = await reader.inventory_with_tid()
+#     # AssetClient masih blocking; jalankan di thread tanpa menahan reader lain
+#     assets = await asyncio.to_thread(asset_client.lookup, [{'epc': hex_readable(t.epc)} for t in tags])
+#     await reader.close()
+#     return assets
+#
+# async def main():
+#     return await asyncio.gather(scan("192.168.1.190", 6000), scan("192.168.1.191", 6000))
+#
+# asyncio.run(main())
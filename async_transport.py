@@ -0,0 +1,172 @@
+import asyncio
+import os
+import threading
+from abc import ABC, abstractmethod
+
+import serial
+
+from transport import RECEIVE_CHUNK_SIZE, ReceiveBuffer
+
+
+class AsyncTransport(ABC):
+    """Coroutine counterpart of ``Transport``: frames are awaited, not blocked on.
+
+    Subclasses only provide ``read_available()`` (wait for at least one
+    byte), ``write_bytes()`` and ``close()``; frame splitting is the same
+    ``ReceiveBuffer`` the blocking transports use. A read that gets no byte
+    within ``timeout`` seconds raises ``TimeoutError``.
+    """
+
+    def __init__(self, timeout: float = 1) -> None:
+        self.timeout = timeout
+        self.receive_buffer = ReceiveBuffer()
+
+    @abstractmethod
+    async def read_available(self) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def write_bytes(self, buffer: bytes) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def close(self) -> None:
+        raise NotImplementedError
+
+    async def _feed(self) -> None:
+        self.receive_buffer.feed(await asyncio.wait_for(self.read_available(), self.timeout))
+
+    async def read_frame(self) -> bytearray:
+        frame = self.receive_buffer.pop_frame()
+        while frame is None:
+            await self._feed()
+            frame = self.receive_buffer.pop_frame()
+        return frame
+
+    async def read_frames(self) -> list[bytearray]:
+        """Every complete frame buffered after at most one read"""
+        frames = self.receive_buffer.pop_frames()
+        if frames:
+            return frames
+        await self._feed()
+        return self.receive_buffer.pop_frames()
+
+
+class AsyncTcpTransport(AsyncTransport):
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, timeout: float = 1) -> None:
+        super().__init__(timeout)
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def open(cls, ip_address: str, port: int, timeout: float = 1) -> "AsyncTcpTransport":
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(ip_address, port), timeout)
+        return cls(reader, writer, timeout)
+
+    async def read_available(self) -> bytes:
+        data = await self._reader.read(RECEIVE_CHUNK_SIZE)
+        if not data:
+            raise ConnectionError("Connection closed by reader")
+        return data
+
+    async def write_bytes(self, buffer: bytes) -> None:
+        self._writer.write(buffer)
+        await self._writer.drain()
+
+    async def close(self) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+class AsyncSerialTransport(AsyncTransport):
+    """Serial port read through the event loop, without pyserial-asyncio.
+
+    On POSIX the port is opened non-blocking and its file descriptor is
+    watched with ``loop.add_reader``, so waiting costs no thread. Windows
+    has no pollable descriptor for COM ports; there one long-lived thread
+    reads the port (with a short serial timeout) and hands the bytes to an
+    ``asyncio.Queue``. A read timing out only cancels the wait on the
+    queue, so no read is ever abandoned mid-flight and no byte is lost.
+    ``pollable`` overrides the platform check.
+    """
+
+    _poll_interval = 0.05  # Serial read timeout of the reader thread (s)
+
+    def __init__(self, serial_port: str, baud_rate: int, timeout: float = 1, pollable: bool | None = None) -> None:
+        super().__init__(timeout)
+        self._pollable = os.name == "posix" if pollable is None else pollable
+        self.serial = serial.Serial(serial_port, baud_rate,
+                                    timeout=0 if self._pollable else self._poll_interval,
+                                    write_timeout=timeout)
+        self._received: asyncio.Queue | None = None
+        self._thread: threading.Thread | None = None
+        self._closed = threading.Event()
+
+    @classmethod
+    async def open(cls, serial_port: str, baud_rate: int, timeout: float = 1) -> "AsyncSerialTransport":
+        return cls(serial_port, baud_rate, timeout)
+
+    def _read_loop(self, loop: asyncio.AbstractEventLoop, received: asyncio.Queue) -> None:
+        while not self._closed.is_set():
+            try:
+                data = self.serial.read(max(self.serial.in_waiting, 1))
+            except Exception as e:
+                if not self._closed.is_set():
+                    loop.call_soon_threadsafe(received.put_nowait, e)
+                return
+            if data:
+                try:
+                    loop.call_soon_threadsafe(received.put_nowait, data)
+                except RuntimeError:
+                    return  # The event loop is gone
+
+    async def _read_from_thread(self) -> bytes:
+        if self._thread is None:
+            self._received = asyncio.Queue()
+            self._thread = threading.Thread(target=self._read_loop,
+                                            args=(asyncio.get_running_loop(), self._received),
+                                            name=f"serial-{self.serial.port}", daemon=True)
+            self._thread.start()
+        item = await self._received.get()
+        if isinstance(item, Exception):
+            raise ConnectionError(f"Serial read failed: {item}") from item
+        return item
+
+    async def read_available(self) -> bytes:
+        if not self._pollable:
+            return await self._read_from_thread()
+        loop = asyncio.get_running_loop()
+        fd = self.serial.fileno()
+        while True:
+            data = self.serial.read(max(self.serial.in_waiting, 1))
+            if data:
+                return data
+            readable = loop.create_future()
+            loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+            try:
+                await readable
+            finally:
+                loop.remove_reader(fd)
+
+    async def write_bytes(self, buffer: bytes) -> None:
+        # Command frames are a few dozen bytes; the driver takes them at once
+        self.serial.write(buffer)
+
+    async def close(self) -> None:
+        self._closed.set()
+        if self._thread is not None:
+            # Let the reader thread's current read time out before the port goes away
+            await asyncio.to_thread(self._thread.join, self._poll_interval * 4)
+        self.serial.close()
+
+# # Contoh penggunaan
+# async def main():
+#     transport = await AsyncTcpTransport.open("192.168.1.190", 6000)
+#     await transport.write_bytes(Command(CMD_GET_WORK_MODE).serialize())
+#     print(await transport.read_frame())
+#     await transport.close()
+#
+# asyncio.run(main())
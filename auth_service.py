@@ -1,70 +1,141 @@
-import requests
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import threading
+import time
 from datetime import datetime, timedelta
 from PyQt6.QtWidgets import QMessageBox
 import json
 
+from lazy_import import lazy_module
+
+requests = lazy_module("requests")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_LIFETIME = 3600  # Seconds, for tokens without a readable 'exp' claim
+
+
+class AuthError(Exception):
+    """The backend refused the credentials"""
+
+
+def jwt_expiry(token):
+    """The 'exp' claim of a JWT as epoch seconds, or None; the signature is the backend's business"""
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return float(claims['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
 class AuthService:
-    def __init__(self, api_base="http://localhost:5000"):
+    def __init__(self, api_base="http://localhost:5000", session=None):
         self.api_base = api_base
+        self.session = session or requests
         self.token = None
         self.token_expiry = None
         self.current_user = None
         self.refresh_token = None
+        self.login_data = None
+        self._lock = threading.Lock()
 
-    def login(self, email, password):
-        """Handle login process with proper error handling"""
-        try:
-            response = requests.post(
-                f"{self.api_base}/api/auth/login",
-                json={
-                    "email": email,
-                    "password": password
-                },
-                headers={"Content-Type": "application/json"},
-                timeout=5
-            )
-
-            response.raise_for_status()  # Will raise HTTPError for 4XX/5XX status
-            data = response.json()
-
-            if not data.get('token'):
-                raise ValueError("Invalid response: No token received")
-
-            self.token = data['token']
+    def _post(self, path, body, failure):
+        """POST to the auth API; the answer's JSON, or AuthError with the backend's message"""
+        response = self.session.post(
+            f"{self.api_base}{path}",
+            json=body,
+            headers={"Content-Type": "application/json"},
+            timeout=10
+        )
+        if response.status_code != 200:
+            try:
+                message = response.json().get('message', failure)
+            except ValueError:
+                message = response.text or failure
+            raise AuthError(message)
+        data = response.json()
+
+        if not data.get('token'):
+            raise AuthError("Invalid response: No token received")
+        return data
+
+    def _keep_token(self, data):
+        # Called with _lock held
+        self.token = data['token']
+        self.refresh_token = data.get('refreshToken') or self.refresh_token
+        self.token_expiry = datetime.fromtimestamp(jwt_expiry(data['token']) or time.time() + DEFAULT_TOKEN_LIFETIME)
+
+    def authenticate(self, email, password):
+        """POST the credentials and keep the token; returns the backend's login data or raises"""
+        data = self._post("/api/auth/login", {"email": email, "password": password}, 'Login failed')
+        with self._lock:
+            self.refresh_token = None  # Never reuse the one of an earlier login
+            self._keep_token(data)
+            self.login_data = data
             self.current_user = {
                 'userId': data.get('userId'),
                 'email': email,
                 'role': data.get('role', 'user')
             }
-            
-            # Calculate expiry (assuming JWT with 'exp' claim)
-            self.token_expiry = datetime.now() + timedelta(hours=1)  # Default 1 hour
+        return data
+
+    def refresh(self):
+        """Swap the refresh token for a new token; raises AuthError when there is none or it is refused"""
+        with self._lock:
+            refresh_token = self.refresh_token
+        if not refresh_token:
+            raise AuthError("No refresh token")
+        data = self._post("/api/auth/refresh", {"refreshToken": refresh_token}, 'Session expired')
+        with self._lock:
+            self._keep_token(data)
+            self.login_data = dict(self.login_data or {}, **data)
+        return data
+
+    def login(self, email, password):
+        """Handle login process with proper error handling"""
+        try:
+            self.authenticate(email, password)
             return True
 
+        except AuthError as e:
+            QMessageBox.critical(None, "Login Failed", str(e))
+            return False
+
         except requests.exceptions.RequestException as e:
-            error_msg = f"Network error: {str(e)}"
-            if hasattr(e, 'response') and e.response:
-                try:
-                    error_data = e.response.json()
-                    error_msg = error_data.get('message', error_msg)
-                except json.JSONDecodeError:
-                    error_msg = e.response.text or error_msg
-            QMessageBox.critical(None, "Login Failed", error_msg)
+            QMessageBox.critical(None, "Login Failed", f"Network error: {str(e)}")
             return False
 
         except Exception as e:
             QMessageBox.critical(None, "Login Error", f"An error occurred: {str(e)}")
             return False
 
-    def is_token_valid(self):
-        """Check if token exists and not expired"""
-        return self.token and (not self.token_expiry or datetime.now() < self.token_expiry)
+    def seconds_left(self):
+        """Seconds until the token expires (negative once it has)"""
+        with self._lock:
+            if not self.token or not self.token_expiry:
+                return float('-inf')
+            return self.token_expiry.timestamp() - time.time()
+
+    def is_token_valid(self, margin=0):
+        """Check if token exists and not expired, with ``margin`` seconds to spare"""
+        return self.seconds_left() > margin
+
+    def valid_token(self):
+        """The token while it has not expired, else None"""
+        with self._lock:
+            if not self.token or not self.token_expiry or self.token_expiry.timestamp() <= time.time():
+                return None
+            return self.token
 
     def get_auth_headers(self):
         """Return headers with authorization token"""
         if not self.is_token_valid():
             return None
-            
+
         return {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
@@ -72,6 +143,151 @@ class AuthService:
 
     def logout(self):
         """Clear authentication data"""
-        self.token = None
-        self.token_expiry = None
-        self.current_user = None
\ No newline at end of file
+        with self._lock:
+            self.token = None
+            self.token_expiry = None
+            self.current_user = None
+            self.refresh_token = None
+            self.login_data = None
+
+
+class _OperatorSession:
+    def __init__(self, auth, verifier):
+        self.auth = auth  # Holds the refresh token the backend gave at login; never the password
+        self.verifier = verifier
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+
+class AuthSessions:
+    """Logged-in operators, each with its own ``AuthService``, shared by the pages.
+
+    ``login()`` for an operator whose token is still good (``refresh_margin``
+    seconds to spare) returns the cached login data without asking the
+    backend. The password must still match: it is checked against an HMAC
+    kept in memory under a per-process key; the password itself is not
+    kept. A background thread renews the token of active operators shortly
+    before it expires through ``POST /api/auth/refresh`` with the refresh
+    token from their login (without one, or once it is refused, the
+    operator logs in again next time), and forgets operators idle for
+    ``idle_timeout`` seconds. Safe to call from the API worker threads;
+    logins of the same operator in parallel make one round trip.
+    """
+
+    def __init__(self, api_base="http://localhost:5000", session=None, refresh_margin=120,
+                 idle_timeout=1800, check_interval=30):
+        self.api_base = api_base
+        self.session = session
+        self.refresh_margin = refresh_margin
+        self.idle_timeout = idle_timeout
+        self.check_interval = check_interval
+        self.logins = 0
+        self.reuses = 0
+        self.refreshes = 0
+        self._key = os.urandom(32)
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _verifier(self, email, password):
+        return hmac.new(self._key, f"{email}\0{password}".encode(), hashlib.sha256).digest()
+
+    def login(self, email, password):
+        """Login data for the operator, from the cache when possible"""
+        email = email.strip().lower()
+        verifier = self._verifier(email, password)
+        with self._lock:
+            operator = self._sessions.get(email)
+            if operator is None:
+                operator = self._sessions[email] = _OperatorSession(AuthService(self.api_base, self.session), None)
+        with operator.lock:
+            if (operator.verifier is not None and hmac.compare_digest(operator.verifier, verifier)
+                    and operator.auth.is_token_valid(self.refresh_margin)):
+                operator.last_used = time.monotonic()
+                self.reuses += 1
+                return operator.auth.login_data
+            # A wrong password raises here and leaves the operator's session as it was
+            auth = AuthService(self.api_base, self.session)
+            data = auth.authenticate(email, password)
+            operator.auth, operator.verifier = auth, verifier
+            operator.last_used = time.monotonic()
+            self.logins += 1
+        self.start()
+        return data
+
+    def token(self, email):
+        """The operator's current token, or None when not logged in"""
+        with self._lock:
+            operator = self._sessions.get(email.strip().lower())
+        return operator.auth.valid_token() if operator is not None else None
+
+    def forget(self, email):
+        with self._lock:
+            operator = self._sessions.pop(email.strip().lower(), None)
+        if operator is not None:
+            operator.auth.logout()
+
+    def refresh_due(self):
+        """Renew the tokens about to expire; drop idle operators. Returns how many were refreshed"""
+        now = time.monotonic()
+        refreshed = 0
+        with self._lock:
+            operators = list(self._sessions.items())
+        for email, operator in operators:
+            if now - operator.last_used > self.idle_timeout:
+                self.forget(email)
+                continue
+            with operator.lock:
+                if operator.auth.refresh_token is None or operator.auth.is_token_valid(self.refresh_margin):
+                    continue
+                try:
+                    operator.auth.refresh()
+                except AuthError:
+                    operator.auth.logout()  # Refresh token expired or revoked; ask next time
+                    operator.verifier = None
+                    continue
+                except requests.exceptions.RequestException as e:
+                    logger.warning("Token refresh for %s failed: %s", email, e)
+                    continue
+            refreshed += 1
+            self.refreshes += 1
+        return refreshed
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            self.refresh_due()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="auth-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+
+_shared = None
+
+
+def auth_sessions():
+    """The operator sessions shared by all pages, logging in through the API executor's session"""
+    global _shared
+    if _shared is None:
+        from api_executor import api_executor
+        _shared = AuthSessions(api_executor().api_base, session=api_executor().session)
+    return _shared
+
+
+def shutdown_auth_sessions():
+    if _shared is not None:
+        _shared.stop()
+
+# # Contoh penggunaan
+# sessions = auth_sessions()
+# data = sessions.login("operator@example.com", "rahasia")   # POST /api/auth/login
+# data = sessions.login("operator@example.com", "rahasia")   # dari cache, tanpa round trip
+# headers = {'Authorization': f"Bearer {data['token']}"}
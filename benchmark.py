@@ -0,0 +1,1070 @@
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import requests
+
+from asset_cache import AssetCache
+from asset_client import AssetClient
+from asset_replica import AssetReplica, AssetSync
+from asset_server import AssetStubServer, make_assets
+from auth_service import AuthError, AuthSessions
+from command import Command, fixed_frame, CMD_INVENTORY, CMD_READ_MEMORY
+from inventory_pipeline import ContinuousInventory
+from reader import Reader
+from response import (Response, ResponseView, hex_readable, InventoryMemoryBank, InventoryWorkMode,
+                      STATUS_INVENTORY_COMPLETE)
+from stock_take import StockTake
+from tag_encoder import EncodeJob, LockProfile, TagEncoder
+from simulator import (ReaderSimulator, SimulatedTransport, SimulatorTcpServer, SimulatorPty,
+                       build_frame, make_population)
+from transaction_queue import TransactionQueue
+from transport import TcpTransport
+from utils import calculate_checksum, verify_checksums
+
+
+def _calculate_checksum_bitwise(data: bytes) -> bytearray:
+    # Original bit-loop implementation, kept as the baseline to compare against
+    value = 0xFFFF
+    for d in data:
+        value ^= d
+        for _ in range(8):
+            value = (value >> 1) ^ 0x8408 if value & 0x0001 else (value >> 1)
+    return bytearray([value & 0xFF, value >> 0x08])
+
+
+def _report(label: str, seconds: float, count: int) -> None:
+    print(f"{label:<32} {seconds * 1000:10.2f} ms  {count / seconds:14,.0f} ops/s")
+
+
+def _synthetic_inventory_frames(rng: random.Random, count: int, tags_per_frame: int = 1) -> list[bytes]:
+    frames = []
+    for _ in range(count):
+        data = bytearray([tags_per_frame])
+        for _ in range(tags_per_frame):
+            data.append(12)
+            data.extend(rng.randbytes(12))
+        frames.append(build_frame(CMD_INVENTORY, STATUS_INVENTORY_COMPLETE, bytes(data)))
+    return frames
+
+
+def _measure(parse, frames) -> tuple[float, int, int]:
+    start = time.perf_counter()
+    for frame in frames:
+        parse(frame).data
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    kept = [parse(frame) for frame in frames]
+    for response in kept:
+        response.data
+    allocated, _ = tracemalloc.get_traced_memory()
+    snapshot_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    return seconds, allocated, snapshot_blocks
+
+
+def bench_response(args) -> int:
+    """Compare Response with the zero-copy ResponseView on synthetic inventory frames"""
+    rng = random.Random(args.seed)
+    frames = _synthetic_inventory_frames(rng, args.frames)
+
+    for label, parse in (("Response", Response), ("ResponseView", ResponseView)):
+        seconds, allocated, blocks = _measure(parse, frames)
+        _report(label, seconds, len(frames))
+        print(f"{'':<32} {allocated / len(frames):10.1f} B/frame  {blocks / len(frames):9.2f} blocks/frame (retained)")
+    return 0
+
+
+def _scan_with_read_memory(reader: Reader) -> dict[str, str]:
+    tags = {}
+    for epc in reader.inventory_answer_mode():
+        response = reader.read_memory(epc=epc, memory_bank=InventoryMemoryBank.TID.value,
+                                      start_address=2, length=4)
+        tags[hex_readable(epc)] = hex_readable(response.data) if response.status == 0x00 else ""
+    return tags
+
+
+def _scan_with_tid(reader: Reader) -> dict[str, str]:
+    return {hex_readable(tag.epc): hex_readable(tag.tid) for tag in reader.inventory_with_tid()}
+
+
+def bench_inventory_tid(args) -> int:
+    """Round trips and wall time per scan: read_memory per tag vs inventory with TID"""
+    tags = make_population(args.tags, seed=args.seed)
+
+    results = {}
+    for label, scan in (("inventory + read_memory", _scan_with_read_memory),
+                        ("inventory with TID", _scan_with_tid)):
+        transport = SimulatedTransport(ReaderSimulator(tags), baud_rate=args.baud, latency=args.turnaround)
+        reader = Reader(transport)
+        start = time.perf_counter()
+        for _ in range(args.scans):
+            results[label] = scan(reader)
+        seconds = (time.perf_counter() - start) / args.scans
+        print(f"{label:<32} {transport.round_trips / args.scans:6.0f} round trips/scan  "
+              f"{seconds * 1000:10.2f} ms/scan")
+
+    same = results["inventory + read_memory"] == results["inventory with TID"]
+    print(f"Tags: {len(tags)}  identical results: {same}")
+    return 0 if same else 1
+
+
+def bench_transports(args) -> int:
+    """End-to-end inventory with TID over the simulator: in-process, TCP and pty"""
+    tags = make_population(args.tags, seed=args.seed)
+
+    def run(label, transport, round_trips):
+        reader = Reader(transport)
+        start = time.perf_counter()
+        count = 0
+        for _ in range(args.scans):
+            count = len(list(reader.inventory_with_tid()))
+        seconds = (time.perf_counter() - start) / args.scans
+        reader.close()
+        print(f"{label:<32} {count:6d} tags  {round_trips() / args.scans:6.0f} round trips/scan  "
+              f"{seconds * 1000:10.2f} ms/scan")
+
+    simulated = SimulatedTransport(ReaderSimulator(tags), baud_rate=args.baud, latency=args.turnaround)
+    run("in-process", simulated, lambda: simulated.round_trips)
+
+    served = SimulatedTransport(ReaderSimulator(tags), baud_rate=args.baud, latency=args.turnaround)
+    server = SimulatorTcpServer(served)
+    host, port = server.start()
+    run("TcpTransport", TcpTransport(host, port), lambda: served.round_trips)
+    server.stop()
+
+    try:
+        from transport import SerialTransport
+        bridged = SimulatedTransport(ReaderSimulator(tags), baud_rate=args.baud, latency=args.turnaround)
+        pty = SimulatorPty(bridged)
+    except (ImportError, EnvironmentError) as e:
+        print(f"{'SerialTransport (pty)':<32} skipped: {e}")
+        return 0
+    device = pty.start()
+    run("SerialTransport (pty)", SerialTransport(device, args.baud), lambda: bridged.round_trips)
+    pty.stop()
+    return 0
+
+
+def bench_active_inventory(args) -> int:
+    """Active-mode pipeline: latency to first and last tag, CPU used while streaming"""
+    tags = make_population(args.tags, seed=args.seed)
+    transport = SimulatedTransport(ReaderSimulator(tags), baud_rate=args.baud, active_interval=args.interval)
+    inventory = ContinuousInventory(Reader(transport))
+
+    seen = set()
+    first = None
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    for tag in inventory.run():
+        if first is None:
+            first = time.perf_counter() - start
+        seen.add(tag['epc'])
+        if len(seen) == len(tags):
+            break
+    last = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    print(f"Tags: {len(seen)}/{len(tags)}  frames: {inventory.stats['frames']}  "
+          f"bad frames: {inventory.stats['bad_frames']}")
+    print(f"{'first tag':<32} {first * 1000:10.2f} ms")
+    print(f"{'all tags':<32} {last * 1000:10.2f} ms  cpu {cpu * 1000:.2f} ms")
+    return 0 if len(seen) == len(tags) else 1
+
+
+def _lookup_sequential(api_base: str, tags: list[dict]) -> dict[str, dict | None]:
+    # What the pages used to do: UID GET, then EPC GET, one tag at a time
+    found = {}
+    for tag in tags:
+        found[tag['epc']] = None
+        response = requests.get(f"{api_base}/api/assets", params={'uid': tag['uid']}, timeout=5)
+        assets = response.json() if response.status_code == 200 else []
+        match = [asset for asset in assets if asset['rfidTag']['epc'] == tag['epc']]
+        if match:
+            found[tag['epc']] = match[0]
+            continue
+        response = requests.get(f"{api_base}/api/assets", params={'epc': tag['epc']}, timeout=5)
+        assets = response.json() if response.status_code == 200 else []
+        found[tag['epc']] = assets[0] if assets else None
+    return found
+
+
+def bench_asset_lookup(args) -> int:
+    """Lookups/s for scan batches: sequential GETs, concurrent fallback and bulk POST"""
+    assets = make_assets(max(args.counts), seed=args.seed)
+    ok = True
+    for count in args.counts:
+        # Half the batch only has an EPC (active-mode scans), the rest has a UID too
+        tags = [{'epc': asset['rfidTag']['epc'], 'uid': asset['rfidTag']['uid'] if i % 2 else ''}
+                for i, asset in enumerate(assets[:count])]
+        print(f"Tags: {count}")
+        for label, bulk, lookup in (
+                ("sequential GETs", False, lambda base: _lookup_sequential(base, tags)),
+                ("concurrent fallback", False, lambda base: AssetClient(base).lookup(tags)),
+                ("bulk POST", True, lambda base: AssetClient(base).lookup(tags))):
+            server = AssetStubServer(assets, bulk=bulk, latency=args.latency)
+            api_base = server.start()
+            start = time.perf_counter()
+            found = lookup(api_base)
+            seconds = time.perf_counter() - start
+            server.stop()
+            ok &= sum(1 for asset in found.values() if asset) == count
+            print(f"  {label:<30} {seconds * 1000:10.2f} ms  {count / seconds:14,.0f} lookups/s  "
+                  f"{server.requests_handled:5d} requests")
+    return 0 if ok else 1
+
+
+def bench_asset_cache(args) -> int:
+    """Repeated scans of the same tags with and without the asset cache"""
+    assets = make_assets(args.tags, seed=args.seed)
+    tags = [{'epc': asset['rfidTag']['epc'], 'uid': ''} for asset in assets]
+    for label, cache in (("no cache", None), ("AssetCache", AssetCache(ttl=args.ttl))):
+        server = AssetStubServer(assets, bulk=args.bulk, latency=args.latency)
+        client = AssetClient(server.start(), cache=cache)
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            client.lookup(tags)
+        seconds = (time.perf_counter() - start) / args.rounds
+        server.stop()
+        print(f"{label:<32} {seconds * 1000:10.2f} ms/scan  {server.requests_handled:6d} requests"
+              + (f"  {cache.stats()}" if cache else ""))
+    return 0
+
+
+def bench_asset_table(args) -> int:
+    """Fill a table with N assets: QTableWidget items vs AssetTableModel, plus one-row patches"""
+    import os
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication, QTableView, QTableWidget, QTableWidgetItem
+    from asset_table_model import ASSET_COLUMNS, AssetTableModel, AssetFilterProxyModel, asset_row
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    assets = make_assets(args.assets, seed=args.seed)
+
+    # What ManagementPage.load_assets used to do, and repeat after every write
+    table = QTableWidget(0, len(ASSET_COLUMNS))
+    start = time.perf_counter()
+    table.setSortingEnabled(False)
+    table.setRowCount(0)
+    for asset in assets:
+        row = table.rowCount()
+        table.insertRow(row)
+        for column, value in enumerate(asset_row(asset)):
+            table.setItem(row, column, QTableWidgetItem(value))
+    table.setSortingEnabled(True)
+    table.sortItems(0, Qt.SortOrder.AscendingOrder)
+    _report("QTableWidget fill", time.perf_counter() - start, len(assets))
+
+    model = AssetTableModel()
+    proxy = AssetFilterProxyModel()
+    proxy.setSourceModel(model)
+    view = QTableView()
+    view.setModel(proxy)
+    view.setSortingEnabled(True)
+    view.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+    start = time.perf_counter()
+    model.set_assets(assets)
+    _report("AssetTableModel reset", time.perf_counter() - start, len(assets))
+
+    updates = [dict(asset, price=asset['price'] + 1000) for asset in assets[:args.patches]]
+    start = time.perf_counter()
+    for asset in updates:
+        model.upsert_asset(asset)
+    _report("AssetTableModel one-row patch", time.perf_counter() - start, len(updates))
+
+    start = time.perf_counter()
+    proxy.set_filter_text("asset 12")
+    _report("filter", time.perf_counter() - start, len(assets))
+    app.processEvents()
+    return 0 if model.rowCount() == len(assets) else 1
+
+
+def bench_asset_list(args) -> int:
+    """Time to first rows and to the full list: one GET, streamed array, cursor pages"""
+    assets = make_assets(args.assets, seed=args.seed)
+
+    def one_get(api_base):
+        response = requests.get(f"{api_base}/api/assets", timeout=60)
+        yield response.json()
+
+    def paged(client, limit):
+        cursor = None
+        while True:
+            next_cursor = None
+            for page, next_cursor in client.iter_assets(cursor, limit, max_chunk=args.max_chunk):
+                yield page
+            if next_cursor is None:
+                return
+            cursor = next_cursor
+            limit = min(limit * 2, args.max_chunk)
+
+    ok = True
+    for label, paginate, load in (
+            ("one GET + json()", False, one_get),
+            ("streamed JSON array", False,
+             lambda base: AssetClient(base).iter_assets(limit=args.page_size, max_chunk=args.max_chunk)),
+            ("cursor pages", True, lambda base: paged(AssetClient(base), args.page_size))):
+        server = AssetStubServer(assets, latency=args.latency, paginate=paginate)
+        api_base = server.start()
+        start = time.perf_counter()
+        first = None
+        count = 0
+        for chunk in load(api_base):
+            if isinstance(chunk, tuple):
+                chunk = chunk[0]
+            if first is None:
+                first = time.perf_counter() - start
+            count += len(chunk)
+        seconds = time.perf_counter() - start
+        server.stop()
+        ok &= count == len(assets)
+        print(f"{label:<24} first rows {first * 1000:9.2f} ms  all {count} in {seconds * 1000:9.2f} ms")
+    return 0 if ok else 1
+
+
+def bench_asset_sync(args) -> int:
+    """Replica refresh by full vs delta sync, and scan lookups from the replica vs the backend"""
+    import tempfile
+    assets = make_assets(args.assets, seed=args.seed)
+    server = AssetStubServer(assets, bulk=True, latency=args.latency)
+    client = AssetClient(server.start())
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        replica = AssetReplica(os.path.join(directory, "assets.sqlite3"))
+        sync = AssetSync(replica, client, page_size=args.page_size)
+        requests_before = server.requests_handled
+        sync.full_sync()
+        print(f"{'full sync':<24} {sync.last_sync['seconds'] * 1000:10.2f} ms  {sync.last_sync['assets']:7d} assets"
+              f"  {server.requests_handled - requests_before:4d} requests")
+
+        # Edit and delete a few assets through the API, then catch up
+        rng = random.Random(args.seed)
+        gone, *kept = list(assets)  # The stub reorders its list on writes
+        for asset in rng.sample(kept, args.changes):
+            client.session.put(f"{client.api_base}/api/assets/{asset['rfidTag']['uid']}",
+                               json={'status': 'borrowed'}, timeout=5)
+        client.session.delete(f"{client.api_base}/api/assets/{gone['rfidTag']['uid']}", timeout=5)
+        requests_before = server.requests_handled
+        sync.delta_sync()
+        print(f"{'delta sync':<24} {sync.last_sync['seconds'] * 1000:10.2f} ms  {sync.last_sync['assets']:7d} assets"
+              f"  {server.requests_handled - requests_before:4d} requests  {sync.last_sync['deleted']} deleted")
+        ok &= len(replica) == len(kept) and replica.get(gone['rfidTag']['epc']) is None
+        ok &= len(replica.search("status", "borrowed", exact=True)) == args.changes
+
+        tags = [{'epc': asset['rfidTag']['epc'], 'uid': ''} for asset in rng.sample(kept, args.tags)]
+        for label, lookup_client in (("backend lookup", client),
+                                     ("replica lookup", AssetClient(client.api_base, replica=replica))):
+            requests_before = server.requests_handled
+            start = time.perf_counter()
+            found = lookup_client.lookup(tags)
+            seconds = time.perf_counter() - start
+            ok &= all(found.values())
+            print(f"{label:<24} {seconds * 1000:10.2f} ms  {len(tags):7d} tags"
+                  f"    {server.requests_handled - requests_before:4d} requests")
+
+        server.stop()
+        offline = AssetClient(client.api_base, replica=replica, timeout=0.5)
+        found = offline.lookup(tags + [{'epc': "00 00", 'uid': ''}])
+        ok &= all(found[tag['epc']] for tag in tags) and found["00 00"] is None
+        print(f"{'offline lookup':<24} {'ok' if ok else 'FAILED'}")
+        replica.close()
+    return 0 if ok else 1
+
+
+def _wait_until(condition, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def bench_transactions(args) -> int:
+    """Confirm-click latency: POST in the click vs durable queue; group commit; outage and replay"""
+    import tempfile
+    import threading
+    assets = make_assets(args.transactions * 2, seed=args.seed)
+    payloads = [{'rfidTags': [{'epc': asset['rfidTag']['epc'], 'uid': asset['rfidTag']['uid']}]}
+                for asset in assets]
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        journal = os.path.join(directory, "transactions.journal")
+        server = AssetStubServer(assets, latency=args.latency)
+        api_base = server.start()
+
+        session = requests.Session()
+        clicks = []
+        for payload in payloads[:args.transactions]:
+            start = time.perf_counter()
+            session.post(f"{api_base}/api/borrowing/borrow", json=payload, timeout=10)
+            clicks.append(time.perf_counter() - start)
+        print(f"{'POST in the click':<24} median {statistics.median(clicks) * 1000:8.2f} ms  "
+              f"max {max(clicks) * 1000:8.2f} ms")
+
+        queue = TransactionQueue(api_base, path=journal)
+        queue.start()
+        clicks = []
+        start_all = time.perf_counter()
+        for payload in payloads[args.transactions:]:
+            start = time.perf_counter()
+            queue.submit("borrow", payload, "token")
+            clicks.append(time.perf_counter() - start)
+        print(f"{'queued submit':<24} median {statistics.median(clicks) * 1000:8.2f} ms  "
+              f"max {max(clicks) * 1000:8.2f} ms")
+        ok &= _wait_until(lambda: not queue.pending(), 60)
+        print(f"{'  all sent after':<24} {(time.perf_counter() - start_all) * 1000:15.2f} ms")
+
+        # Concurrent submitters share fsyncs
+        fsyncs = queue.fsyncs
+        threads = [threading.Thread(target=lambda: [queue.submit("return", payload) for payload in
+                                                    payloads[:args.transactions // args.threads]])
+                   for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        submitted = args.threads * (args.transactions // args.threads)
+        print(f"{'group commit':<24} {submitted} submits from {args.threads} threads, "
+              f"{queue.fsyncs - fsyncs} fsyncs")
+        ok &= _wait_until(lambda: not queue.pending(), 60)
+        applied = server.transactions_applied
+        port = int(api_base.rsplit(":", 1)[1])
+        server.stop()
+        stopped = server  # Its open keep-alive connections may still answer a few
+
+        # Backend down: submits still return at once and survive a restart of the app
+        for payload in payloads[:args.transactions]:
+            queue.submit("checkout", payload, "token")
+        queue.close(timeout=1)
+        replayed = TransactionQueue(api_base, path=journal, backoff=0.05)
+        early = stopped.transactions_applied - applied
+        ok &= len(replayed.pending()) == args.transactions - early
+        server = AssetStubServer(assets, port=port)
+        server.start()
+        replayed.start()
+        ok &= _wait_until(lambda: not replayed.pending(), 60)
+        # A retry of a POST that already went through must not apply it twice
+        duplicate = replayed.submit("checkout", payloads[0])
+        ok &= _wait_until(lambda: not replayed.pending(), 10)
+        replayed._send(duplicate)
+        ok &= early + server.transactions_applied == args.transactions + 1
+        print(f"{'outage and replay':<24} {args.transactions - early} replayed, "
+              f"{server.transactions_applied} applied after restart (1 resent twice), "
+              f"journal {os.path.getsize(journal)} bytes")
+        replayed.close()
+        server.stop()
+        ok &= applied == 2 * args.transactions + submitted
+    print("ok" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+def bench_auth_sessions(args) -> int:
+    """Operator logins per transaction: inline POST /api/auth/login vs cached AuthSessions, plus refresh"""
+    operators = {f"operator{i}@example.com": f"secret{i}" for i in range(args.operators)}
+    server = AssetStubServer([], latency=args.latency, passwords=operators, login_cost=args.login_cost,
+                             token_ttl=args.token_ttl)
+    api_base = server.start()
+    session = requests.Session()
+    rotation = [list(operators.items())[i % len(operators)] for i in range(args.transactions)]
+    ok = True
+
+    start = time.perf_counter()
+    for email, password in rotation:
+        response = session.post(f"{api_base}/api/auth/login", json={'email': email, 'password': password},
+                                timeout=10)
+        ok &= response.status_code == 200
+    seconds = time.perf_counter() - start
+    print(f"{'inline login':<24} {seconds / len(rotation) * 1000:8.2f} ms/transaction  {server.logins:4d} logins")
+
+    sessions = AuthSessions(api_base, session=session, refresh_margin=args.token_ttl / 2, check_interval=0.1)
+    logins = server.logins
+    start = time.perf_counter()
+    for email, password in rotation:
+        ok &= bool(sessions.login(email, password)['token'])
+    seconds = time.perf_counter() - start
+    print(f"{'AuthSessions':<24} {seconds / len(rotation) * 1000:8.2f} ms/transaction  "
+          f"{server.logins - logins:4d} logins  {sessions.reuses} reused")
+
+    # A wrong password never gets the cached token
+    email, password = rotation[0]
+    try:
+        sessions.login(email, password + "x")
+        ok = False
+    except AuthError:
+        ok &= sessions.token(email) is not None
+
+    # Tokens are replaced in the background before they expire
+    tokens = {email: sessions.token(email) for email in operators}
+    logins = server.logins
+    time.sleep(args.token_ttl * 0.75)
+    refreshed = sum(sessions.token(email) not in (None, token) for email, token in tokens.items())
+    ok &= refreshed == len(operators) and sessions.refreshes >= len(operators)
+    ok &= server.logins == logins and server.refreshes == sessions.refreshes  # Refresh tokens, no passwords
+    reuses = sessions.reuses
+    sessions.login(email, password)
+    ok &= sessions.reuses == reuses + 1
+    print(f"{'background refresh':<24} {refreshed}/{len(operators)} tokens renewed before expiry, "
+          f"{server.refreshes} refresh requests")
+    sessions.stop()
+    server.stop()
+    print("ok" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+def bench_stock_take(args) -> int:
+    """Stock take of a room with N tags: seen-set reconciliation vs recomputing set differences per batch"""
+    import tempfile
+    assets = make_assets(args.assets, seed=args.seed, locations=args.locations)
+    room = "Ruang 1"
+    rng = random.Random(f"stock-take-{args.seed}")  # Not make_assets' stream, or "unknown" EPCs would be known
+    here = [asset['rfidTag']['epc'] for asset in assets if asset['location'] == room]
+    elsewhere = [asset['rfidTag']['epc'] for asset in assets if asset['location'] != room]
+    present = rng.sample(here, int(len(here) * args.present))
+    misplaced = rng.sample(elsewhere, args.misplaced)
+    unknown = [hex_readable(rng.randbytes(12)) for _ in range(args.unknown)]
+    reads = (present + misplaced + unknown) * args.repeats
+    rng.shuffle(reads)
+    batches = [reads[i:i + args.batch] for i in range(0, len(reads), args.batch)]
+    print(f"{len(assets)} assets, {len(here)} expected in {room}; {len(set(reads))} tags read "
+          f"{args.repeats}x = {len(reads)} reads in {len(batches)} batches")
+
+    with tempfile.TemporaryDirectory() as directory:
+        replica = AssetReplica(os.path.join(directory, "assets.sqlite3"))
+        replica.apply(assets, replace=True)
+        start = time.perf_counter()
+        stock_take = StockTake.from_replica(replica, room)
+        print(f"{'load expected set':<28} {(time.perf_counter() - start) * 1000:10.2f} ms")
+        replica.close()
+
+    worst = 0.0
+    start = time.perf_counter()
+    for batch in batches:
+        batch_start = time.perf_counter()
+        stock_take.add(batch)
+        worst = max(worst, time.perf_counter() - batch_start)
+    seconds = time.perf_counter() - start
+    _report("StockTake.add", seconds, len(reads))
+    print(f"{'  worst batch':<28} {worst * 1000:10.3f} ms  seen-set {sys.getsizeof(stock_take._seen) / 1024:8.1f} KiB")
+    start = time.perf_counter()
+    missing = stock_take.missing()
+    print(f"{'  missing()':<28} {(time.perf_counter() - start) * 1000:10.2f} ms")
+
+    # Baseline: a set of EPC strings, differences recomputed after every batch
+    expected, known = set(here), {asset['rfidTag']['epc'] for asset in assets}
+    seen: set[str] = set()
+    worst = 0.0
+    start = time.perf_counter()
+    for batch in batches:
+        batch_start = time.perf_counter()
+        seen.update(batch)
+        baseline_missing = expected - seen
+        baseline_misplaced = (seen - expected) & known
+        baseline_unexpected = seen - known
+        worst = max(worst, time.perf_counter() - batch_start)
+    seconds = time.perf_counter() - start
+    _report("set differences per batch", seconds, len(reads))
+    print(f"{'  worst batch':<28} {worst * 1000:10.3f} ms  seen-set {sys.getsizeof(seen) / 1024:8.1f} KiB "
+          f"(table only, EPC strings shared)")
+
+    summary = stock_take.summary()
+    ok = (summary['found'] == len(present) and set(missing) == baseline_missing
+          and set(stock_take.misplaced) == baseline_misplaced == set(misplaced)
+          and stock_take.unexpected == baseline_unexpected == set(unknown))
+    print(summary, "ok" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+def bench_tag_encoding(args) -> int:
+    """Bulk encoding over the simulator: one request per step vs pipelined windows of tags"""
+    profile = LockProfile(access_password=bytes.fromhex("1234ABCD")) if args.lock else None
+    jobs = [EncodeJob(bytes.fromhex(f"300833B2DDD90140{i:08X}"), f"AST-{i:06d}".encode().ljust(args.user_bytes, b"\0"),
+                      profile) for i in range(args.tags)]
+    print(f"{args.tags} tags, {args.user_bytes} B user memory, lock: {bool(profile)}, "
+          f"{args.baud} baud, {args.turnaround * 1000:.1f} ms turnaround")
+
+    ok = True
+    for label, pipeline in (("one request per step", False), (f"pipelined, window {args.window}", True)):
+        tags = make_population(args.tags, seed=args.seed)
+        transport = SimulatedTransport(ReaderSimulator(tags), baud_rate=args.baud, latency=args.turnaround)
+        encoder = TagEncoder(Reader(transport), pipeline=pipeline, window=args.window)
+        start = time.perf_counter()
+        results = encoder.encode(jobs)
+        seconds = time.perf_counter() - start
+        latencies = sorted(result.seconds for result in results)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"{label:<28} {seconds * 1000:10.2f} ms  {len(results) / seconds:8.1f} tags/s  "
+              f"per tag {statistics.mean(latencies) * 1000:7.2f} ms (p95 {p95 * 1000:.2f})  "
+              f"{transport.bytes_written + transport.bytes_read} B on the line")
+        # Check the simulated tags themselves, not just what the encoder reported
+        by_tid = {tag.tid[4:]: tag for tag in tags}
+        written = all(result.ok and by_tid[result.tid].epc == result.job.epc
+                      and bytes(by_tid[result.tid].user[:args.user_bytes]) == result.job.user_data
+                      and (profile is None or by_tid[result.tid].protection == dict(profile.locks))
+                      for result in results)
+        failed = [f"{result.job.epc.hex()}: {result.step} {result.error}" for result in results if not result.ok]
+        print(f"{'':<28} {sum(result.ok for result in results)}/{len(results)} ok, "
+              f"verified against the simulator: {written} {failed[:3]}")
+        ok = ok and written
+    return 0 if ok else 1
+
+
+# Must not be imported before the menu shows; they load with the first page that needs them
+HEAVY_STARTUP_MODULES = ("requests", "urllib3", "pymongo", "bson", "PIL", "serial")
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds per module, from a fresh ``-X importtime`` process"""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, env=env,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def bench_import_time(args) -> int:
+    """Cold-start import time of main.py against a budget; fails on heavy startup imports"""
+    runs = [_import_times(args.module) for _ in range(args.runs)]
+    total_ms = statistics.median(run[args.module] for run in runs) / 1000
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)[:args.top]
+    for name, cumulative in slowest:
+        print(f"  {name:<40} {cumulative / 1000:8.1f} ms")
+    heavy = sorted(name for name in runs[-1] if name.split(".")[0] in HEAVY_STARTUP_MODULES)
+    if heavy:
+        print(f"Heavy modules imported at startup: {', '.join(heavy)}")
+    ok = total_ms <= args.budget_ms and not heavy
+    print(f"import {args.module}: {total_ms:.1f} ms (median of {args.runs}), budget {args.budget_ms:.0f} ms"
+          f" -> {'OK' if ok else 'FAIL'}")
+    return 0 if ok else 1
+
+
+def _open_every_port() -> list[str]:
+    """What check_connection.testConnect used to do: open every candidate device"""
+    import glob
+    import serial
+    if sys.platform.startswith('win'):
+        ports = ['COM%s' % (i + 1) for i in range(256)]
+    elif sys.platform.startswith('darwin'):
+        ports = glob.glob('/dev/tty.*')
+    else:
+        ports = glob.glob('/dev/tty[A-Za-z]*')
+    result = []
+    for port in ports:
+        try:
+            serial.Serial(port).close()
+            result.append(port)
+        except (OSError, serial.SerialException):
+            pass
+    return result
+
+
+def bench_port_discovery(args) -> int:
+    """Port listing: opening every tty vs list_ports metadata; reader probe, serial vs parallel"""
+    from port_discovery import PortDiscovery
+
+    start = time.perf_counter()
+    opened = _open_every_port()
+    print(f"{'open every device':<32} {(time.perf_counter() - start) * 1000:10.2f} ms  {len(opened)} ports")
+    discovery = PortDiscovery()
+    start = time.perf_counter()
+    listed = discovery.ports()
+    print(f"{'list_ports metadata':<32} {(time.perf_counter() - start) * 1000:10.2f} ms  {len(listed)} ports")
+    start = time.perf_counter()
+    discovery.ports()
+    print(f"{'list_ports metadata (cached)':<32} {(time.perf_counter() - start) * 1000:10.2f} ms")
+
+    try:
+        ptys = [SimulatorPty(SimulatedTransport(ReaderSimulator(make_population(1, seed=args.seed)),
+                                                baud_rate=args.baud, latency=args.turnaround))
+                for _ in range(args.readers)]
+    except EnvironmentError as e:
+        print(f"{'probe':<32} skipped: {e}")
+        return 0
+    readers = [pty.start() for pty in ptys]
+    # Silent ports next to the readers: each costs one probe timeout
+    silent = [os.openpty() for _ in range(args.silent)]
+    devices = readers + [os.ttyname(slave) for _, slave in silent]
+    ok = True
+    for label, workers in (("probe one by one", 1), ("probe in parallel", len(devices))):
+        discovery = PortDiscovery(probe_timeout=args.probe_timeout)
+        start = time.perf_counter()
+        found = discovery.probe(devices, max_workers=workers)
+        print(f"{label:<32} {(time.perf_counter() - start) * 1000:10.2f} ms  "
+              f"{len(found)}/{len(devices)} answered")
+        ok &= found == readers
+    for pty in ptys:
+        pty.stop()
+    for master, slave in silent:
+        os.close(master)
+        os.close(slave)
+    return 0 if ok else 1
+
+
+def _handshake(reader: Reader, power: int = 30) -> None:
+    """What every page's RFID thread did on connect: power, then answer mode"""
+    reader.set_power(power)
+    work_mode = reader.work_mode()
+    work_mode.inventory_work_mode = InventoryWorkMode.ANSWER_MODE
+    reader.set_work_mode(work_mode)
+
+
+def bench_reader_service(args) -> int:
+    """Page visits that scan all tags: reconnect per page vs the shared reader service"""
+    from PyQt6.QtCore import QCoreApplication
+    from reader_service import ReaderService
+    from transport import SerialTransport
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    simulator = ReaderSimulator(make_population(args.tags, seed=args.seed))
+    try:
+        pty = SimulatorPty(SimulatedTransport(simulator, baud_rate=args.baud, latency=args.turnaround))
+    except EnvironmentError as e:
+        print(f"{'reader-service':<32} skipped: {e}")
+        return 0
+    device = pty.start()
+    ok = True
+
+    # Before: each page opened the port, configured the reader and closed it again
+    commands = simulator.commands_handled
+    start = time.perf_counter()
+    for _ in range(args.visits):
+        reader = Reader(SerialTransport(device, args.baud))
+        _handshake(reader)
+        inventory = ContinuousInventory(reader)
+        seen = set()
+        for batch in inventory.run_batched():
+            seen.update(tag['epc'] for tag in batch)
+            if len(seen) == args.tags:
+                inventory.stop()
+        reader.close()
+        ok &= len(seen) == args.tags
+    print(f"{'connect per page':<32} {(time.perf_counter() - start) * 1000 / args.visits:10.2f} ms/visit  "
+          f"{simulator.commands_handled - commands} commands")
+
+    # After: one connection; each page subscribes and scans through it
+    service = ReaderService()
+    commands = simulator.commands_handled
+    start = time.perf_counter()
+    service.connect_reader(device)
+    for _ in range(args.visits):
+        subscription = service.subscribe()
+        seen = set()
+        subscription.tags_scanned.connect(lambda tags, seen=seen: seen.update(tag['epc'] for tag in tags))
+        subscription.start_scanning()
+        deadline = time.monotonic() + 5
+        while len(seen) < args.tags and time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.001)
+        subscription.close()
+        ok &= len(seen) == args.tags
+    elapsed = time.perf_counter() - start
+    service.shutdown()
+    print(f"{'shared reader service':<32} {elapsed * 1000 / args.visits:10.2f} ms/visit  "
+          f"{simulator.commands_handled - commands} commands")
+    pty.stop()
+    return 0 if ok else 1
+
+
+def bench_reader_group(args) -> int:
+    """Several readers, overlapping tag sets: one after another vs concurrently in a ReaderGroup"""
+    from reader_group import ReaderGroup
+
+    population = make_population(args.tags * args.readers, seed=args.seed)
+    step = args.tags - args.overlap
+    fields = [population[i * step:i * step + args.tags] for i in range(args.readers)]
+    expected = {hex_readable(tag.epc) for field in fields for tag in field}
+
+    def readers():
+        return {f"reader-{i}": Reader(SimulatedTransport(ReaderSimulator(field), baud_rate=args.baud,
+                                                         active_interval=args.interval))
+                for i, field in enumerate(fields)}
+
+    seen = set()
+    start = time.perf_counter()
+    for reader, field in zip(readers().values(), fields):
+        inventory = ContinuousInventory(reader)
+        found = set()
+        for tag in inventory.run():
+            found.add(tag['epc'])
+            if len(found) == len(field):
+                inventory.stop()
+        seen |= found
+    print(f"{'one reader at a time':<32} {(time.perf_counter() - start) * 1000:10.2f} ms  {len(seen)} tags")
+    ok = seen == expected
+
+    group = ReaderGroup(readers())
+    seen = set()
+    start = time.perf_counter()
+    for batch in group.run_batched():
+        seen.update(tag['epc'] for tag in batch)
+        if len(seen) == len(expected):
+            group.stop()
+    print(f"{'reader group':<32} {(time.perf_counter() - start) * 1000:10.2f} ms  {len(seen)} tags")
+    for name, stats in group.stats().items():
+        print(f"  {name:<30} {stats['tags_per_second']:10.1f} tags/s  frames {stats['frames']}  "
+              f"first seen {stats['first_seen']}")
+    return 0 if ok and seen == expected else 1
+
+
+def bench_async_readers(args) -> int:
+    """Inventory rounds on several TCP readers: blocking Reader one by one vs AsyncReader on one loop"""
+    import asyncio
+    from async_reader import AsyncReader
+    from async_transport import AsyncTcpTransport
+
+    servers = [SimulatorTcpServer(SimulatedTransport(ReaderSimulator(make_population(args.tags, seed=args.seed + i)),
+                                                     latency=args.turnaround))
+               for i in range(args.readers)]
+    addresses = [server.start() for server in servers]
+
+    readers = [Reader(TcpTransport(*address)) for address in addresses]
+    start = time.perf_counter()
+    blocking = [sum(len(list(reader.inventory_with_tid())) for _ in range(args.rounds)) for reader in readers]
+    print(f"{'Reader, one by one':<32} {(time.perf_counter() - start) * 1000:10.2f} ms  {sum(blocking)} tags")
+    for reader in readers:
+        reader.close()
+
+    async def scan(address) -> int:
+        reader = AsyncReader(await AsyncTcpTransport.open(*address))
+        try:
+            return sum([len(await reader.inventory_with_tid()) for _ in range(args.rounds)])
+        finally:
+            await reader.close()
+
+    async def scan_all() -> list[int]:
+        return await asyncio.gather(*(scan(address) for address in addresses))
+
+    start = time.perf_counter()
+    concurrent = asyncio.run(scan_all())
+    print(f"{'AsyncReader, one event loop':<32} {(time.perf_counter() - start) * 1000:10.2f} ms  "
+          f"{sum(concurrent)} tags")
+    for server in servers:
+        server.stop()
+    return 0 if blocking == concurrent else 1
+
+
+def bench_command_frames(args) -> int:
+    """Request frames: a new Command per send vs cached fixed frames and templates"""
+    epcs = [random.Random(args.seed + i).randbytes(12) for i in range(args.epcs)]
+
+    def time_frames(label: str, build, count: int) -> None:
+        start = time.perf_counter()
+        for i in range(count):
+            build(i)
+        _report(label, time.perf_counter() - start, count)
+
+    def read_tid_command(i: int) -> bytes:
+        epc = epcs[i % len(epcs)]
+        return Command(CMD_READ_MEMORY, data=bytes([6]) + epc + bytes([2, 2, 4]) + bytes(4)).serialize()
+
+    time_frames("inventory, new Command", lambda i: Command(CMD_INVENTORY).serialize(), args.frames)
+    time_frames("inventory, fixed_frame", lambda i: fixed_frame(CMD_INVENTORY), args.frames)
+    time_frames("read TID, new Command", read_tid_command, args.frames)
+    time_frames("read TID, template", lambda i: Reader._read_memory_frame(epcs[i % len(epcs)], 2, 2, 4, bytes(4)),
+                args.frames)
+
+    # serialize() used to append a second CRC on every extra call
+    command = Command(CMD_INVENTORY)
+    ok = command.serialize() == command.serialize() == fixed_frame(CMD_INVENTORY)
+    ok &= all(Reader._read_memory_frame(epc, 2, 2, 4, bytes(4)) == read_tid_command(i)
+              for i, epc in enumerate(epcs))
+    print(f"Idempotent, identical to Command: {ok}")
+    return 0 if ok else 1
+
+
+def bench_crc(args) -> int:
+    """Compare the table-driven CRC-16 against the original bit loop"""
+    rng = random.Random(args.seed)
+    frames = []
+    for _ in range(args.frames):
+        body = bytes(rng.randrange(256) for _ in range(rng.randrange(4, 40)))
+        frames.append(body + bytes(_calculate_checksum_bitwise(body)))
+    bodies = [frame[:-2] for frame in frames]
+
+    mismatches = sum(1 for body in bodies if calculate_checksum(body) != _calculate_checksum_bitwise(body))
+    print(f"Frames: {len(frames)}  mismatches: {mismatches}")
+
+    start = time.perf_counter()
+    for body in bodies:
+        _calculate_checksum_bitwise(body)
+    _report("bit loop", time.perf_counter() - start, len(bodies))
+
+    start = time.perf_counter()
+    for body in bodies:
+        calculate_checksum(body)
+    _report("table", time.perf_counter() - start, len(bodies))
+
+    start = time.perf_counter()
+    results = verify_checksums(frames)
+    _report("table batch verify", time.perf_counter() - start, len(frames))
+
+    return 0 if mismatches == 0 and all(results) else 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Performance benchmarks for the RFID desktop app")
+    parser.add_argument("--seed", type=int, default=1)
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    crc_parser = subparsers.add_parser("crc", help=bench_crc.__doc__)
+    crc_parser.add_argument("--frames", type=int, default=100_000)
+    crc_parser.set_defaults(func=bench_crc)
+
+    response_parser = subparsers.add_parser("response", help=bench_response.__doc__)
+    response_parser.add_argument("--frames", type=int, default=100_000)
+    response_parser.set_defaults(func=bench_response)
+
+    tid_parser = subparsers.add_parser("inventory-tid", help=bench_inventory_tid.__doc__)
+    tid_parser.add_argument("--tags", type=int, default=80)
+    tid_parser.add_argument("--scans", type=int, default=3)
+    tid_parser.add_argument("--baud", type=int, default=57600)
+    tid_parser.add_argument("--turnaround", type=float, default=0.005)
+    tid_parser.set_defaults(func=bench_inventory_tid)
+
+    transport_parser = subparsers.add_parser("transports", help=bench_transports.__doc__)
+    transport_parser.add_argument("--tags", type=int, default=80)
+    transport_parser.add_argument("--scans", type=int, default=3)
+    transport_parser.add_argument("--baud", type=int, default=57600)
+    transport_parser.add_argument("--turnaround", type=float, default=0.005)
+    transport_parser.set_defaults(func=bench_transports)
+
+    active_parser = subparsers.add_parser("active-inventory", help=bench_active_inventory.__doc__)
+    active_parser.add_argument("--tags", type=int, default=80)
+    active_parser.add_argument("--baud", type=int, default=57600)
+    active_parser.add_argument("--interval", type=float, default=0.05)
+    active_parser.set_defaults(func=bench_active_inventory)
+
+    lookup_parser = subparsers.add_parser("asset-lookup", help=bench_asset_lookup.__doc__)
+    lookup_parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000])
+    lookup_parser.add_argument("--latency", type=float, default=0.002)
+    lookup_parser.set_defaults(func=bench_asset_lookup)
+
+    cache_parser = subparsers.add_parser("asset-cache", help=bench_asset_cache.__doc__)
+    cache_parser.add_argument("--tags", type=int, default=100)
+    cache_parser.add_argument("--rounds", type=int, default=5)
+    cache_parser.add_argument("--latency", type=float, default=0.002)
+    cache_parser.add_argument("--ttl", type=float, default=120.0)
+    cache_parser.add_argument("--bulk", action="store_true")
+    cache_parser.set_defaults(func=bench_asset_cache)
+
+    table_parser = subparsers.add_parser("asset-table", help=bench_asset_table.__doc__)
+    table_parser.add_argument("--assets", type=int, default=5000)
+    table_parser.add_argument("--patches", type=int, default=100)
+    table_parser.set_defaults(func=bench_asset_table)
+
+    list_parser = subparsers.add_parser("asset-list", help=bench_asset_list.__doc__)
+    list_parser.add_argument("--assets", type=int, default=50_000)
+    list_parser.add_argument("--page-size", type=int, default=200)
+    list_parser.add_argument("--max-chunk", type=int, default=5000)
+    list_parser.add_argument("--latency", type=float, default=0.002)
+    list_parser.set_defaults(func=bench_asset_list)
+
+    sync_parser = subparsers.add_parser("asset-sync", help=bench_asset_sync.__doc__)
+    sync_parser.add_argument("--assets", type=int, default=20_000)
+    sync_parser.add_argument("--changes", type=int, default=50)
+    sync_parser.add_argument("--tags", type=int, default=100)
+    sync_parser.add_argument("--page-size", type=int, default=1000)
+    sync_parser.add_argument("--latency", type=float, default=0.002)
+    sync_parser.set_defaults(func=bench_asset_sync)
+
+    transactions_parser = subparsers.add_parser("transactions", help=bench_transactions.__doc__)
+    transactions_parser.add_argument("--transactions", type=int, default=40)
+    transactions_parser.add_argument("--threads", type=int, default=4)
+    transactions_parser.add_argument("--latency", type=float, default=0.2)
+    transactions_parser.set_defaults(func=bench_transactions)
+
+    auth_parser = subparsers.add_parser("auth-sessions", help=bench_auth_sessions.__doc__)
+    auth_parser.add_argument("--operators", type=int, default=3)
+    auth_parser.add_argument("--transactions", type=int, default=30)
+    auth_parser.add_argument("--login-cost", type=float, default=0.1, help="server-side bcrypt time (s)")
+    auth_parser.add_argument("--latency", type=float, default=0.01)
+    auth_parser.add_argument("--token-ttl", type=float, default=2.0)
+    auth_parser.set_defaults(func=bench_auth_sessions)
+
+    stock_parser = subparsers.add_parser("stock-take", help=bench_stock_take.__doc__)
+    stock_parser.add_argument("--assets", type=int, default=100_000)
+    stock_parser.add_argument("--locations", type=int, default=2, help="rooms the assets are spread over")
+    stock_parser.add_argument("--present", type=float, default=0.95, help="share of the room's assets read")
+    stock_parser.add_argument("--misplaced", type=int, default=1000)
+    stock_parser.add_argument("--unknown", type=int, default=1500)
+    stock_parser.add_argument("--repeats", type=int, default=3)
+    stock_parser.add_argument("--batch", type=int, default=64)
+    stock_parser.set_defaults(func=bench_stock_take)
+
+    encoding_parser = subparsers.add_parser("tag-encoding", help=bench_tag_encoding.__doc__)
+    encoding_parser.add_argument("--tags", type=int, default=40)
+    encoding_parser.add_argument("--user-bytes", type=int, default=16)
+    encoding_parser.add_argument("--no-lock", dest="lock", action="store_false")
+    encoding_parser.add_argument("--window", type=int, default=4, help="tags per pipelined write")
+    encoding_parser.add_argument("--baud", type=int, default=57600)
+    encoding_parser.add_argument("--turnaround", type=float, default=0.005)
+    encoding_parser.set_defaults(func=bench_tag_encoding)
+
+    import_parser = subparsers.add_parser("import-time", help=bench_import_time.__doc__)
+    import_parser.add_argument("--module", default="main")
+    import_parser.add_argument("--runs", type=int, default=5)
+    import_parser.add_argument("--budget-ms", type=float, default=100.0)
+    import_parser.add_argument("--top", type=int, default=10)
+    import_parser.set_defaults(func=bench_import_time)
+
+    port_parser = subparsers.add_parser("port-discovery", help=bench_port_discovery.__doc__)
+    port_parser.add_argument("--readers", type=int, default=4)
+    port_parser.add_argument("--silent", type=int, default=4)
+    port_parser.add_argument("--baud", type=int, default=57600)
+    port_parser.add_argument("--turnaround", type=float, default=0.005)
+    port_parser.add_argument("--probe-timeout", type=float, default=0.3)
+    port_parser.set_defaults(func=bench_port_discovery)
+
+    service_parser = subparsers.add_parser("reader-service", help=bench_reader_service.__doc__)
+    service_parser.add_argument("--visits", type=int, default=10)
+    service_parser.add_argument("--tags", type=int, default=20)
+    service_parser.add_argument("--seed", type=int, default=0)
+    service_parser.add_argument("--baud", type=int, default=57600)
+    service_parser.add_argument("--turnaround", type=float, default=0.005)
+    service_parser.set_defaults(func=bench_reader_service)
+
+    group_parser = subparsers.add_parser("reader-group", help=bench_reader_group.__doc__)
+    group_parser.add_argument("--readers", type=int, default=4)
+    group_parser.add_argument("--tags", type=int, default=50, help="tags in each reader's field")
+    group_parser.add_argument("--overlap", type=int, default=10, help="tags shared by neighbouring readers")
+    group_parser.add_argument("--seed", type=int, default=0)
+    group_parser.add_argument("--baud", type=int, default=57600)
+    group_parser.add_argument("--interval", type=float, default=0.05)
+    group_parser.set_defaults(func=bench_reader_group)
+
+    async_parser = subparsers.add_parser("async-readers", help=bench_async_readers.__doc__)
+    async_parser.add_argument("--readers", type=int, default=4)
+    async_parser.add_argument("--tags", type=int, default=30)
+    async_parser.add_argument("--rounds", type=int, default=5)
+    async_parser.add_argument("--seed", type=int, default=0)
+    async_parser.add_argument("--turnaround", type=float, default=0.02)
+    async_parser.set_defaults(func=bench_async_readers)
+
+    frames_parser = subparsers.add_parser("command-frames", help=bench_command_frames.__doc__)
+    frames_parser.add_argument("--frames", type=int, default=100000)
+    frames_parser.add_argument("--epcs", type=int, default=1000)
+    frames_parser.add_argument("--seed", type=int, default=0)
+    frames_parser.set_defaults(func=bench_command_frames)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,38 +1,20 @@
-import serial.tools.list_ports
-import sys
-import glob
+from port_discovery import port_discovery
 
-def testConnect():
-    list = serial.tools.list_ports.comports()
-    connected = []
-    for element in list:
-        connected.append(element.device)
-    print("Connected COM ports: " + str(connected))
-    # compliments of https://stackoverflow.com/questions/12090503/listing-available-com-ports-with-python#14224477
-    """ Lists serial port names
+def testConnect(probe=False):
+    """Print the serial ports and which of them look like (or answer as) a reader.
 
-        :raises EnvironmentError:
-            On unsupported or unknown platforms
-        :returns:
-            A list of the serial ports available on the system
+    Ports come from the OS's metadata; none is opened unless ``probe`` is set,
+    and then only the known reader USB IDs get the CMD_GET_WORK_MODE handshake.
     """
-    if sys.platform.startswith('win'):
-    # !attention assumes pyserial 3.x
-        ports = ['COM%s' % (i + 1) for i in range(256)]
-    elif sys.platform.startswith('linux') or sys.platform.startswith('cygwin'):
-        # this excludes your current terminal "/dev/tty"
-        ports = glob.glob('/dev/tty[A-Za-z]*')
-    elif sys.platform.startswith('darwin'):
-        ports = glob.glob('/dev/tty.*')
-    else:
-        raise EnvironmentError('Unsupported platform')
+    discovery = port_discovery()
+    connected = [port.device for port in discovery.ports(refresh=True)]
+    print("Connected COM ports: " + str(connected))
+
+    readers = [port.device for port in discovery.reader_ports()]
+    print("Reader COM ports (USB ID): " + str(readers))
+    if probe:
+        print("Reader COM ports (answered): " + str(discovery.probe(readers)))
+    return readers
 
-    result = []
-    for port in ports:
-        try:
-            s = serial.Serial(port)
-            s.close()
-            result.append(port)
-        except (OSError, serial.SerialException):
-            pass
-    print("Availible COM Ports: " + str(result))
\ No newline at end of file
+if __name__ == "__main__":
+    testConnect(probe=True)
@@ -1,16 +1,35 @@
-from pymongo import MongoClient
+from functools import cached_property
 from datetime import datetime
+from lazy_import import lazy_module
+
+pymongo = lazy_module("pymongo")  # Loaded with the first connection
 
 class Database:
-    def __init__(self):
+    def __init__(self, uri="mongodb://localhost:27017/"):
+        # Connection is opened on first use, not while the window is starting
+        self.uri = uri
+
+    @cached_property
+    def client(self):
         # Connect to MongoDB (adjust connection string as needed)
-        self.client = MongoClient("mongodb://localhost:27017/")
-        self.db = self.client["asset_management"]
-        
-        # Collections
-        self.assets = self.db["assets"]
-        self.users = self.db["users"]
-        self.transactions = self.db["transactions"]
+        return pymongo.MongoClient(self.uri)
+
+    @cached_property
+    def db(self):
+        return self.client["asset_management"]
+
+    # Collections
+    @cached_property
+    def assets(self):
+        return self.db["assets"]
+
+    @cached_property
+    def users(self):
+        return self.db["users"]
+
+    @cached_property
+    def transactions(self):
+        return self.db["transactions"]
     
     # Asset operations
     def add_asset(self, asset_data):
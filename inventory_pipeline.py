@@ -0,0 +1,254 @@
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator
+
+from command import CMD_INVENTORY, CMD_ACTIVE_INVENTORY
+from reader import Reader
+from response import ResponseView, InventoryWorkMode, STATUS_SUCCESS, hex_readable
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+HEARTBEAT: float = 0.1  # Seconds a quiet source waits before sending a heartbeat
+
+
+def parse(batches: Iterable[list[bytearray]], stats: dict | None = None) -> Iterator[bytes | None]:
+    """Raw frame batches -> EPC bytes. Frames that fail to parse are counted and skipped.
+
+    A ``None`` follows every batch (empty ones included) as a heartbeat, so
+    the stages below can act on time even while no tags come in.
+    """
+    for frames in batches:
+        for frame in frames:
+            try:
+                response = ResponseView(frame)
+                data = response.data
+            except ValueError:
+                if stats is not None:
+                    stats['bad_frames'] += 1
+                continue
+            if response.command == CMD_ACTIVE_INVENTORY:
+                yield bytes(data)
+            elif response.command == CMD_INVENTORY and data:
+                # Some readers push answer-mode style frames: count + tag blocks
+                pointer = 1
+                for _ in range(data[0]):
+                    tag_len = data[pointer]
+                    yield bytes(data[pointer + 1:pointer + 1 + tag_len])
+                    pointer += 1 + tag_len
+        yield None
+
+
+class SeenWindow:
+    """EPCs sighted within the last ``window`` seconds.
+
+    Entries are kept in last-sighting order, so those a window old are
+    evicted from the front and the dict only holds what is currently
+    passing, however long the session runs.
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._last_seen: OrderedDict[bytes | str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._last_seen)
+
+    def expire(self, now: float) -> None:
+        last_seen = self._last_seen
+        while last_seen:
+            oldest, seen_at = next(iter(last_seen.items()))
+            if now - seen_at < self.window:
+                break
+            del last_seen[oldest]
+
+    def first_sighting(self, epc: bytes | str, now: float) -> bool:
+        """Record a read; False when the EPC was already read within the window"""
+        self.expire(now)
+        repeat = epc in self._last_seen
+        self._last_seen[epc] = now
+        self._last_seen.move_to_end(epc)
+        return not repeat
+
+
+def dedupe(epcs: Iterable[bytes | None], window: float = 1.0) -> Iterator[bytes | None]:
+    """Drop repeats of the same EPC reported again within ``window`` seconds."""
+    seen = SeenWindow(window)
+    for epc in epcs:
+        if epc is None:
+            seen.expire(time.monotonic())
+            yield None
+        elif seen.first_sighting(epc, time.monotonic()):
+            yield epc
+
+
+def enrich(epcs: Iterable[bytes | None], enricher: Callable[[bytes], dict]) -> Iterator[dict | None]:
+    for epc in epcs:
+        yield None if epc is None else enricher(epc)
+
+
+def default_enricher(epc: bytes) -> dict:
+    # Active-mode frames carry only the EPC; TID is left for the lookup side
+    return {'epc': hex_readable(epc), 'tid': '', 'uid': ''}
+
+
+class BatchDeadline:
+    """When the open batch is due, shared between ``batched()`` and its source.
+
+    A source waiting for input sends its heartbeat by ``timeout()`` rather
+    than after a full ``HEARTBEAT``, so a batch is not held past its
+    ``max_delay`` just because no other tag came in.
+    """
+
+    def __init__(self) -> None:
+        self.at: float | None = None
+
+    def timeout(self) -> float:
+        at = self.at
+        if at is None:
+            return HEARTBEAT
+        return min(HEARTBEAT, max(at - time.monotonic(), 0.0))
+
+
+def batched(tags: Iterable[dict | None], max_tags: int = 64, max_delay: float = 0.05,
+            deadline: BatchDeadline | None = None) -> Iterator[list[dict]]:
+    """Group a tag stream with ``None`` heartbeats into lists.
+
+    A batch goes out once it holds ``max_tags`` tags or its first tag is
+    ``max_delay`` seconds old, whichever comes first. Without a ``deadline``
+    shared with the source, the age is only checked when the next tag or
+    heartbeat arrives.
+    """
+    deadline = deadline or BatchDeadline()
+    batch: list[dict] = []
+    for tag in tags:
+        if tag is not None:
+            if not batch:
+                deadline.at = time.monotonic() + max_delay
+            batch.append(tag)
+        if batch and (len(batch) >= max_tags or time.monotonic() >= deadline.at):
+            deadline.at = None
+            yield batch
+            batch = []
+    if batch:
+        deadline.at = None
+        yield batch
+
+
+class ContinuousInventory:
+    """Active-mode inventory as a generator pipeline: parse -> dedupe -> enrich -> emit.
+
+    ``run()`` switches the reader to active mode and starts one I/O thread
+    that blocks in the transport read and hands raw frames over a bounded
+    queue; when the consumer falls behind, the I/O thread blocks too instead
+    of buffering without limit. ``stop()`` may be called from any thread; the
+    generator then finishes, joins the I/O thread and puts the reader back
+    into answer mode.
+    """
+
+    def __init__(self, reader: Reader, enricher: Callable[[bytes], dict] = default_enricher,
+                 dedupe_window: float = 1.0, queue_size: int = 256) -> None:
+        self.reader = reader
+        self.enricher = enricher
+        self.dedupe_window = dedupe_window
+        self.stats = {'frames': 0, 'bad_frames': 0, 'tags': 0}
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._error: Exception | None = None
+        self._deadline = BatchDeadline()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def _set_inventory_mode(self, mode: InventoryWorkMode) -> None:
+        work_mode = self.reader.work_mode()
+        work_mode.inventory_work_mode = mode
+        if self.reader.set_work_mode(work_mode).status != STATUS_SUCCESS:
+            raise RuntimeError(f"Failed to set work mode to {mode.name}")
+
+    def _read_loop(self) -> None:
+        try:
+            for frames in self.reader.active_frames(self._stop):
+                self.stats['frames'] += len(frames)
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put(frames, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        except Exception as e:
+            self._error = e
+        finally:
+            self._stop.set()
+            try:
+                self._queue.put_nowait(_END)
+            except queue.Full:
+                pass  # The consumer notices the thread is gone on its next timeout
+
+    def _batches(self) -> Iterator[list[bytearray]]:
+        while True:
+            try:
+                item = self._queue.get(timeout=self._deadline.timeout())
+            except queue.Empty:
+                if self._thread.is_alive():
+                    yield []  # Let the heartbeat through while the reader is quiet
+                    continue
+                item = _END
+            if item is _END:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item
+
+    def _pipeline(self) -> Iterator[dict | None]:
+        self._set_inventory_mode(InventoryWorkMode.ACTIVE_MODE)
+        self._thread = threading.Thread(target=self._read_loop, name="active-inventory", daemon=True)
+        self._thread.start()
+        failed = True
+        try:
+            for tag in enrich(dedupe(parse(self._batches(), self.stats), self.dedupe_window), self.enricher):
+                if tag is not None:
+                    self.stats['tags'] += 1
+                yield tag
+            failed = False
+        finally:
+            self._stop.set()
+            self._thread.join()
+            # Frames still in flight are skipped by the reader; clearing the
+            # buffer here could cut a frame in half and desync the stream
+            try:
+                self._set_inventory_mode(InventoryWorkMode.ANSWER_MODE)
+            except Exception:
+                if not failed:
+                    raise
+                # Don't mask the error that ended the run (often the same dead link)
+                logger.exception("Could not put the reader back into answer mode")
+
+    def run(self) -> Iterator[dict]:
+        for tag in self._pipeline():
+            if tag is not None:
+                yield tag
+
+    def run_batched(self, max_tags: int = 64, max_delay: float = 0.05) -> Iterator[list[dict]]:
+        """Like ``run()``, but yields lists of tags; see ``batched()``"""
+        self._deadline = BatchDeadline()
+        return batched(self._pipeline(), max_tags, max_delay, self._deadline)
+
+# # Contoh penggunaan
+# inventory = ContinuousInventory(Reader(SerialTransport("COM8", 57600)))
+# for tag in inventory.run():
+#     print(tag['epc'])
+#     if selesai:
+#         inventory.stop()
+#
+# # Atau per batch, satu update UI per batch
+# for tags in inventory.run_batched(max_tags=64, max_delay=0.05):
+#     print(len(tags))
@@ -0,0 +1,35 @@
+import importlib
+import importlib.util
+import sys
+
+
+def lazy_module(name: str):
+    """Module object for ``name`` that is only executed on first attribute access.
+
+    For heavy dependencies (requests, pymongo, serial) that a feature needs
+    but the menu does not: ``requests = lazy_module("requests")`` at the top
+    of a module costs nothing until ``requests.Session`` is touched. Parent
+    packages of a dotted name are imported right away.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def import_attr(module: str, attr: str):
+    """``from module import attr``, done at call time"""
+    return getattr(importlib.import_module(module), attr)
+
+# # Contoh penggunaan
+# requests = lazy_module("requests")  # belum di-load
+# session = requests.Session()        # di-load di sini
+# ManagementPage = import_attr("management_page", "ManagementPage")
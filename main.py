@@ -1,24 +1,27 @@
 import sys
+import time
+_START = time.perf_counter()  # Startup timing: everything below counts as imports
+
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                             QHBoxLayout, QLabel, QPushButton, QStackedWidget)
+                             QHBoxLayout, QLabel, QPushButton, QStackedWidget, QMessageBox)
 from PyQt6.QtGui import QIcon, QPixmap
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QObject, QEvent, QTimer
 from database import Database
 from widgets import MenuCard
-from tracking_page import TrackingPage
-from borrowing_page import BorrowingPage
-from returning_page import ReturningPage
-from purchasing_page import PurchasingPage
-from management_page import ManagementPage
 from rfid_reader import RFIDReader
+from api_executor import api_executor, shutdown_api_executor
+from lazy_import import import_attr
+
+_IMPORTS_DONE = time.perf_counter()
 
 class AssetManagementApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Asset Management System")
         self.setGeometry(100, 100, 1000, 700)
+        self.page_timings = {}  # Page name -> construction time in seconds
         
-        # Initialize database
+        # Initialize database (connects on first use)
         self.db = Database()
         
         # Setup UI
@@ -45,6 +48,22 @@ class AssetManagementApp(QMainWindow):
         
         # Show main menu first
         self.show_main_menu()
+
+    def start_background_sync(self):
+        """Fill and refresh the local asset replica, and resend transactions queued last run"""
+        start_asset_sync = import_attr("asset_replica", "start_asset_sync")
+        start_asset_sync(api_executor().api_base, session=api_executor().session)
+        queue = import_attr("transaction_queue", "transaction_queue")(start=False)
+        # Added before the journal is replayed: no page is open yet to hear about last run's transactions
+        queue.add_listener("app", lambda transaction: api_executor().call_in_gui(
+            self._replayed_transaction_settled, transaction))
+        queue.start()
+
+    def _replayed_transaction_settled(self, transaction):
+        """Show rejections of transactions queued in an earlier run (GUI thread)"""
+        if transaction.replayed and transaction.status == "rejected":
+            QMessageBox.warning(self, "Warning", f"A {transaction.kind} queued earlier was rejected by the server: "
+                                                 f"{transaction.error}")
     
     def create_header(self):
         """Create the application header"""
@@ -56,38 +75,46 @@ class AssetManagementApp(QMainWindow):
         self.main_layout.addLayout(self.header_layout)
     
     def init_pages(self):
-        """Initialize all content pages"""
+        """Register the content pages; each one is built on first navigation"""
         # Main Menu Page
         self.main_menu_page = QWidget()
         self.main_menu_layout = QVBoxLayout(self.main_menu_page)
         self.create_menu_cards()
         self.stacked_widget.addWidget(self.main_menu_page)
-        
-        # Tracking page
-        self.tracking_page = TrackingPage(self.db)
-        self.stacked_widget.addWidget(self.tracking_page)
-        
-        # Borrowing page
-        self.borrowing_page = BorrowingPage(self.db)
-        self.stacked_widget.addWidget(self.borrowing_page)
-        
-        # Returning page
-        self.returning_page = ReturningPage(self.db)
-        self.stacked_widget.addWidget(self.returning_page)
-        
-        # Purchasing page
-        self.purchasing_page = PurchasingPage(self.db)
-        self.stacked_widget.addWidget(self.purchasing_page)
 
         # Initialize RFID reader
         self.rfid_reader = RFIDReader()
-        
-        # Management page
-        self.management_page = ManagementPage(self.db, self.rfid_reader)
-        self.stacked_widget.addWidget(self.management_page)
+
+        # Page modules (and requests, serial, ... behind them) are imported
+        # by the factory, so only pages that are opened cost import time
+        self.pages = {}
+        self.page_factories = {
+            "tracking": lambda: import_attr("tracking_page", "TrackingPage")(self.db),
+            "borrowing": lambda: import_attr("borrowing_page", "BorrowingPage")(self.db),
+            "returning": lambda: import_attr("returning_page", "ReturningPage")(self.db),
+            "purchasing": lambda: import_attr("purchasing_page", "PurchasingPage")(self.db),
+            "management": lambda: import_attr("management_page", "ManagementPage")(self.db, self.rfid_reader),
+            "stocktake": lambda: import_attr("stock_take_page", "StockTakePage")(self.db),
+        }
+
+    def page(self, name):
+        """The page registered as ``name``, created and added to the stack on first use"""
+        page = self.pages.get(name)
+        if page is None:
+            start = time.perf_counter()
+            page = self.page_factories[name]()
+            self.stacked_widget.addWidget(page)
+            if hasattr(page, 'back_button'):
+                page.back_button.clicked.connect(self.show_main_menu)
+            self.pages[name] = page
+            self.page_timings[name] = time.perf_counter() - start
+        return page
+
+    def show_page(self, name):
+        self.stacked_widget.setCurrentWidget(self.page(name))
         
     def create_menu_cards(self):
-        """Create menu cards in 2 rows (3 top, 2 bottom centered)"""
+        """Create menu cards in 2 rows of 3"""
         # Clear existing layout
         while self.main_menu_layout.count():
             child = self.main_menu_layout.takeAt(0)
@@ -108,33 +135,39 @@ class AssetManagementApp(QMainWindow):
             "Tracking", 
             "Lacak Asset", 
             "icons/tracking.png",
-            lambda: self.stacked_widget.setCurrentWidget(self.tracking_page)
+            lambda: self.show_page("tracking")
         )
         borrowing_card = MenuCard(
             "Borrowing", 
             "Peminjaman Asset", 
             "icons/borrowing.png",
-            lambda: self.stacked_widget.setCurrentWidget(self.borrowing_page)
+            lambda: self.show_page("borrowing")
         )
         returning_card = MenuCard(
             "Returning", 
             "Pengembalian Asset", 
             "icons/returning.png",
-            lambda: self.stacked_widget.setCurrentWidget(self.returning_page)
+            lambda: self.show_page("returning")
         )
         
-        # Create cards for bottom row (2 cards)
+        # Create cards for bottom row (3 cards)
         purchasing_card = MenuCard(
             "Purchasing", 
             "Pembelian Asset", 
             "icons/purchasing.png",
-            lambda: self.stacked_widget.setCurrentWidget(self.purchasing_page)
+            lambda: self.show_page("purchasing")
         )
         management_card = MenuCard(
             "Management", 
             "Manajemen Asset", 
             "icons/management.png",
-            lambda: self.stacked_widget.setCurrentWidget(self.management_page)
+            lambda: self.show_page("management")
+        )
+        stocktake_card = MenuCard(
+            "Stock Take",
+            "Stock Opname Ruangan",
+            "icons/tracking.png",
+            lambda: self.show_page("stocktake")
         )
         
         # Add cards to rows
@@ -144,6 +177,7 @@ class AssetManagementApp(QMainWindow):
         
         bottom_row.addWidget(purchasing_card)
         bottom_row.addWidget(management_card)
+        bottom_row.addWidget(stocktake_card)
         
         # Add rows to main layout
         self.main_menu_layout.addLayout(top_row)
@@ -151,15 +185,26 @@ class AssetManagementApp(QMainWindow):
         self.main_menu_layout.addStretch()
     
     def show_main_menu(self):
-        """Show main menu and setup back button on all pages"""
+        """Show main menu; pages hook up their back button when created"""
         self.stacked_widget.setCurrentWidget(self.main_menu_page)
-        
-        # Setup back button for all pages
-        for page in [self.tracking_page, self.borrowing_page, self.returning_page, 
-                    self.purchasing_page, self.management_page]:
-            if hasattr(page, 'back_button'):
-                page.back_button.clicked.connect(self.show_main_menu)
     
+    def closeEvent(self, event):
+        """Stop the background API workers, the asset sync, the transaction queue and the shared reader on exit"""
+        asset_replica = sys.modules.get("asset_replica")
+        if asset_replica is not None:
+            asset_replica.stop_asset_sync()
+        auth_service = sys.modules.get("auth_service")
+        if auth_service is not None:
+            auth_service.shutdown_auth_sessions()
+        transaction_queue = sys.modules.get("transaction_queue")
+        if transaction_queue is not None:  # Unsent transactions stay in its journal
+            transaction_queue.shutdown_transaction_queue()
+        shutdown_api_executor()
+        reader_service = sys.modules.get("reader_service")
+        if reader_service is not None:  # Only loaded once a reader page was opened
+            reader_service.shutdown_reader_service()
+        super().closeEvent(event)
+
     def apply_styles(self):
         """Apply styles to the application"""
         try:
@@ -179,8 +224,45 @@ class AssetManagementApp(QMainWindow):
                 }
             """)
 
+class StartupTimer(QObject):
+    """``--startup-timing``: report import, window and per-page construction time
+    and time-to-first-frame, then quit.
+
+    The first frame is the window's first paint; pages are built afterwards,
+    one by one, only to time them.
+    """
+
+    def __init__(self, window, window_start, window_done):
+        super().__init__()
+        self.window = window
+        self.window_start = window_start
+        self.window_done = window_done
+        window.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() == QEvent.Type.Paint:
+            self.window.removeEventFilter(self)
+            first_frame = time.perf_counter()
+            QTimer.singleShot(0, lambda: self.report(first_frame))
+        return False
+
+    def report(self, first_frame):
+        ms = lambda seconds: f"{seconds * 1000:8.1f} ms"
+        print(f"imports            {ms(_IMPORTS_DONE - _START)}")
+        print(f"main window        {ms(self.window_done - self.window_start)}")
+        print(f"first frame        {ms(first_frame - _START)}  (since start of main.py)")
+        for name in self.window.page_factories:
+            self.window.page(name)
+            print(f"page {name:<13} {ms(self.window.page_timings[name])}")
+        QApplication.instance().quit()
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    window_start = time.perf_counter()
     window = AssetManagementApp()
+    if "--startup-timing" in sys.argv:
+        startup_timer = StartupTimer(window, window_start, time.perf_counter())
+    else:
+        QTimer.singleShot(0, window.start_background_sync)  # After the first frame, off the import budget
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
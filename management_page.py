@@ -4,175 +4,45 @@ from PyQt6.QtWidgets import (
     QHeaderView, QMessageBox, QLineEdit, QComboBox,
     QDateEdit, QSpinBox, QDoubleSpinBox, QTextEdit,
     QGroupBox, QScrollArea, QStackedWidget, QApplication, 
-    QCheckBox, QFrame, QProgressDialog
+    QCheckBox, QFrame, QProgressDialog, QTableView, QAbstractItemView
 )
-from PyQt6.QtCore import Qt, QDate, pyqtSignal, QThread
+from PyQt6.QtCore import Qt, QDate, pyqtSignal
 from PyQt6.QtGui import QIcon, QBrush, QColor
-import serial.tools.list_ports
 from typing import Iterator
-from response import hex_readable, Response, WorkMode, InventoryWorkMode, InventoryMemoryBank
-from transport import SerialTransport
-from reader import Reader
-import check_connection
-import time
-
-class RFIDReaderThread(QThread):
-    tag_scanned = pyqtSignal(dict)  # {'uid': '...', 'epc': '...', 'tid': '...'}
-    reader_status = pyqtSignal(str)  # Status messages
-    error_occurred = pyqtSignal(str)  # Error messages
-
-    def __init__(self):
-        super().__init__()
-        self.reader = None
-        self.transport = None
-        self.is_running = False
-        self.current_port = None
-        self.power_level = 30  # Default power level
-        self.should_scan = False  # Flag untuk kontrol scanning
-
-    def connect_reader(self, port: str):
-        """Initialize connection to RFID reader""" 
-        try:
-            check_connection.testConnect()
-            print(f"DEBUG: Connecting to RFID reader on port {port}...")
-            self.current_port = port
-            self.transport = SerialTransport(port, 57600)
-            self.reader = Reader(self.transport)
-            
-            # Configure reader settings
-            print("DEBUG: Setting power level...")
-            response_power = self.reader.set_power(self.power_level)
-            if response_power.status != 0x00:
-                raise Exception(f"Failed to set power: {hex(response_power.status)}")
-            
-            print("DEBUG: Power level set successfully.")
-
-            print("DEBUG: Setting work mode to ANSWER_MODE...")
-            work_mode = self.reader.work_mode()
-            work_mode.inventory_work_mode = InventoryWorkMode.ANSWER_MODE
-            response_mode = self.reader.set_work_mode(work_mode)
-            if response_mode.status != 0x00:
-                raise Exception(f"Failed to set work mode: {hex(response_mode.status)}")
-            print("DEBUG: Work mode set successfully.")
-            self.reader_status.emit(f"Connected to {port} at 57600 baud")
-            print(f"DEBUG: Successfully connected to {port}.")
-            return True
-            
-        except Exception as e:
-            print(f"DEBUG: Connection failed with error: {str(e)}")
-            self.error_occurred.emit(f"Connection failed: {str(e)}")
-            return False
-    
-    def disconnect_reader(self):
-        """Close connection to RFID reader"""
-        try:
-            print("DEBUG: Disconnecting RFID reader...")
-            if self.reader:
-                self.reader.close()
-            self.reader = None
-            self.transport = None
-            self.reader_status.emit("Reader disconnected")
-            print("DEBUG: RFID reader disconnected.")
-            return True
-        except Exception as e:
-            print(f"DEBUG: Disconnection failed with error: {str(e)}")
-            self.error_occurred.emit(f"Disconnection failed: {str(e)}")
-            return False
-
-    def start_scanning(self):
-        """Start the scanning process"""
-        self.should_scan = True
-        self.is_running = True
-        self.reader_status.emit("Ready to scan")
-
-    def stop_scanning(self):
-        """Stop the scanning process"""
-        self.should_scan = False
-        self.is_running = False
-        self.reader_status.emit("Scan stopped")
-
-    def run(self):
-        """Main thread loop"""
-        try:
-            if not self.reader:
-                raise Exception("Reader not connected")
-            
-            while True:
-                if self.should_scan:
-                    self._perform_scan()
-                time.sleep(0.1)  # Reduce CPU usage
-                
-        except Exception as e:
-            print(f"DEBUG: Thread error: {str(e)}")
-            self.error_occurred.emit(f"Thread error: {str(e)}")
-        finally:
-            self.is_running = False
-            self.reader_status.emit("Thread stopped")
-
-    def _read_tid(self, epc: bytes) -> str:
-        """Read TID from tag"""
-        try:
-            print(f"DEBUG: Reading TID for EPC: {hex_readable(epc)}...")
-            response = self.reader.read_memory(
-                epc=epc,
-                memory_bank=InventoryMemoryBank.TID.value,
-                start_address=2,
-                length=4
-            )
-            if response.status == 0x00:
-                tid_data = hex_readable(response.data)
-                print(f"DEBUG: TID read successfully: {tid_data}")
-                return tid_data
-            else:
-                print(f"DEBUG: Failed to read TID. Status: {hex(response.status)}")
-                return ""
-        except Exception as e:
-            print(f"DEBUG: Error reading TID: {str(e)}")
-            return ""
-
-    def _perform_scan(self):
-        """Perform actual tag scanning"""
-        try:
-            self.reader_status.emit("Scanning for tags...")
-            print("DEBUG: Scanning for tags...")
-            
-            # Inventory tags
-            tags = list(self.reader.inventory_answer_mode())  # Convert generator to list
-            if not tags:
-                print("DEBUG: No tags detected.")
-                return
-
-            print(f"DEBUG: Detected {len(tags)} tag(s).")
-
-            for tag in tags:
-                epc = hex_readable(tag)
-                print(f"DEBUG: EPC detected: {epc}")
-                tid = self._read_tid(tag)
-                print(f"DEBUG: TID read: {tid}")
-                self.tag_scanned.emit({
-                    'epc': epc,
-                    'tid': tid,
-                    'uid': tid  # Using TID as UID if needed
-                })
-                
-        except Exception as e:
-            self.disconnect_reader()
-            print(f"DEBUG: Scan error: {str(e)}")
-            self.error_occurred.emit(f"Scan error: {str(e)}")
-            self.stop_scanning()
+from port_discovery import port_discovery
+from reader_service import reader_service
+from api_executor import api_executor
+from asset_cache import asset_cache
+from asset_replica import asset_replica
+from asset_client import AssetClient
+from asset_table_model import AssetTableModel, AssetFilterProxyModel, ID_COLUMN, NAME_COLUMN, UID_COLUMN
+from functools import partial
 
 class ManagementPage(QWidget):
     # Signal untuk menerima data RFID
     rfid_scanned = pyqtSignal(dict)  # Format: {'uid': '...', 'epc': '...'}
     reader_connected = pyqtSignal(bool)  # True if connected
 
+    # Asset list loading: the first page is shown as soon as it arrives. With
+    # fetch_assets_on_scroll the next page is only requested when the table is
+    # scrolled to the end; otherwise pages keep coming, growing up to
+    # asset_chunk_max rows each.
+    asset_page_size = 200
+    asset_chunk_max = 5000
+    fetch_assets_on_scroll = True
+
     def __init__(self, db, rfid_reader):
         super().__init__()
         self.db = db
         self.rfid_reader = rfid_reader  # RFID reader instance
         self.current_asset_id = None
         self.is_reader_connected = False
-        self.rfid_thread = RFIDReaderThread()
+        self.reader = reader_service().subscribe(with_tid=True, dedupe=False)  # The form wants the TID of every round
+        self.api = api_executor()
+        self.asset_client = AssetClient(self.api.api_base, session=self.api.session, cache=asset_cache(),
+                                        replica=asset_replica())
+        self._assets_generation = 0  # Bumped per load_assets(); older pages are dropped
+        self._assets_shown = False
         
         # Main stacked widget for page navigation
         self.stack = QStackedWidget()
@@ -197,14 +67,22 @@ class ManagementPage(QWidget):
         # Show main page first
         self.stack.setCurrentWidget(self.main_page)
              
-        # Load initial data
-        self.load_assets()
+        # Initial data is loaded when the page is first shown (showEvent)
+        self._assets_requested = False
 
         self._setup_rfid_connections()
 
-    def _handle_rfid_scan(self, tag_data: dict):
-        """Handle scanned RFID tag data"""
-        print(f"DEBUG: RFID tag scanned: {tag_data}")
+    def showEvent(self, event):
+        """Load the asset list the first time the page becomes visible"""
+        super().showEvent(event)
+        if not self._assets_requested:
+            self._assets_requested = True
+            self.load_assets()
+
+    def _handle_rfid_scan(self, tags: list):
+        """Handle one inventory round; the form takes the first tag"""
+        tag_data = tags[0]
+        print(f"DEBUG: RFID tag scanned: {tag_data} ({len(tags)} in round)")
         current_page = self.stack.currentWidget()
         
         if current_page == self.input_page:
@@ -215,16 +93,20 @@ class ManagementPage(QWidget):
             self.update_txt_epc.setText(tag_data.get('epc', ''))
         
         # Auto-stop scanning after successful read
-        if self.rfid_thread.is_running:
-            self.rfid_thread.stop_scanning()
+        if self.reader.scanning:
+            self.reader.stop_scanning()
             self.btn_scan.setText("Scan RFID Tag")
 
     def _setup_rfid_connections(self):
-        """Connect RFID thread signals to slots"""
-        self.rfid_thread.tag_scanned.connect(self._handle_rfid_scan)
-        self.rfid_thread.reader_status.connect(self._update_reader_status)
-        self.rfid_thread.error_occurred.connect(self._handle_rfid_error)
-        self.reader_connected.connect(self._handle_reader_connection)
+        """Connect the shared reader's signals to slots"""
+        self.reader.tags_scanned.connect(self._handle_rfid_scan)
+        self.reader.reader_status.connect(self._update_reader_status)
+        service = reader_service()
+        service.reader_status.connect(self._update_reader_status)
+        service.error_occurred.connect(self._handle_rfid_error)
+        service.connection_changed.connect(self.reader_connected)
+        # Another page may already have connected the reader
+        self._handle_reader_connection(service.connected)
 
     def _update_reader_status(self, message: str):
         """Update connection status message"""
@@ -258,19 +140,15 @@ class ManagementPage(QWidget):
     def _handle_rfid_error(self, error_msg: str):
         """Handle RFID reader errors"""
         print(f"DEBUG: RFID error occurred: {error_msg}")
-        QMessageBox.critical(self, "RFID Error", error_msg)
+        if self.isVisible():  # Errors of the shared reader reach every page
+            QMessageBox.critical(self, "RFID Error", error_msg)
         self._update_connection_ui(False)
     
     def closeEvent(self, event):
         """Clean up when window is closed"""
         try:
-            if self.rfid_thread.isRunning():
-                self.rfid_thread.stop_scanning()
-                self.rfid_thread.quit()
-                self.rfid_thread.wait(1000)
-                
-                if self.rfid_thread.isRunning():
-                    self.rfid_thread.terminate()
+            # The reader stays connected for the other pages
+            self.reader.close()
         except Exception as e:
             print(f"Error during cleanup: {str(e)}")
             
@@ -352,29 +230,45 @@ class ManagementPage(QWidget):
 
         layout.addLayout(btn_layout)
 
-        # Asset table
-        self.table_assets = QTableWidget()
-        self.table_assets.setColumnCount(11)
-        self.table_assets.setHorizontalHeaderLabels([
-        "ID", "Nama", "RFID UID", "Kategori", 
-        "Status", "Jumlah", "Unit", "Harga", 
-        "Tanggal Pembelian", "Lokasi", "Masa Garansi"
-        ])
+        # Filter box
+        self.txt_filter = QLineEdit()
+        self.txt_filter.setPlaceholderText("Cari aset...")
+        self.txt_filter.setClearButtonEnabled(True)
+        layout.addWidget(self.txt_filter)
+
+        # Loading / error state of the asset list
+        self.lbl_assets_status = QLabel()
+        self.lbl_assets_status.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.lbl_assets_status.setVisible(False)
+        layout.addWidget(self.lbl_assets_status)
+
+        # Asset table: column-store model, filtered through the proxy
+        self.asset_model = AssetTableModel(self)
+        self.asset_proxy = AssetFilterProxyModel(self)
+        self.asset_proxy.setSourceModel(self.asset_model)
+        self.txt_filter.textChanged.connect(self.asset_proxy.set_filter_text)
+
+        self.table_assets = QTableView()
+        self.table_assets.setModel(self.asset_proxy)
+        self.table_assets.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_assets.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table_assets.verticalHeader().setVisible(False)
         # Atur lebar kolom
         self.table_assets.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)  # ID
         self.table_assets.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)  # Nama
         self.table_assets.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)  # UID
         self.table_assets.horizontalHeader().setSectionResizeMode(10, QHeaderView.ResizeMode.ResizeToContents)  # Masa Garansi
+        # Size the ResizeToContents columns from a sample of rows, not all of them
+        self.table_assets.horizontalHeader().setResizeContentsPrecision(100)
         layout.addWidget(self.table_assets)
 
-        # Enable custom sorting for price column
+        # The model sorts its own columns; price and quantity sort numerically
         self.table_assets.setSortingEnabled(True)
         self.table_assets.sortByColumn(0, Qt.SortOrder.AscendingOrder)
-        self.table_assets.horizontalHeader().sectionClicked.connect(self._handle_header_click)
 
         # Style table
         self.table_assets.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #e0e0e0;
                 font-size: 12px;
             }
@@ -384,7 +278,7 @@ class ManagementPage(QWidget):
                 border: 1px solid #e0e0e0;
                 font-weight: bold;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 3px;
             }
         """)
@@ -393,11 +287,13 @@ class ManagementPage(QWidget):
         self.table_assets.setAlternatingRowColors(True)
 
         return page
-    
-    def _handle_header_click(self, logical_index):
-        """Handle custom sorting for price column"""
-        if logical_index == 7:  # Price column
-            self.table_assets.sortItems(logical_index, self.table_assets.horizontalHeader().sortIndicatorOrder())
+
+    def _selected_asset_row(self) -> int | None:
+        """Source-model row of the selected asset, or None"""
+        selected = self.table_assets.selectionModel().selectedRows()
+        if not selected:
+            return None
+        return self.asset_proxy.mapToSource(selected[0]).row()
 
     def _create_input_page(self):
         """Create the new asset input form page"""
@@ -630,16 +526,17 @@ class ManagementPage(QWidget):
     def _refresh_com_ports(self):
         """Refresh list of available COM ports"""
         self.cb_com_ports.clear()
-        ports = serial.tools.list_ports.comports()
+        # Known reader USB IDs come first, so the likely reader is preselected
+        ports = port_discovery().ports()
         for port in ports:
-            self.cb_com_ports.addItem(f"{port.device} - {port.description}")
+            self.cb_com_ports.addItem(port.label())
         
         if not ports:
             self.cb_com_ports.addItem("No COM ports found")
 
     def _toggle_reader_connection(self):
         """Connect or disconnect from RFID reader"""
-        if self.rfid_thread.isRunning():
+        if self.reader.connected:
             # Jika sudah terhubung, lakukan disconnect
             self._disconnect_reader()
         else:
@@ -653,30 +550,18 @@ class ManagementPage(QWidget):
     def _connect_reader(self, port: str):
         """Connect to RFID reader"""
         try:
-            check_connection.testConnect()
             # Update UI untuk status connecting
             self.btn_connect.setEnabled(False)
             self.btn_connect.setText("Connecting...")
             self.lbl_connection_status.setText("Status: Connecting...")
             QApplication.processEvents()  # Memastikan UI update
             
-            # Setup dan mulai thread
-            self.rfid_thread.current_port = port
-            if not self.rfid_thread.connect_reader(port):
+            # Koneksi dipakai bersama; connection_changed meng-update semua halaman
+            if not reader_service().connect_reader(port):
                 raise Exception("Failed to initialize reader connection")
-                
-            # Mulai thread scanning
-            self.rfid_thread.start()
-            
-            # Tunggu sebentar untuk memastikan koneksi stabil
-            time.sleep(0.5)
-            
-            # Update status
-            self.reader_connected.emit(True)
             
         except Exception as e:
             print(f"Connection error: {str(e)}")
-            self.rfid_thread.disconnect_reader()
             self.reader_connected.emit(False)
             QMessageBox.critical(self, "Error", f"Failed to connect: {str(e)}")
         finally:
@@ -690,21 +575,8 @@ class ManagementPage(QWidget):
             self.btn_connect.setText("Disconnecting...")
             QApplication.processEvents()
             
-            # Stop scanning dan disconnect
-            if self.rfid_thread.is_running:
-                self.rfid_thread.stop_scanning()
-                
-            # Beri waktu untuk thread berhenti
-            self.rfid_thread.quit()
-            self.rfid_thread.wait(1000)  # Tunggu maksimal 1 detik
-            
-            # Pastikan reader benar-benar terputus
-            if self.rfid_thread.isRunning():
-                self.rfid_thread.terminate()
-                
-            # Update status
-            self.reader_connected.emit(False)
-            self.rfid_thread.disconnect_reader()
+            # Stop semua scan (juga di halaman lain) dan tutup port
+            reader_service().disconnect_reader()
             
         except Exception as e:
             print(f"Disconnection error: {str(e)}")
@@ -718,11 +590,11 @@ class ManagementPage(QWidget):
             QMessageBox.warning(self, "Warning", "Please connect to reader first")
             return
             
-        if self.rfid_thread.is_running:
-            self.rfid_thread.stop_scanning()
+        if self.reader.scanning:
+            self.reader.stop_scanning()
             self.btn_scan.setText("Scan RFID Tag")
         else:
-            self.rfid_thread.start()
+            self.reader.start_scanning()
             self.btn_scan.setText("Stop Scanning")
             
     def _handle_reader_connection(self, connected):
@@ -755,16 +627,16 @@ class ManagementPage(QWidget):
             QMessageBox.warning(self, "Warning", "Please connect to RFID reader first")
             return
             
-        if self.rfid_thread.is_running and self.rfid_thread.should_scan:
+        if self.reader.scanning:
             # Stop scanning
-            self.rfid_thread.stop_scanning()
+            self.reader.stop_scanning()
             self.btn_scan.setText("Scan RFID Tag")
             self.btn_scan.setIcon(QIcon("icons/rfid.png"))
         else:
             # Start scanning
             self.btn_scan.setText("Stop Scanning")
             self.btn_scan.setIcon(QIcon("icons/stop.png"))
-            self.rfid_thread.start_scanning()
+            self.reader.start_scanning()
 
     def _create_update_page(self):
         """Create the asset update form page"""
@@ -985,138 +857,83 @@ class ManagementPage(QWidget):
         pass
 
     def load_assets(self):
-        """Load assets from API and display in table"""
-        try:
-            # Clear table
-            self.table_assets.setRowCount(0)
-            
-            # Show loading state
-            self.table_assets.setSortingEnabled(False)
-            loading_row = self.table_assets.rowCount()
-            self.table_assets.insertRow(loading_row)
-            loading_item = QTableWidgetItem("Memuat data...")
-            loading_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table_assets.setItem(loading_row, 0, loading_item)
-            self.table_assets.setSpan(loading_row, 0, 1, self.table_assets.columnCount())
-            QApplication.processEvents()
-
-            # Fetch data from API
-            assets = self._get_assets_from_api()
-            
-            # Remove loading row
-            self.table_assets.removeRow(loading_row)
-            
-            if not assets:
-                self.table_assets.setRowCount(0)
-                return
+        """Load assets from API and display in table, page by page"""
+        self._assets_generation += 1
+        self._assets_shown = False
+        self.asset_model.set_fetch_more(None)
+
+        # Show loading state; the current rows stay until the first page arrives
+        self.lbl_assets_status.setStyleSheet("")
+        self.lbl_assets_status.setText("Memuat data...")
+        self.lbl_assets_status.setVisible(True)
+        self._load_asset_page(None, self.asset_page_size)
+
+    def _load_asset_page(self, cursor, limit):
+        """Fetch one page off the GUI thread; its rows arrive via _add_asset_rows"""
+        generation = self._assets_generation
+        self.api.submit(self._get_assets_from_api, generation, cursor, limit,
+                        on_success=partial(self._asset_page_done, generation, limit),
+                        on_error=partial(self._show_assets_error, generation))
+
+    def _add_asset_rows(self, generation, assets):
+        """Show a chunk of assets; the first chunk of a load replaces the table"""
+        if generation != self._assets_generation:
+            return
+        if not self._assets_shown:
+            self._assets_shown = True
+            self.lbl_assets_status.setVisible(False)
+            self.asset_model.set_assets(assets)
+        else:
+            self.asset_model.add_assets(assets)
 
-            # Populate table
-            for asset in assets:
-                row = self.table_assets.rowCount()
-                self.table_assets.insertRow(row)
-                
-                # Handle masaGaransi if exists
-                masa_garansi = asset.get('masaGaransi', {})
-                garansi_text = ""
-                if masa_garansi:
-                    garansi_text = f"{masa_garansi.get('from', '')} s/d {masa_garansi.get('to', '')}"
-
-                self.table_assets.setItem(row, 0, QTableWidgetItem(str(asset.get('_id', ''))))
-                self.table_assets.setItem(row, 1, QTableWidgetItem(asset.get('name', '')))
-                self.table_assets.setItem(row, 2, QTableWidgetItem(asset.get('rfidTag', {}).get('uid', '')))
-                self.table_assets.setItem(row, 3, QTableWidgetItem(asset.get('kategori', '')))
-                self.table_assets.setItem(row, 4, QTableWidgetItem(asset.get('status', '')))
-                self.table_assets.setItem(row, 5, QTableWidgetItem(str(asset.get('jumlah', 1))))
-                self.table_assets.setItem(row, 6, QTableWidgetItem(asset.get('unit', 'pcs')))
-                
-                # Format price with currency
-                price = asset.get('price', 0)
-                price_item = QTableWidgetItem(f"Rp {price:,.0f}")
-                price_item.setData(Qt.ItemDataRole.UserRole, price)  # Store raw value for sorting
-                self.table_assets.setItem(row, 7, price_item)
-                
-                self.table_assets.setItem(row, 8, QTableWidgetItem(asset.get('tanggalPembelian', '')))
-                self.table_assets.setItem(row, 9, QTableWidgetItem(asset.get('location', '')))
-                self.table_assets.setItem(row, 10, QTableWidgetItem(garansi_text))
+    def _asset_page_done(self, generation, limit, next_cursor):
+        """Queue the next page, now or when the table is scrolled to the end"""
+        if generation != self._assets_generation:
+            return
+        if not self._assets_shown:
+            self._add_asset_rows(generation, [])  # Nothing came: clear the table
+        if next_cursor is None:
+            return
+        if self.fetch_assets_on_scroll:
+            self.asset_model.set_fetch_more(partial(self._load_asset_page, next_cursor, limit))
+        else:
+            self._load_asset_page(next_cursor, min(limit * 2, self.asset_chunk_max))
 
-            # Enable sorting
-            self.table_assets.setSortingEnabled(True)
-            
-        except Exception as e:
-            self.table_assets.setRowCount(0)
-            
-            # Add error row
-            error_row = self.table_assets.rowCount()
-            self.table_assets.insertRow(error_row)
-            error_item = QTableWidgetItem(f"Error: {str(e)}")
-            error_item.setForeground(QBrush(QColor(255, 0, 0)))  # Red text
-            error_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table_assets.setItem(error_row, 0, error_item)
-            self.table_assets.setSpan(error_row, 0, 1, self.table_assets.columnCount())
-            
-            # Add retry button
-            retry_row = self.table_assets.rowCount()
-            self.table_assets.insertRow(retry_row)
-            retry_item = QTableWidgetItem()
-            self.table_assets.setItem(retry_row, 0, retry_item)
-            
-            retry_button = QPushButton("Coba Lagi")
-            retry_button.clicked.connect(self.load_assets)
-            retry_button.setStyleSheet("padding: 3px;")
-            self.table_assets.setCellWidget(retry_row, 0, retry_button)
-            self.table_assets.setSpan(retry_row, 0, 1, self.table_assets.columnCount())
-            
-    def _get_assets_from_api(self):
-        """Helper method to get assets from API"""
+    def _show_assets_error(self, generation, e):
+        """Show the load error; rows already loaded stay, Refresh retries"""
+        if generation != self._assets_generation:
+            return
+        if not self._assets_shown:
+            self._assets_shown = True
+            self.asset_model.set_assets([])
+        self.lbl_assets_status.setStyleSheet("color: red;")
+        self.lbl_assets_status.setText(f"Error: {str(e)} (klik Refresh untuk mencoba lagi)")
+        self.lbl_assets_status.setVisible(True)
+        
+    def _get_assets_from_api(self, generation, cursor, limit):
+        """Worker: stream one page of assets to the table, return the next cursor"""
         try:
-            import requests
             from requests.exceptions import RequestException
-            
-            print("[DEBUG] Mengirim request GET ke http://localhost:5000/api/assets")
-            response = requests.get('http://localhost:5000/api/assets', timeout=10)
-            print(f"[DEBUG] Response status code: {response.status_code}")
-            
-            # Debugging: Print raw response content
-            print(f"[DEBUG] Raw response content: {response.text[:200]}...")  # Print first 200 chars
-            
-            try:
-                json_data = response.json()
-                print("[DEBUG] Response JSON parsed successfully")
-                print(f"[DEBUG] JSON keys: {json_data.keys() if isinstance(json_data, dict) else 'response is not a dict'}")
-                
-                # Handle different response formats
-                if isinstance(json_data, list):
-                    print("[DEBUG] Response is a list, returning directly")
-                    return json_data
-                elif isinstance(json_data, dict):
-                    print("[DEBUG] Response is a dictionary, checking for 'data' key")
-                    if 'data' in json_data:
-                        print(f"[DEBUG] Found 'data' key with {len(json_data['data'])} items")
-                        return json_data['data']
-                    else:
-                        print("[DEBUG] No 'data' key found, returning full response as list")
-                        return [json_data]
-                else:
-                    raise Exception("Format response tidak dikenali")
-                    
-            except ValueError as e:
-                print(f"[DEBUG] Gagal parse JSON: {str(e)}")
-                if response.text:
-                    raise Exception(f"Gagal parse response: {response.text[:100]}...")
-                else:
-                    raise Exception("Response kosong dari server")
-                    
+
+            print(f"[DEBUG] Mengirim request GET ke {self.api.url('/api/assets')} (cursor: {cursor}, limit: {limit})")
+            next_cursor = None
+            for assets, next_cursor in self.asset_client.iter_assets(
+                    cursor, limit, max_chunk=self.asset_chunk_max):
+                print(f"[DEBUG] Diterima {len(assets)} aset")
+                self.api.call_in_gui(partial(self._add_asset_rows, generation), assets)
+            return next_cursor
+
         except RequestException as e:
             print(f"[DEBUG] RequestException: {str(e)}")
             raise Exception(f"Koneksi gagal: {str(e)}")
-        except Exception as e:
-            print(f"[DEBUG] Unexpected error: {str(e)}")
-            raise Exception(f"Error: {str(e)}")
-        
+        except ValueError as e:
+            print(f"[DEBUG] Gagal parse JSON: {str(e)}")
+            raise Exception(f"Gagal parse response: {str(e)}")
+
     def prepare_update_form(self):
         """Prepare the update form with selected asset data using QProgressDialog"""
-        selected = self.table_assets.selectedItems()
-        if not selected:
+        row = self._selected_asset_row()
+        if row is None:
             QMessageBox.warning(self, "Warning", "Silakan pilih aset yang akan diedit")
             return
 
@@ -1126,29 +943,24 @@ class ManagementPage(QWidget):
         progress.setWindowModality(Qt.WindowModality.WindowModal)
         progress.setCancelButton(None)  # Nonaktifkan tombol cancel
         progress.show()
-        QApplication.processEvents()
 
-        try:
-            row = selected[0].row()
-            rfid_uid = self.table_assets.item(row, 2).text()
-            self.current_rfid_uid = rfid_uid
+        rfid_uid = self.asset_model.value(row, UID_COLUMN)
+        self.current_rfid_uid = rfid_uid
 
-            asset = self._get_asset_by_rfid(rfid_uid)
+        def done(asset):
             progress.close()
-
             if not asset:
                 QMessageBox.warning(self, "Warning", f"Aset dengan UID {rfid_uid} tidak ditemukan")
                 return
                 
             self._fill_update_form(asset)
             self.stack.setCurrentWidget(self.update_page)
-            
-        except Exception as e:
+
+        def failed(e):
             progress.close()
             QMessageBox.critical(self, "Error", f"Gagal mempersiapkan form edit: {str(e)}")
-        finally:
-            if progress.isVisible():
-                progress.close()
+
+        self.api.submit(self._get_asset_by_rfid, rfid_uid, on_success=done, on_error=failed)
 
     def _get_asset_by_rfid(self, rfid_uid):
         """Helper method to get asset by RFID UID from API"""
@@ -1157,8 +969,8 @@ class ManagementPage(QWidget):
             from requests.exceptions import RequestException
             
             print(f"[DEBUG] Mengambil data aset dengan UID: {rfid_uid}")
-            response = requests.get(
-                'http://localhost:5000/api/assets',
+            response = self.api.session.get(
+                self.api.url('/api/assets'),
                 params={'uid': rfid_uid},
                 timeout=5
             )
@@ -1262,7 +1074,7 @@ class ManagementPage(QWidget):
             from requests.exceptions import RequestException
             
             print(f"[DEBUG] Mengambil data aset dengan ID: {asset_id}")
-            response = requests.get(f'http://localhost:5000/api/assets/{asset_id}', timeout=5)
+            response = self.api.session.get(self.api.url(f'/api/assets/{asset_id}'), timeout=5)
             print(f"[DEBUG] Status code: {response.status_code}")
             
             if response.status_code == 200:
@@ -1336,20 +1148,46 @@ class ManagementPage(QWidget):
                 asset_data["products"] = products
             
             # Send POST request to API
-            response = self._send_asset_to_api(asset_data)
-            
-            if response.get('success'):
-                QMessageBox.information(self, "Success", "Aset berhasil ditambahkan")
-                self.load_assets()
-                self.stack.setCurrentWidget(self.main_page)
-                self._clear_input_form()
-            else:
-                error_msg = response.get('message', 'Gagal menambahkan aset')
-                QMessageBox.warning(self, "Warning", error_msg)
+            self.api.submit(self._create_asset, asset_data,
+                            on_success=self._handle_asset_submitted,
+                            on_error=lambda e: QMessageBox.critical(self, "Error", f"Gagal menambahkan aset: {str(e)}"))
                 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Gagal menambahkan aset: {str(e)}")
 
+    def _create_asset(self, asset_data):
+        """Create the asset, then fetch it back so only its row needs adding (worker thread)"""
+        response = self._send_asset_to_api(asset_data)
+        if response.get('success'):
+            response['asset'] = self._fetch_written_asset(asset_data['rfidTag']['uid'])
+        return response
+
+    def _fetch_written_asset(self, rfid_uid):
+        """Asset as stored after a write, or None to fall back to a full reload"""
+        try:
+            return self._get_asset_by_rfid(rfid_uid)
+        except Exception as e:
+            print(f"[DEBUG] Gagal mengambil aset setelah disimpan: {str(e)}")
+            return None
+
+    def _patch_asset_row(self, asset):
+        """Patch one table row; reload everything only if the asset couldn't be fetched"""
+        if asset and asset.get('_id'):
+            self.asset_model.upsert_asset(asset)
+        else:
+            self.load_assets()
+
+    def _handle_asset_submitted(self, response):
+        """Handle the API's answer to a new asset"""
+        if response.get('success'):
+            QMessageBox.information(self, "Success", "Aset berhasil ditambahkan")
+            self._patch_asset_row(response.get('asset'))
+            self.stack.setCurrentWidget(self.main_page)
+            self._clear_input_form()
+        else:
+            error_msg = response.get('message', 'Gagal menambahkan aset')
+            QMessageBox.warning(self, "Warning", error_msg)
+
     def _send_asset_to_api(self, asset_data):
         """Helper method to send asset data to API"""
         try:
@@ -1361,11 +1199,14 @@ class ManagementPage(QWidget):
                 'Accept': 'application/json'
             }
             
-            response = requests.post(
-                'http://localhost:5000/api/assets',
+            response = self.api.session.post(
+                self.api.url('/api/assets'),
                 json=asset_data,
-                headers=headers
+                headers=headers,
+                timeout=10
             )
+            asset_cache().invalidate_asset(asset_data)
+            asset_replica().invalidate_asset(asset_data)
             
             # Check response status
             if response.status_code == 201:
@@ -1425,7 +1266,6 @@ class ManagementPage(QWidget):
             progress.setWindowModality(Qt.WindowModality.WindowModal)
             progress.setCancelButton(None)
             progress.show()
-            QApplication.processEvents()
 
             # Prepare update data
             update_data = {
@@ -1456,26 +1296,40 @@ class ManagementPage(QWidget):
             else:
                 update_data["masaGaransi"] = None
             
-            # Send PUT request to API
-            response = self._send_update_to_api(self.current_rfid_uid, update_data)
-            progress.close()
+            def done(response):
+                progress.close()
 
-            # Check response based on status code first
-            if response is None:
-                QMessageBox.warning(self, "Warning", "Tidak ada response dari server")
-            elif response.get('status_code', 0) == 200:
-                QMessageBox.information(self, "Success", "Aset berhasil diupdate")
-                self.load_assets()
-                self.stack.setCurrentWidget(self.main_page)
-            else:
-                error_msg = response.get('message', 'Gagal mengupdate aset')
-                QMessageBox.warning(self, "Warning", error_msg)
+                # Check response based on status code first
+                if response is None:
+                    QMessageBox.warning(self, "Warning", "Tidak ada response dari server")
+                elif response.get('status_code', 0) == 200:
+                    QMessageBox.information(self, "Success", "Aset berhasil diupdate")
+                    self._patch_asset_row(response.get('asset'))
+                    self.stack.setCurrentWidget(self.main_page)
+                else:
+                    error_msg = response.get('message', 'Gagal mengupdate aset')
+                    QMessageBox.warning(self, "Warning", error_msg)
+
+            def failed(e):
+                progress.close()
+                QMessageBox.critical(self, "Error", f"Gagal mengupdate aset: {str(e)}")
+
+            # Send PUT request to API
+            self.api.submit(self._update_asset_and_fetch, self.current_rfid_uid, update_data,
+                            on_success=done, on_error=failed)
                 
         except Exception as e:
             if 'progress' in locals() and progress.isVisible():
                 progress.close()
             QMessageBox.critical(self, "Error", f"Gagal mengupdate aset: {str(e)}")
             
+    def _update_asset_and_fetch(self, rfid_uid, update_data):
+        """Send the update, then fetch the asset back for its table row (worker thread)"""
+        response = self._send_update_to_api(rfid_uid, update_data)
+        if response.get('status_code', 0) == 200:
+            response['asset'] = self._fetch_written_asset(update_data['rfidTag']['uid'])
+        return response
+
     def _send_update_to_api(self, rfid_uid, update_data):
         """Helper method to send update to API"""
         try:
@@ -1485,12 +1339,16 @@ class ManagementPage(QWidget):
             print(f"[DEBUG] Mengirim update untuk UID: {rfid_uid}")
             print(f"[DEBUG] Data yang dikirim: {update_data}")
             
-            response = requests.put(
-                f'http://localhost:5000/api/assets/{rfid_uid}',
+            response = self.api.session.put(
+                self.api.url(f'/api/assets/{rfid_uid}'),
                 json=update_data,
                 headers={'Content-Type': 'application/json'},
                 timeout=10
             )
+            asset_cache().invalidate(uid=rfid_uid)
+            asset_replica().invalidate(uid=rfid_uid)
+            asset_cache().invalidate_asset(update_data)
+            asset_replica().invalidate_asset(update_data)
             
             print(f"[DEBUG] Status code: {response.status_code}")
             print(f"[DEBUG] Response: {response.text[:200]}...")
@@ -1525,15 +1383,15 @@ class ManagementPage(QWidget):
       
     def delete_asset(self):
         """Handle asset deletion via API"""
-        selected = self.table_assets.selectedItems()
-        if not selected:
+        row = self._selected_asset_row()
+        if row is None:
             QMessageBox.warning(self, "Warning", "Silakan pilih aset yang akan dihapus")
             return
             
         try:
-            row = selected[0].row()
-            rfid_uid = self.table_assets.item(row, 2).text()  # Ambil UID dari kolom ke-2
-            asset_name = self.table_assets.item(row, 1).text()
+            asset_id = self.asset_model.value(row, ID_COLUMN)
+            rfid_uid = self.asset_model.value(row, UID_COLUMN)  # Ambil UID dari kolom ke-2
+            asset_name = self.asset_model.value(row, NAME_COLUMN)
             
             # Konfirmasi penghapusan
             reply = QMessageBox.question(
@@ -1550,17 +1408,22 @@ class ManagementPage(QWidget):
                 progress.setWindowModality(Qt.WindowModality.WindowModal)
                 progress.setCancelButton(None)
                 progress.show()
-                QApplication.processEvents()
 
-                # Kirim permintaan DELETE ke API
-                success, message = self._delete_asset_via_api(rfid_uid)
-                progress.close()
+                def done(result):
+                    progress.close()
+                    success, message = result
+                    if success:
+                        self.asset_model.remove_asset(asset_id)
+                        QMessageBox.information(self, "Success", "Aset berhasil dihapus")
+                    else:
+                        QMessageBox.warning(self, "Warning", message)
 
-                if success:
-                    QMessageBox.information(self, "Success", "Aset berhasil dihapus")
-                    self.load_assets()
-                else:
-                    QMessageBox.warning(self, "Warning", message)
+                def failed(e):
+                    progress.close()
+                    QMessageBox.critical(self, "Error", f"Gagal menghapus aset: {str(e)}")
+
+                # Kirim permintaan DELETE ke API
+                self.api.submit(self._delete_asset_via_api, rfid_uid, on_success=done, on_error=failed)
                     
         except Exception as e:
             if 'progress' in locals() and progress.isVisible():
@@ -1574,10 +1437,12 @@ class ManagementPage(QWidget):
             from requests.exceptions import RequestException
             
             print(f"[DEBUG] Mengirim permintaan DELETE untuk UID: {rfid_uid}")
-            response = requests.delete(
-                f'http://localhost:5000/api/assets/{rfid_uid}',
+            response = self.api.session.delete(
+                self.api.url(f'/api/assets/{rfid_uid}'),
                 timeout=10
             )
+            asset_cache().invalidate(uid=rfid_uid)
+            asset_replica().invalidate(uid=rfid_uid)
             
             print(f"[DEBUG] Status code: {response.status_code}")
             print(f"[DEBUG] Response: {response.text[:200]}...")
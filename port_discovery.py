@@ -0,0 +1,131 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from serial.tools import list_ports
+
+from reader import Reader
+from transport import SerialTransport
+
+# USB-serial bridges the UHF reader modules ship with: (VID, PID) -> chip
+KNOWN_READER_USB_IDS: dict[tuple[int, int], str] = {
+    (0x1A86, 0x7523): "CH340",
+    (0x1A86, 0x55D4): "CH9102",
+    (0x10C4, 0xEA60): "CP210x",
+    (0x0403, 0x6001): "FT232R",
+    (0x0403, 0x6015): "FT231X",
+    (0x067B, 0x2303): "PL2303",
+}
+
+
+@dataclass(frozen=True)
+class PortInfo:
+    device: str
+    description: str = ""
+    vid: int | None = None
+    pid: int | None = None
+    serial_number: str | None = None
+
+    @property
+    def usb_id(self) -> tuple[int | None, int | None]:
+        return self.vid, self.pid
+
+    def label(self) -> str:
+        return f"{self.device} - {self.description}"
+
+
+class PortDiscovery:
+    """Serial ports from ``serial.tools.list_ports`` metadata, without opening any.
+
+    ``ports()`` keeps the listing for ``ttl`` seconds and puts ports whose
+    USB VID/PID is a known reader bridge first. ``probe()`` optionally
+    confirms readers: it opens the candidates in parallel and sends
+    CMD_GET_WORK_MODE with a short timeout. Answers are cached per device
+    until the port list changes.
+    """
+
+    def __init__(self, ttl: float = 2.0, known_usb_ids: dict | None = None,
+                 baud_rate: int = 57600, probe_timeout: float = 0.3) -> None:
+        self.ttl = ttl
+        self.known_usb_ids = KNOWN_READER_USB_IDS if known_usb_ids is None else known_usb_ids
+        self.baud_rate = baud_rate
+        self.probe_timeout = probe_timeout
+        self._ports: list[PortInfo] = []
+        self._listed_at: float | None = None
+        self._probed: dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    def ports(self, refresh: bool = False) -> list[PortInfo]:
+        with self._lock:
+            now = time.monotonic()
+            if refresh or self._listed_at is None or now - self._listed_at >= self.ttl:
+                ports = [PortInfo(port.device, port.description or "", port.vid, port.pid, port.serial_number)
+                         for port in list_ports.comports()]
+                ports.sort(key=lambda port: (not self.is_known_reader(port), port.device))
+                if ports != self._ports:
+                    self._probed.clear()  # Something was plugged in or out
+                self._ports = ports
+                self._listed_at = now
+            return list(self._ports)
+
+    def is_known_reader(self, port: PortInfo) -> bool:
+        return port.usb_id in self.known_usb_ids
+
+    def reader_ports(self, refresh: bool = False) -> list[PortInfo]:
+        """Ports with a known reader USB ID, without talking to them"""
+        return [port for port in self.ports(refresh) if self.is_known_reader(port)]
+
+    def probe(self, devices: list[str] | None = None, max_workers: int = 8) -> list[str]:
+        """Devices where a reader answered; defaults to the known reader ports"""
+        if devices is None:
+            devices = [port.device for port in self.reader_ports()]
+        with self._lock:
+            pending = [device for device in devices if device not in self._probed]
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+                answers = dict(zip(pending, executor.map(self._handshake, pending)))
+            with self._lock:
+                self._probed.update(answers)
+        with self._lock:
+            return [device for device in devices if self._probed.get(device)]
+
+    def _handshake(self, device: str) -> bool:
+        try:
+            transport = SerialTransport(device, self.baud_rate, timeout=self.probe_timeout)
+        except Exception:
+            return False
+        # A device that keeps sending bytes would never time out a read;
+        # closing the port under it ends the handshake
+        deadline = threading.Timer(self.probe_timeout * 3, transport.close)
+        deadline.start()
+        try:
+            Reader(transport).work_mode()
+            return True
+        except Exception:
+            return False  # No answer or not our protocol
+        finally:
+            deadline.cancel()
+            transport.close()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._listed_at = None
+            self._probed.clear()
+
+
+_shared: PortDiscovery | None = None
+
+
+def port_discovery() -> PortDiscovery:
+    """The discovery shared by all pages, so one listing serves them all"""
+    global _shared
+    if _shared is None:
+        _shared = PortDiscovery()
+    return _shared
+
+# # Contoh penggunaan
+# discovery = port_discovery()
+# for port in discovery.ports():
+#     print(port.label(), discovery.is_known_reader(port))
+# print(discovery.probe())  # port yang benar-benar menjawab CMD_GET_WORK_MODE
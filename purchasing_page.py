@@ -1,189 +1,22 @@
 import sys
-import requests
-import serial.tools.list_ports
-import time
-import base64
-from io import BytesIO
-from PIL import Image
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
     QTableWidget, QTableWidgetItem, QLineEdit, QMessageBox,
     QHeaderView, QStackedWidget, QGroupBox, QScrollArea,
     QProgressDialog, QFormLayout, QComboBox, QApplication
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QThread, QMutex, QMutexLocker
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QIcon, QPixmap
-from response import hex_readable, Response, WorkMode, InventoryWorkMode, InventoryMemoryBank
-from transport import SerialTransport
-from reader import Reader
-import check_connection
-
-class RFIDInventoryThread(QThread):
-    tag_scanned = pyqtSignal(dict)
-    reader_status = pyqtSignal(str)
-    error_occurred = pyqtSignal(str)
-
-    def __init__(self):
-        super().__init__()
-        self.reader = None
-        self.transport = None
-        self._is_running = False  # Thread tidak berjalan sampai di-start
-        self._should_scan = False
-        self.current_port = None
-        self.power_level = 30
-        self.scanned_epcs = set()
-        self.mutex = QMutex()
-        self.connection_established = False
-
-    def disconnect_reader(self):
-        """Close connection to RFID reader"""
-        try:
-            print("DEBUG: Disconnecting RFID reader...")
-            if self.reader:
-                self.reader.close()
-            self.reader = None
-            self.transport = None
-            self.reader_status.emit("Reader disconnected")
-            print("DEBUG: RFID reader disconnected.")
-            return True
-        except Exception as e:
-            print(f"DEBUG: Disconnection failed with error: {str(e)}")
-            self.error_occurred.emit(f"Disconnection failed: {str(e)}")
-            return False
-
-    def connect_reader(self, port: str):
-        """Initialize connection to RFID reader"""
-        try:
-            self.current_port = port
-            self.transport = SerialTransport(port, 57600)
-            self.reader = Reader(self.transport)
-            
-            # Configure reader settings
-            response_power = self.reader.set_power(self.power_level)
-            if response_power.status != 0x00:
-                raise Exception("Failed to set power level")
-            
-            work_mode = self.reader.work_mode()
-            work_mode.inventory_work_mode = InventoryWorkMode.ANSWER_MODE
-            if self.reader.set_work_mode(work_mode).status != 0x00:
-                raise Exception("Failed to set work mode")
-                
-            self.connection_established = True
-            self.reader_status.emit(f"Connected to {port}")
-            return True
-            
-        except Exception as e:
-            self.error_occurred.emit(f"Connection failed: {str(e)}")
-            self.connection_established = False
-            return False
-        
-    def _read_tid(self, epc: bytes) -> str:
-        """Read TID from tag"""
-        try:
-            print(f"DEBUG: Reading TID for EPC: {hex_readable(epc)}...")
-            response = self.reader.read_memory(
-                epc=epc,
-                memory_bank=InventoryMemoryBank.TID.value,
-                start_address=2,
-                length=4
-            )
-            if response.status == 0x00:
-                tid_data = hex_readable(response.data)
-                print(f"DEBUG: TID read successfully: {tid_data}")
-                return tid_data
-            else:
-                print(f"DEBUG: Failed to read TID. Status: {hex(response.status)}")
-                return ""
-        except Exception as e:
-            print(f"DEBUG: Error reading TID: {str(e)}")
-            return ""
-
-    def run(self):
-        """Main thread loop for continuous operation"""
-        print("RFID thread started and running...")
-        self._is_running = True
-        
-        try:
-            while self._is_running:
-                if self._should_scan and self.connection_established:
-                    try:
-                        self._perform_inventory()
-                        time.sleep(0.1)  # Small delay between scans
-                    except Exception as e:
-                        print(f"Scanning error: {e}")
-                        self.error_occurred.emit(f"Scanning error: {str(e)}")
-                        time.sleep(1)  # Wait before retrying
-                else:
-                    time.sleep(0.2)  # Longer delay when not scanning
-                    
-        except Exception as e:
-            print(f"Thread error: {e}")
-            self.error_occurred.emit(f"Thread error: {str(e)}")
-        finally:
-            print("RFID thread stopped")
-            self._is_running = False
-            self.reader_status.emit("Thread stopped")
-
-    def _perform_inventory(self):
-        """Perform tag inventory when scanning is active"""
-        try:
-            tags = list(self.reader.inventory_answer_mode())
-            if not tags:
-                return
-
-            # Dictionary untuk menyimpan tag unik berdasarkan EPC
-            unique_tags = {}
-            for tag in tags:
-                epc = hex_readable(tag)
-                if epc not in unique_tags:
-                    tid = self._read_tid(tag)
-                    unique_tags[epc] = {
-                        'epc': epc,
-                        'tid': tid,
-                        'uid': tid
-                    }
-
-            # Kirim hanya tag unik
-            for tag_data in unique_tags.values():
-                if not self._should_scan:  # Check if we should stop
-                    break
-                    
-                with QMutexLocker(self.mutex):
-                    if tag_data['epc'] not in self.scanned_epcs:
-                        self.scanned_epcs.add(tag_data['epc'])
-                        self.tag_scanned.emit(tag_data)
-                    
-        except Exception as e:
-            print(f"Inventory error: {e}")
-            raise
-
-    def start_scanning(self):
-        """Start the scanning process"""
-        if not self.connection_established:
-            self.error_occurred.emit("Reader not connected")
-            return
-            
-        print("Starting RFID scanning...")
-        with QMutexLocker(self.mutex):
-            self._should_scan = True
-            self.scanned_epcs.clear()
-        self.reader_status.emit("Scanning started")
-
-    def stop_scanning(self):
-        """Stop the scanning process (thread tetap berjalan)"""
-        print("Stopping RFID scanning (thread remains running)")
-        with QMutexLocker(self.mutex):
-            self._should_scan = False
-        self.reader_status.emit("Scanning stopped")
-
-    def stop_thread(self):
-        """Stop the thread completely"""
-        print("Stopping RFID thread completely...")
-        self.stop_scanning()
-        self._is_running = False
-        if self.isRunning():
-            self.wait(2000)  # Wait for thread to finish
-        self.reader_status.emit("Thread stopped")
+from asset_client import AssetClient
+from asset_table_model import amount, asset_price
+from api_executor import api_executor
+from auth_service import auth_sessions
+from asset_cache import asset_cache
+from asset_replica import asset_replica
+from transaction_queue import transaction_queue
+from scan_basket import ScanBasket
+from port_discovery import port_discovery
+from reader_service import reader_service
 
 class PurchasingPage(QWidget):
     def __init__(self, db):
@@ -191,8 +24,14 @@ class PurchasingPage(QWidget):
         self.db = db
         self.token = None
         self.user_data = None
-        self.rfid_thread = RFIDInventoryThread()
-        self.scanned_assets = []
+        self.reader = reader_service().subscribe()
+        self.asset_client = AssetClient(api_executor().api_base, session=api_executor().session,
+                                        cache=asset_cache(), replica=asset_replica())
+        self.scanned_assets = ScanBasket()
+        self._checkout_progress = None
+        self._awaited_checkout = None  # Key of the queued checkout the progress dialog waits for
+        transaction_queue().add_listener("purchasing", lambda transaction: api_executor().call_in_gui(
+            self._checkout_settled, transaction))
         self.init_ui()
         self._setup_rfid_connections()
 
@@ -390,106 +229,60 @@ class PurchasingPage(QWidget):
         return page
     
     def _setup_rfid_connections(self):
-        """Connect RFID thread signals to slots"""
-        self.rfid_thread.tag_scanned.connect(self._handle_tag_scanned)
-        self.rfid_thread.reader_status.connect(self._update_reader_status)
-        self.rfid_thread.error_occurred.connect(self._handle_rfid_error)
+        """Connect the shared reader's signals to slots"""
+        self.reader.tags_scanned.connect(self._handle_tags_scanned)
+        self.reader.reader_status.connect(self._update_reader_status)
+        service = reader_service()
+        service.reader_status.connect(self._update_reader_status)
+        service.connection_changed.connect(self._update_connection_ui)
+        service.error_occurred.connect(self._handle_rfid_error)
+        # Another page may already have connected the reader
+        self._update_connection_ui(service.connected)
 
-    def _handle_tag_scanned(self, tag_data: dict):
-        """Handle scanned RFID tag"""
-        QApplication.processEvents()  # Ensure UI remains responsive
-        
-        # Check if EPC already exists in the table
-        epc_exists = any(
-            self.products_table.item(row, 2).text() == tag_data['epc']
-            for row in range(self.products_table.rowCount())
-        )
-        
-        if epc_exists:
+    def _handle_tags_scanned(self, tags: list):
+        """Handle a batch of scanned RFID tags with a single table update"""
+        # Skip EPCs already in the table
+        new_tags = [tag for tag in tags if tag['epc'] not in self.scanned_assets]
+        if not new_tags:
             return
-            
-        # Get asset details from API using both EPC and UID (TID)
-        self._fetch_asset_details(tag_data['epc'], tag_data['uid'])
-        
-    def _try_fallback_search(self, epc: str):
-        """Fallback search using only EPC if initial search fails"""
-        try:
-            response = requests.get(
-                'http://localhost:5000/api/assets',
-                params={'epc': epc},
-                timeout=5
-            )
-            
-            if response.status_code == 200:
-                assets = response.json()
-                if isinstance(assets, list) and len(assets) > 0:
-                    self._add_asset_to_table(assets[0])
-                else:
-                    print(f"No asset found even with EPC-only search: {epc}")
-            else:
-                print(f"Fallback search failed: {response.text}")
-        except Exception as e:
-            print(f"Error in fallback search: {str(e)}")
-            
-    def _fetch_asset_details(self, epc: str, uid: str):
-        """Fetch asset details from API using both EPC and UID"""
+
+        # Resolve the whole batch in one request, off the GUI thread
+        api_executor().submit(
+            self.asset_client.lookup, new_tags,
+            on_success=lambda assets: self._add_lookup_results(new_tags, assets),
+            on_error=self._handle_lookup_error
+        )
+
+    def _handle_lookup_error(self, error: Exception):
+        print(f"Error fetching asset: {str(error)}")
+        QMessageBox.warning(self, "Error", f"Terjadi kesalahan: {str(error)}")
+
+    def _add_lookup_results(self, tags: list, assets: dict):
+        """Add one resolved batch to the table"""
+        # Table repaints once for the whole batch
+        warnings = []
+        self.products_table.setUpdatesEnabled(False)
         try:
-            progress = QProgressDialog("Getting product info...", None, 0, 0, self)
-            progress.setWindowModality(Qt.WindowModality.WindowModal)
-            progress.setCancelButton(None)
-            progress.show()
-            QApplication.processEvents()
-            
-            print(f"Searching for asset with EPC: {epc} and UID: {uid}")  # Debug log
-            
-            # Search by UID (TID) first since it's more unique
-            response = requests.get(
-                'http://localhost:5000/api/assets',
-                params={'uid': uid},
-                timeout=5
-            )
+            for tag_data in tags:
+                # Tags from batches still in flight may have landed meanwhile
+                if tag_data['epc'] in self.scanned_assets:
+                    continue
+                warning = self._accept_asset(tag_data['epc'], assets.get(tag_data['epc']))
+                if warning:
+                    warnings.append(warning)
+        finally:
+            self.products_table.setUpdatesEnabled(True)
 
-            if response.status_code == 200:
-                assets = response.json()
-                if isinstance(assets, list) and len(assets) > 0:
-                    # Verify EPC matches
-                    matched_asset = None
-                    for asset in assets:
-                        asset_epc = asset.get('rfidTag', {}).get('epc', '')
-                        if asset_epc == epc:
-                            matched_asset = asset
-                            break
-                    
-                    if matched_asset:
-                        self._add_asset_to_table(matched_asset)
-                        progress.close()
-                        return
-                    
-            # If not found by UID or EPC doesn't match, try by EPC
-            print("Trying fallback search by EPC only")
-            response = requests.get(
-                'http://localhost:5000/api/assets',
-                params={'epc': epc},
-                timeout=5
-            )
-            
-            progress.close()
-            
-            if response.status_code == 200:
-                assets = response.json()
-                if isinstance(assets, list) and len(assets) > 0:
-                    self._add_asset_to_table(assets[0])
-                else:
-                    print(f"No asset found with EPC: {epc}")
-                    QMessageBox.warning(self, "Warning", f"Produk dengan EPC {epc} tidak ditemukan di database")
-            else:
-                print(f"Failed to fetch asset: {response.text}")
-                QMessageBox.warning(self, "Warning", "Gagal mengambil data produk dari server")
-                
-        except Exception as e:
-            progress.close()
-            print(f"Error fetching asset: {str(e)}")
-            QMessageBox.warning(self, "Error", f"Terjadi kesalahan: {str(e)}")
+        if warnings:
+            QMessageBox.warning(self, "Warning", "\n".join(warnings))
+
+    def _accept_asset(self, epc: str, asset: dict | None) -> str | None:
+        """Add a looked-up asset to the table; returns a warning when it can't be added"""
+        if asset is None:
+            print(f"No asset found with EPC: {epc}")
+            return f"Produk dengan EPC {epc} tidak ditemukan di database"
+        self._add_asset_to_table(asset)
+        return None
 
     def _add_asset_to_table(self, asset_data: dict):
         """Add asset to the table with proper data validation"""
@@ -506,14 +299,11 @@ class PurchasingPage(QWidget):
             print(f"Adding asset to table - EPC: {epc}, UID: {uid}, Name: {asset_data.get('name')}")
             
             # Check if asset already exists in the table
-            for existing_asset in self.scanned_assets:
-                if existing_asset['rfidTag']['epc'] == epc:
-                    print(f"Asset with EPC {epc} already in table")
-                    return
-            
-            self.scanned_assets.append(asset_data)
-            
-            row = self.products_table.rowCount()
+            row = self.scanned_assets.add(asset_data)
+            if row is None:
+                print(f"Asset with EPC {epc} already in table")
+                return
+
             self.products_table.insertRow(row)
             
             # Add item data to table
@@ -532,7 +322,7 @@ class PurchasingPage(QWidget):
             
             # Add remove button
             btn_remove = QPushButton("Remove")
-            btn_remove.clicked.connect(lambda _, r=row, e=epc: self._remove_asset(r, e))
+            btn_remove.clicked.connect(lambda _, e=epc: self._remove_asset(e))
             self.products_table.setCellWidget(row, 3, btn_remove)
             
             # Enable checkout button if we have items
@@ -542,19 +332,16 @@ class PurchasingPage(QWidget):
             print(f"Error adding asset to table: {str(e)}")
             QMessageBox.warning(self, "Error", f"Gagal menambahkan produk ke tabel: {str(e)}")
                 
-    def _remove_asset(self, row: int, epc: str):
+    def _remove_asset(self, epc: str):
         """Remove asset from the scanning list"""
+        # Look the row up now; earlier removals may have shifted it
+        row = self.scanned_assets.remove(epc)
+        if row is None:
+            return
         self.products_table.removeRow(row)
-        self.scanned_assets = [a for a in self.scanned_assets 
-                             if a['rfidTag']['epc'] != epc]
         
         # Allow this EPC to be scanned again
-        if self.rfid_thread:
-            self.rfid_thread.mutex.lock()
-            try:
-                self.rfid_thread.scanned_epcs.discard(epc)
-            finally:
-                self.rfid_thread.mutex.unlock()
+        self.reader.forget(epc)
         
         self.btn_checkout.setEnabled(self.products_table.rowCount() > 0)
 
@@ -586,18 +373,18 @@ class PurchasingPage(QWidget):
 
     def _refresh_com_ports(self):
         """Refresh list of available COM ports"""
-        check_connection.testConnect()
         self.cb_com_ports.clear()
-        ports = serial.tools.list_ports.comports()
+        # Known reader USB IDs come first, so the likely reader is preselected
+        ports = port_discovery().ports()
         for port in ports:
-            self.cb_com_ports.addItem(f"{port.device} - {port.description}")
+            self.cb_com_ports.addItem(port.label())
         
         if not ports:
             self.cb_com_ports.addItem("No COM ports found")
 
     def toggle_rfid_connection(self):
         """Toggle RFID reader connection"""
-        if self.rfid_thread.connection_established:
+        if self.reader.connected:
             self._disconnect_reader()
         else:
             selected_port = self.cb_com_ports.currentText().split(' - ')[0]
@@ -609,22 +396,16 @@ class PurchasingPage(QWidget):
     def _connect_reader(self, port: str):
         """Connect to RFID reader"""
         try:
-            check_connection.testConnect()
             self.btn_connect.setEnabled(False)
             self.btn_connect.setText("Connecting...")
             QApplication.processEvents()
             
-            if not self.rfid_thread.connect_reader(port):
+            if not reader_service().connect_reader(port):
                 raise Exception("Failed to connect reader")
-                
-            if not self.rfid_thread.isRunning():
-                self.rfid_thread.start()
-                
-            time.sleep(0.5)  # Tunggu koneksi stabil
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to connect: {str(e)}")
-            self.rfid_thread.disconnect_reader()
+            self._update_connection_ui(False)
         finally:
             self.btn_connect.setEnabled(True)
 
@@ -635,16 +416,8 @@ class PurchasingPage(QWidget):
             self.btn_connect.setText("Disconnecting...")
             QApplication.processEvents()
             
-            if self.rfid_thread.isRunning:
-                self.rfid_thread.stop_scanning()
-                
-            self.rfid_thread.quit()
-            self.rfid_thread.wait(1000)
-            
-            if self.rfid_thread.isRunning():
-                self.rfid_thread.terminate()
-                
-            self.rfid_thread.disconnect_reader()
+            # Disconnects the reader for every page, stopping their scans too
+            reader_service().disconnect_reader()
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to disconnect: {str(e)}")
@@ -653,16 +426,16 @@ class PurchasingPage(QWidget):
 
     def toggle_scanning(self):
         """Start or stop RFID scanning"""
-        if not self.rfid_thread.connection_established:
+        if not self.reader.connected:
             QMessageBox.warning(self, "Warning", "Please connect to reader first")
             return
             
-        if self.rfid_thread._should_scan:
-            self.rfid_thread.stop_scanning()
+        if self.reader.scanning:
+            self.reader.stop_scanning()
             self.btn_scan.setText("Start Scanning")
             self.btn_scan.setIcon(QIcon("icons/rfid.png"))
         else:
-            self.rfid_thread.start_scanning()
+            self.reader.start_scanning()
             self.btn_scan.setText("Stop Scanning")
             self.btn_scan.setIcon(QIcon("icons/stop.png"))
 
@@ -679,65 +452,85 @@ class PurchasingPage(QWidget):
             QMessageBox.warning(self, "Warning", "Email and password are required")
             return
             
-        try:
-            # Buat progress dialog
-            progress = QProgressDialog("Processing checkout...", None, 0, 0, self)
-            progress.setWindowModality(Qt.WindowModality.WindowModal)
-            progress.setCancelButton(None)
-            progress.show()
-            QApplication.processEvents()
-            
-            # 1. Login untuk mendapatkan token
-            login_response = requests.post(
-                'http://localhost:5000/api/auth/login',
-                json={'email': email, 'password': password},
-                timeout=10
-            )
-            
-            if login_response.status_code != 200:
-                error_msg = login_response.json().get('message', 'Login failed')
-                raise Exception(error_msg)
-                
-            login_data = login_response.json()
+        # Buat progress dialog
+        progress = QProgressDialog("Processing checkout...", None, 0, 0, self)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setCancelButton(None)
+        progress.show()
+
+        payload = {
+            'rfidTags': [
+                {'uid': asset['rfidTag']['uid'], 'epc': asset['rfidTag']['epc']}
+                for asset in self.scanned_assets
+            ]
+        }
+        api = api_executor()
+
+        def login():
+            # 1. Login untuk mendapatkan token; operator yang masih login tidak perlu round trip
+            return auth_sessions().login(email, password)
+
+        def done(login_data):
             self.token = login_data['token']
             self.user_data = {
                 'username': login_data.get('username'),
                 'role': login_data.get('role')
             }
-            
-            # 2. Proses checkout dengan token
-            headers = {
-                'Authorization': f'Bearer {self.token}',
-                'Content-Type': 'application/json'
-            }
-            
-            payload = {
-                'rfidTags': [
-                    {'uid': asset['rfidTag']['uid'], 'epc': asset['rfidTag']['epc']}
-                    for asset in self.scanned_assets
-                ]
-            }
-            
-            checkout_response = requests.post(
-                'http://localhost:5000/api/checkout/checkout',
-                headers=headers,
-                json=payload,
-                timeout=10
-            )
-            
-            progress.close()
-            
-            if checkout_response.status_code == 200:
-                checkout_data = checkout_response.json()
-                self._show_checkout_summary(checkout_data)
-                self.stack.setCurrentWidget(self.checkout_page)
-            else:
-                error_msg = checkout_response.json().get('message', 'Checkout failed')
-                raise Exception(error_msg)
-                
-        except Exception as e:
+            # 2. Checkout lewat antrean transaksi; tersimpan di journal walau backend lambat/putus
+            transaction = transaction_queue().submit("checkout", payload, self.token, operator=email)
+            for tag in payload['rfidTags']:  # Status is about to change server-side
+                asset_cache().invalidate(tag['epc'], tag['uid'])
+                asset_replica().invalidate(tag['epc'], tag['uid'])
+            self._checkout_progress = progress
+            self._awaited_checkout = transaction.key
+            # The summary needs the backend's answer (QR code); don't wait for it forever
+            # Through the executor's guarded dispatch: an exception in a bare timer slot aborts PyQt6
+            QTimer.singleShot(10000, lambda: api_executor().call_in_gui(self._checkout_queued, transaction))
+
+        def failed(error):
             progress.close()
-            QMessageBox.critical(self, "Error", f"Checkout failed: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Checkout failed: {str(error)}")
+
+        api.submit(login, on_success=done, on_error=failed)
+
+    def _checkout_settled(self, transaction):
+        """A queued checkout reached the backend (GUI thread)"""
+        if transaction.kind != "checkout":
+            return
+        for tag in transaction.payload['rfidTags']:
+            asset_cache().invalidate(tag['epc'], tag['uid'])
+            asset_replica().invalidate(tag['epc'], tag['uid'])
+        if transaction.key != self._awaited_checkout:
+            if transaction.status == "rejected" and not transaction.replayed:  # Replayed ones are shown by the app
+                QMessageBox.warning(self, "Warning", f"A queued checkout was rejected: {transaction.error}")
+            return
+        self._awaited_checkout = None
+        self._checkout_progress.close()
+        if transaction.status == "rejected":
+            QMessageBox.critical(self, "Error", f"Checkout failed: {transaction.error}")
+            return
+        checkout_data = transaction.response if isinstance(transaction.response, dict) else {}
+        self._show_checkout_summary({'username': self.user_data.get('username', ''), **checkout_data})
+        self.stack.setCurrentWidget(self.checkout_page)
+
+    def _checkout_queued(self, transaction):
+        """The backend did not answer in time; the checkout stays queued and is sent later"""
+        if transaction.key != self._awaited_checkout:
+            return
+        self._awaited_checkout = None
+        self._checkout_progress.close()
+        items = [{'name': asset.get('name', ''), 'price': asset_price(asset)} for asset in self.scanned_assets]
+        self._show_checkout_summary({'username': self.user_data.get('username', ''), 'items': items,
+                                     'totalAmount': sum(item['price'] for item in items)})
+        self.lbl_qr_code.clear()  # The payment QR comes with the backend's answer
+        self.stack.setCurrentWidget(self.checkout_page)
+        if transaction.status == "auth":  # 401/403: held in the queue until the operator logs in again
+            QMessageBox.warning(self, "Login required",
+                                "The server no longer accepts your login; the checkout is saved and sent "
+                                "once you log in again")
+            return
+        QMessageBox.information(self, "Checkout queued",
+                                "The server is not reachable; the checkout is saved and sent automatically")
 
     def _show_checkout_summary(self, checkout_data):
         """Tampilkan ringkasan checkout"""
@@ -751,16 +544,17 @@ class PurchasingPage(QWidget):
             self.checkout_table.insertRow(row)
             self.checkout_table.setItem(row, 0, QTableWidgetItem(item.get('name', '')))
             self.checkout_table.setItem(row, 1, QTableWidgetItem("1"))  # Quantity
-            self.checkout_table.setItem(row, 2, QTableWidgetItem(f"Rp {item.get('price', 0):,}"))
+            self.checkout_table.setItem(row, 2, QTableWidgetItem(f"Rp {asset_price(item):,.0f}"))
         
         # Update total
-        self.lbl_total.setText(f"Total Amount: Rp {checkout_data.get('totalAmount', 0):,}")
+        self.lbl_total.setText(f"Total Amount: Rp {amount(checkout_data.get('totalAmount')):,.0f}")
         
         # Tampilkan QR code jika ada
         qr_code = checkout_data.get('paymentQRCode', '')
         if qr_code and qr_code.startswith('data:image/png;base64,'):
             try:
                 # Decode base64 image
+                import base64
                 base64_data = qr_code.split(',')[1]
                 image_data = base64.b64decode(base64_data)
                 
@@ -778,7 +572,7 @@ class PurchasingPage(QWidget):
         QMessageBox.information(self, "Success", "Checkout completed successfully")
         
         # Reset semua state
-        self.scanned_assets = []
+        self.scanned_assets.clear()
         self.products_table.setRowCount(0)
         self.btn_checkout.setEnabled(False)
         self.txt_email.clear()
@@ -795,8 +589,8 @@ class PurchasingPage(QWidget):
     def closeEvent(self, event):
         """Clean up when window is closed"""
         try:
-            if self.rfid_thread.isRunning():
-                self.rfid_thread.stop_thread()
+            # The reader stays connected for the other pages
+            self.reader.close()
         except Exception as e:
             print(f"Error during cleanup: {str(e)}")
             
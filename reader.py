@@ -1,8 +1,14 @@
-from typing import Iterator
+from functools import lru_cache
+from threading import Event
+from typing import Iterable, Iterator, Sequence
 from transport import Transport
 from command import *
 from response import *
  
+TID_START_ADDRESS: int = 2  # Word offset of the serial part of the TID
+TID_WORD_LENGTH: int = 4
+ 
+ 
 class Reader:
     def __init__(self, transport: Transport) -> None:
         self.transport = transport
@@ -10,27 +16,115 @@ class Reader:
     def close(self) -> None:
         self.transport.close()
  
-    def __send_request(self, command: Command) -> None:
-        self.transport.write_bytes(command.serialize())
+    def __send_request(self, frame: bytes) -> None:
+        self.transport.write_bytes(frame)
  
     def __get_response(self) -> bytes:
-        return self.transport.read_frame()
+        # Active-mode tag frames can still be in flight when a command is
+        # sent; they are never the answer to it
+        frame = self.transport.read_frame()
+        while frame is not None and frame[2] == CMD_ACTIVE_INVENTORY:
+            frame = self.transport.read_frame()
+        return frame
  
     def inventory_answer_mode(self,
                               start_address_tid: int | None = None,
                               len_tid: int | None = None,
                               ) -> Iterator[bytes]:  # 8.2.1 Inventory (Answer Mode)
-        if start_address_tid is not None and len_tid is not None:
-            command: Command = Command(CMD_INVENTORY, data=[start_address_tid, len_tid])
-        else:
-            command: Command = Command(CMD_INVENTORY)
-        self.__send_request(command)
+        self.__send_request(self._inventory_frame(start_address_tid, len_tid))
  
+        # Large populations do not fit one frame; the reader keeps sending
+        # frames flagged "more to follow" until the inventory completes
         response: Response = Response(self.__get_response())
-        data: bytes = response.data
+        blocks: list[bytes] = list(self._iter_tag_blocks(response.data))
+        while response.status == STATUS_INVENTORY_MORE_FRAMES:
+            response = Response(self.__get_response())
+            blocks.extend(self._iter_tag_blocks(response.data))
+        return iter(blocks)
+ 
+    def inventory_with_tid(self,
+                           start_address_tid: int = TID_START_ADDRESS,
+                           len_tid: int = TID_WORD_LENGTH,
+                           ) -> Iterator[InventoryTag]:  # 8.2.1 Inventory with TID
+        # Each tag block carries the PC word, the EPC and len_tid words of TID.
+        # A tag that did not deliver its TID comes back with an empty tid.
+        return self._split_tid(self.inventory_answer_mode(start_address_tid, len_tid), len_tid)
+ 
+    # Request frames and reply parsers, shared with AsyncReader. Fixed frames
+    # are cached and per-tag ones are rendered from a template
+    @staticmethod
+    def _inventory_frame(start_address_tid: int | None = None, len_tid: int | None = None) -> bytes:
+        if start_address_tid is not None and len_tid is not None:
+            return fixed_frame(CMD_INVENTORY, bytes([start_address_tid, len_tid]))
+        return fixed_frame(CMD_INVENTORY)
+ 
+    @staticmethod
+    def _split_tid(blocks: Iterable[bytes], len_tid: int) -> Iterator[InventoryTag]:
+        # The EPC length comes from the PC word (top five bits, in words), so a
+        # long EPC without a TID is never cut in two by the block size
+        tid_size: int = len_tid * 2
+        for block in blocks:
+            if len(block) < 2:
+                yield InventoryTag(epc=bytes(block))
+                continue
+            epc_end: int = min(2 + (block[0] >> 3) * 2, len(block))
+            tid: bytes = bytes(block[epc_end:epc_end + tid_size])
+            # Copies: the tag is frozen and hashable, and outlives the reply buffer
+            yield InventoryTag(epc=bytes(block[2:epc_end]), tid=tid if len(tid) == tid_size else b"",
+                               pc=bytes(block[:2]))
+ 
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _read_memory_template(epc_size: int, memory_bank: int, start_address: int, length: int,
+                              access_password: bytes) -> CommandTemplate:
+        return CommandTemplate(CMD_READ_MEMORY, [
+            bytes([int(epc_size / 2)]),  # EPC Length in word
+            epc_size,
+            bytes([memory_bank, start_address, length]),
+            access_password,
+        ])
+ 
+    @staticmethod
+    def _read_memory_frame(epc: bytes, memory_bank: int, start_address: int, length: int,
+                           access_password: bytes) -> bytes:
+        template = Reader._read_memory_template(len(epc), memory_bank, start_address, length,
+                                                bytes(access_password))
+        return template.render(epc)
+ 
+    @staticmethod
+    def _write_memory_frame(epc: bytes, memory_bank: int, start_address: int,
+                            data_to_write: bytes, access_password: bytes) -> bytes:
+        request_data: bytearray = bytearray()
+        request_data.extend(bytearray([int(len(data_to_write) / 2)]))  # Data length in word
+        request_data.extend(bytearray([int(len(epc) / 2)]))  # EPC Length in word
+        request_data.extend(epc)
+        request_data.extend(bytearray([memory_bank, start_address]))
+        request_data.extend(data_to_write)
+        request_data.extend(access_password)
+        return Command(CMD_WRITE_MEMORY, data=request_data).serialize()
+ 
+    @staticmethod
+    def _write_epc_frame(new_epc: bytes, access_password: bytes) -> bytes:
+        request_data: bytearray = bytearray([int(len(new_epc) / 2)])  # EPC Length in word
+        request_data.extend(access_password)
+        request_data.extend(new_epc)
+        return Command(CMD_WRITE_EPC, data=request_data).serialize()
+
+    @staticmethod
+    def _lock_frame(epc: bytes, select: int, set_protect: int, access_password: bytes) -> bytes:
+        parameter: bytearray = bytearray([int(len(epc) / 2)]) + epc + \
+                               bytearray([select, set_protect]) + access_password
+        return Command(CMD_SET_LOCK, data=parameter).serialize()
+ 
+    @staticmethod
+    def _set_power_frame(power: int) -> bytes:
+        assert 0 <= power <= 30
+        return fixed_frame(CMD_SET_READER_POWER, bytes([power]))
  
+    @staticmethod
+    def _iter_tag_blocks(data: bytes) -> Iterator[bytes]:
         if not data:
-            return iter(())
+            return
  
         tag_count: int = data[0]
  
@@ -39,78 +133,98 @@ class Reader:
         while n < tag_count:
             tag_len = int(data[pointer])
             tag_data_start = pointer + 1
-            tag_main_start = tag_data_start
-            tag_main_end = tag_main_start + tag_len
-            next_tag_start = tag_main_end
-            tag = data[tag_data_start:tag_main_start] \
-                  + data[tag_main_start:tag_main_end] + data[tag_main_end:next_tag_start]
-            yield tag
-            pointer = next_tag_start
+            tag_data_end = tag_data_start + tag_len
+            yield data[tag_data_start:tag_data_end]
+            pointer = tag_data_end
             n += 1
  
-    def inventory_active_mode(self) -> Iterator[Response]:
-        while True:
+    def active_frames(self, stop: Event | None = None) -> Iterator[list[bytearray]]:
+        # Blocks in the transport read; yields every frame one read delivered
+        while stop is None or not stop.is_set():
             try:
-                raw_response: bytes | None = self.__get_response()
+                frames: list[bytearray] = self.transport.read_frames()
             except TimeoutError:
                 continue
-            if raw_response is None:
-                continue
-            response: Response = Response(raw_response)
-            yield response
+            if frames:
+                yield frames
+ 
+    def inventory_active_mode(self, stop: Event | None = None) -> Iterator[Response]:
+        for frames in self.active_frames(stop):
+            for raw_response in frames:
+                response: Response = Response(raw_response)
+                yield response
  
     def read_memory(self, epc: bytes, memory_bank: int, start_address: int, length: int,
                     access_password: bytes = bytes(4)) -> Response:  # 8.2.2 Read Data
-        request_data = bytearray()
-        request_data.extend(bytearray([int(len(epc) / 2)]))  # EPC Length in word
-        request_data.extend(epc)
-        request_data.extend(bytearray([memory_bank, start_address, length]))
-        request_data.extend(access_password)
-        command: Command = Command(CMD_READ_MEMORY, data=request_data)
-        self.__send_request(command)
+        self.__send_request(self._read_memory_frame(epc, memory_bank, start_address, length, access_password))
  
         return Response(self.__get_response())
  
     def write_memory(self, epc: bytes, memory_bank: int, start_address: int,
                      data_to_write: bytes,
                      access_password: bytes = bytes(4)) -> Response:  # 8.2.4 Write Data
-        request_data: bytearray = bytearray()
-        request_data.extend(bytearray([int(len(data_to_write) / 2)]))  # Data length in word
-        request_data.extend(bytearray([int(len(epc) / 2)]))  # EPC Length in word
-        request_data.extend(epc)
-        request_data.extend(bytearray([memory_bank, start_address]))
-        request_data.extend(data_to_write)
-        request_data.extend(access_password)
-        command: Command = Command(CMD_WRITE_MEMORY, data=request_data)
-        self.__send_request(command)
+        self.__send_request(self._write_memory_frame(epc, memory_bank, start_address,
+                                                     data_to_write, access_password))
  
         return Response(self.__get_response())
  
+    def write_epc(self, new_epc: bytes, access_password: bytes = bytes(4)) -> Response:  # 8.2.5 Write EPC
+        # No EPC to select by: the reader writes whichever single tag is in its field
+        self.__send_request(self._write_epc_frame(new_epc, access_password))
+
+        return Response(self.__get_response())
+
+    def request_many(self, frames: Sequence[bytes]) -> list[Response]:
+        """Send several commands in one write and return their replies in order.
+
+        The reader works through them one after another, so the line is not
+        idle while the host waits for each reply. Only for commands answered
+        with exactly one frame (not inventory).
+        """
+        self.__send_request(b"".join(frames))
+        responses: list[Response] = []
+        for frame in frames:
+            raw_response = self.__get_response()
+            if raw_response is None:
+                raise TimeoutError(f"No reply to command {len(responses) + 1} of {len(frames)}")
+            response: Response = Response(raw_response)
+            if response.command != frame[2]:
+                raise ValueError(f"Reply to command 0x{response.command:02X}, expected 0x{frame[2]:02X}")
+            responses.append(response)
+        return responses
+
+    def drain(self) -> int:
+        """Drop every reply still buffered or on its way; returns the bytes dropped.
+
+        Reads until one read times out, so the line is quiet afterwards.
+        After a lost or out-of-order reply the late ones would otherwise be
+        taken as the answers to the next commands. Answer mode only.
+        """
+        buffer = self.transport.receive_buffer
+        dropped: int = len(buffer)
+        buffer.clear()
+        chunk: bytes = self.transport.read_available()
+        while chunk:
+            dropped += len(chunk)
+            chunk = self.transport.read_available()
+        return dropped
+
     def lock(self, epc: bytes, select: int, set_protect: int, access_password: bytes) -> Response:  # 8.2.6 Lock
-        parameter: bytearray = bytearray([int(len(epc) / 2)]) + epc + \
-                               bytearray([select, set_protect]) + access_password
- 
-        command: Command = Command(CMD_SET_LOCK, data=parameter)
-        self.__send_request(command)
+        self.__send_request(self._lock_frame(epc, select, set_protect, access_password))
  
         return Response(self.__get_response())
  
     def set_power(self, power: int) -> Response:  # 8.4.6 Set Power
-        assert 0 <= power <= 30
- 
-        command: Command = Command(CMD_SET_READER_POWER, data=bytearray([power]))
-        self.__send_request(command)
+        self.__send_request(self._set_power_frame(power))
  
         return Response(self.__get_response())
  
     def work_mode(self) -> WorkMode:  # 8.4.10 Get WorkMode
-        command: Command = Command(CMD_GET_WORK_MODE)
-        self.__send_request(command)
+        self.__send_request(fixed_frame(CMD_GET_WORK_MODE))
  
         return WorkMode(Response(self.__get_response()).data)
  
     def set_work_mode(self, work_mode: WorkMode) -> Response:  # 8.4.9 Set WorkMode
-        command: Command = Command(CMD_SET_WORK_MODE, data=work_mode.to_bytes())
-        self.__send_request(command)
+        self.__send_request(Command(CMD_SET_WORK_MODE, data=work_mode.to_bytes()).serialize())
  
         return Response(self.__get_response())
\ No newline at end of file
@@ -1,4 +1,7 @@
-from utils import calculate_checksum
+from functools import lru_cache
+from typing import Sequence
+
+from utils import calculate_checksum, crc16_init, crc16_update
  
 CMD_INVENTORY: int = 0x01
 CMD_READ_MEMORY: int = 0x02
@@ -8,6 +11,19 @@ CMD_SET_LOCK: int = 0x06
 CMD_SET_READER_POWER: int = 0x2F
 CMD_GET_WORK_MODE: int = 0x36
 CMD_SET_WORK_MODE: int = 0x35
+CMD_ACTIVE_INVENTORY: int = 0xEE  # Sent by the reader on its own in active mode
+
+# 8.2.6 Lock parameters: which memory to protect and how
+LOCK_SELECT_KILL_PASSWORD: int = 0x00
+LOCK_SELECT_ACCESS_PASSWORD: int = 0x01
+LOCK_SELECT_EPC: int = 0x02
+LOCK_SELECT_TID: int = 0x03
+LOCK_SELECT_USER: int = 0x04
+
+PROTECT_WRITABLE: int = 0x00
+PROTECT_PERMANENTLY_WRITABLE: int = 0x01
+PROTECT_SECURED: int = 0x02  # Writable only with the access password
+PROTECT_NEVER_WRITABLE: int = 0x03
  
  
 class Command:
@@ -24,8 +40,65 @@ class Command:
         self.base_data = bytearray([self.frame_length, self.reader_address, self.command])
         self.base_data.extend(self.data)
  
+        self._frame: bytes | None = None
+
     def serialize(self) -> bytes:
-        serialize = self.base_data
-        checksum = calculate_checksum(serialize)
-        serialize.extend(checksum)
-        return serialize
\ No newline at end of file
+        # Built once; base_data is left alone, so every call returns the same frame
+        if self._frame is None:
+            self._frame = bytes(self.base_data + calculate_checksum(self.base_data))
+        return self._frame
+
+
+@lru_cache(maxsize=256)
+def fixed_frame(command: int, data: bytes = b"", reader_address: int = 0xFF) -> bytes:
+    """Frame of a command whose bytes never change (inventory, get work mode, a power level)"""
+    return Command(command, reader_address, bytearray(data)).serialize()
+
+
+class CommandTemplate:
+    """Frame of a parameterised command with its fixed bytes laid out once.
+
+    ``parts`` lists the data bytes in order: ``bytes`` are fixed, an ``int``
+    is the size of a variable field. ``render()`` joins the prepared fixed
+    segments with the field values and continues the CRC from the state the
+    bytes before the first field left, instead of building a new ``Command``
+    per call.
+    """
+
+    def __init__(self, command: int, parts: Sequence[bytes | int], reader_address: int = 0xFF) -> None:
+        data = bytearray()
+        self._sizes: list[int] = []
+        starts: list[int] = []
+        for part in parts:
+            if isinstance(part, int):
+                starts.append(3 + len(data))
+                self._sizes.append(part)
+                data.extend(bytes(part))
+            else:
+                data.extend(part)
+        base = bytes(Command(command, reader_address, data).base_data)
+        # Fixed bytes around the fields: before the first, between them, after the last
+        bounds = [0] + [edge for start, size in zip(starts, self._sizes) for edge in (start, start + size)] + [len(base)]
+        self._segments = [base[bounds[i]:bounds[i + 1]] for i in range(0, len(bounds), 2)]
+        self._variable_from = starts[0] if starts else len(base)
+        self._crc_prefix = crc16_update(crc16_init(), base[:self._variable_from])
+
+    def render(self, *values: bytes) -> bytes:
+        if len(values) != len(self._sizes):
+            raise ValueError(f"Expected {len(self._sizes)} field values, got {len(values)}")
+        segments = self._segments
+        parts = [segments[0]]
+        for i, value in enumerate(values):
+            if len(value) != self._sizes[i]:
+                raise ValueError(f"Field {i} takes {self._sizes[i]} bytes, got {len(value)}")
+            parts.append(value)
+            parts.append(segments[i + 1])
+        frame = b"".join(parts)
+        value = crc16_update(self._crc_prefix, frame[self._variable_from:])
+        return frame + bytes((value & 0xFF, value >> 0x08))
+
+
+# # Contoh penggunaan
+# frame = fixed_frame(CMD_INVENTORY)  # dibuat sekali, objek yang sama setiap kali
+# read_tid = CommandTemplate(CMD_READ_MEMORY, [bytes([6]), 12, bytes([2, 2, 4]), bytes(4)])
+# frame = read_tid.render(epc)  # hanya 12 byte EPC yang diganti
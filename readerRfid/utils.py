@@ -1,12 +1,60 @@
+from typing import Iterable
+
+
+CRC16_PRESET: int = 0xFFFF
+CRC16_POLYNOMIAL: int = 0x8408
+
+
+def _build_crc16_table() -> tuple[int, ...]:
+    table = []
+    for byte in range(256):
+        value = byte
+        for _ in range(8):
+            value = (value >> 1) ^ CRC16_POLYNOMIAL if value & 0x0001 else (value >> 1)
+        table.append(value)
+    return tuple(table)
+
+
+CRC16_TABLE: tuple[int, ...] = _build_crc16_table()
+
+
+def crc16_init() -> int:
+    return CRC16_PRESET
+
+
+def crc16_update(value: int, data: bytes) -> int:
+    table = CRC16_TABLE
+    for d in data:
+        value = (value >> 8) ^ table[(value ^ d) & 0xFF]
+    return value
+
+
+def crc16_finalize(value: int) -> bytearray:
+    return bytearray([value & 0xFF, value >> 0x08])
+
+
 def calculate_checksum(data: bytes) -> bytearray:
-    value = 0xFFFF
+    value = CRC16_PRESET
+    table = CRC16_TABLE
     for d in data:
-        value ^= d
-        for _ in range(8):
-            value = (value >> 1) ^ 0x8408 if value & 0x0001 else (value >> 1)
-    crc_msb = value >> 0x08
-    crc_lsb = value & 0xFF
-    return bytearray([crc_lsb, crc_msb])
+        value = (value >> 8) ^ table[(value ^ d) & 0xFF]
+    return bytearray([value & 0xFF, value >> 0x08])
+
+
+def verify_checksums(frames: Iterable[bytes]) -> list[bool]:
+    """Check many complete frames (length byte .. CRC) in a single call."""
+    table = CRC16_TABLE
+    results = []
+    for frame in frames:
+        end = len(frame) - 2
+        if end < 1:
+            results.append(False)
+            continue
+        value = CRC16_PRESET
+        for d in memoryview(frame)[:end]:
+            value = (value >> 8) ^ table[(value ^ d) & 0xFF]
+        results.append(frame[end] == (value & 0xFF) and frame[end + 1] == (value >> 0x08))
+    return results
  
  
 def hex_readable(data: bytes | int, bytes_separator: str = " ") -> str:
@@ -23,4 +71,10 @@ def hex_readable(data: bytes | int, bytes_separator: str = " ") -> str:
 # # usage hec_readable
 # print(hex_readable(255))          # Output: "FF"
 # print(hex_readable(b"\x01\x02"))  # Output: "01 02"
-# print(hex_readable(b"\x01\x02", ":"))  # Output: "01:02"
\ No newline at end of file
+# print(hex_readable(b"\x01\x02", ":"))  # Output: "01:02"
+
+# # usage incremental checksum
+# value = crc16_init()
+# value = crc16_update(value, b"\x01")
+# value = crc16_update(value, b"\x02\x03")
+# print(crc16_finalize(value) == calculate_checksum(b"\x01\x02\x03"))  # Output: True
\ No newline at end of file
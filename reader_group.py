@@ -0,0 +1,130 @@
+import queue
+import threading
+import time
+from typing import Iterator
+
+from inventory_pipeline import BatchDeadline, ContinuousInventory, SeenWindow, batched
+from reader import Reader
+
+_DONE = object()
+
+
+class ReaderGroup:
+    """Active-mode inventory on several readers at once, merged into one stream.
+
+    Each reader runs its own ``ContinuousInventory`` (one I/O thread per
+    reader, any transport) plus a worker that forwards its tags, labelled
+    with the reader's name, into one bounded queue. ``run()`` drops a tag that
+    any reader of the group reported within ``dedupe_window`` seconds, so a
+    tag passing two dock doors comes out once, credited to the first reader
+    that saw it. A reader that fails is recorded in ``stats()`` and leaves the
+    others running. ``stop()`` may be called from any thread.
+    """
+
+    def __init__(self, readers: dict[str, Reader], dedupe_window: float = 1.0,
+                 queue_size: int = 1024) -> None:
+        self.readers = readers
+        self.dedupe_window = dedupe_window
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._inventories: dict[str, ContinuousInventory] = {}
+        self._threads: list[threading.Thread] = []
+        self._counts: dict[str, dict] = {name: {'first_seen': 0, 'error': None} for name in readers}
+        self._started: float | None = None
+        self._finished: float | None = None
+        self._deadline = BatchDeadline()
+
+    def stop(self) -> None:
+        self._stop.set()
+        for inventory in list(self._inventories.values()):
+            inventory.stop()
+
+    def stats(self) -> dict[str, dict]:
+        """Per reader: frames, bad frames, tag reads, reads/s, tags credited to it, error"""
+        if self._started is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished or time.monotonic()) - self._started
+        stats = {}
+        for name in self.readers:
+            inventory = self._inventories.get(name)
+            counts = inventory.stats if inventory is not None else {'frames': 0, 'bad_frames': 0, 'tags': 0}
+            stats[name] = {
+                **counts,
+                'tags_per_second': counts['tags'] / elapsed if elapsed else 0.0,
+                'first_seen': self._counts[name]['first_seen'],
+                'error': self._counts[name]['error'],
+            }
+        return stats
+
+    def _forward(self, name: str, inventory: ContinuousInventory) -> None:
+        try:
+            for tag in inventory.run():
+                tag['reader'] = name
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put(tag, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        except Exception as e:
+            self._counts[name]['error'] = e
+        finally:
+            self._queue.put((_DONE, name))
+
+    def _merged(self) -> Iterator[dict | None]:
+        self._stop.clear()
+        self._started, self._finished = time.monotonic(), None
+        self._inventories = {name: ContinuousInventory(reader, dedupe_window=self.dedupe_window)
+                             for name, reader in self.readers.items()}
+        self._threads = [threading.Thread(target=self._forward, args=(name, inventory),
+                                          name=f"reader-group-{name}", daemon=True)
+                         for name, inventory in self._inventories.items()]
+        for thread in self._threads:
+            thread.start()
+
+        running = len(self._threads)
+        seen = SeenWindow(self.dedupe_window)
+        try:
+            while running:
+                try:
+                    item = self._queue.get(timeout=self._deadline.timeout())
+                except queue.Empty:
+                    seen.expire(time.monotonic())
+                    yield None  # Heartbeat, as in ContinuousInventory
+                    continue
+                if isinstance(item, tuple) and item[0] is _DONE:
+                    running -= 1
+                    continue
+                if seen.first_sighting(item['epc'], time.monotonic()):
+                    self._counts[item['reader']]['first_seen'] += 1
+                    yield item
+        finally:
+            self.stop()
+            # Drain so no forwarder stays blocked on a full queue
+            while any(thread.is_alive() for thread in self._threads):
+                try:
+                    self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self._finished = time.monotonic()
+
+    def run(self) -> Iterator[dict]:
+        """Merged tags: {'epc', 'tid', 'uid', 'reader'}; ends after ``stop()`` or when every reader failed"""
+        for tag in self._merged():
+            if tag is not None:
+                yield tag
+
+    def run_batched(self, max_tags: int = 64, max_delay: float = 0.05) -> Iterator[list[dict]]:
+        """Like ``run()``, but yields lists of tags; see ``batched()``"""
+        self._deadline = BatchDeadline()
+        return batched(self._merged(), max_tags, max_delay, self._deadline)
+
+# # Contoh penggunaan
+# group = ReaderGroup({
+#     "dock-1": Reader(SerialTransport("COM8", 57600)),
+#     "dock-2": Reader(TcpTransport("192.168.1.190", 6000)),
+# })
+# for tag in group.run():
+#     print(tag['reader'], tag['epc'])
+# print(group.stats())
@@ -0,0 +1,294 @@
+import logging
+import threading
+
+from PyQt6.QtCore import QObject, QThread, QMutex, QMutexLocker, pyqtSignal
+
+from inventory_pipeline import ContinuousInventory
+from reader import Reader
+from response import InventoryWorkMode, InventoryMemoryBank, hex_readable
+from transport import SerialTransport
+
+logger = logging.getLogger(__name__)
+
+
+class ReaderSubscription(QObject):
+    """One page's view of the shared reader.
+
+    ``tags_scanned`` gets the tags seen while this subscription is scanning.
+    With ``dedupe`` each EPC is delivered once per scan session (``forget()``
+    lets it through again); ``with_tid`` asks the service for answer-mode
+    rounds that carry the TID instead of the faster EPC-only active mode.
+    """
+
+    tags_scanned = pyqtSignal(list)  # Batch of {'epc': '...', 'tid': '...', 'uid': '...'}
+    reader_status = pyqtSignal(str)
+
+    def __init__(self, service: "ReaderService", with_tid: bool = False, dedupe: bool = True) -> None:
+        super().__init__()
+        self.service = service
+        self.with_tid = with_tid
+        self.dedupe = dedupe
+        self.scanning = False
+        self.scanned_epcs = set()
+        self.mutex = QMutex()
+
+    @property
+    def connected(self) -> bool:
+        return self.service.connected
+
+    def start_scanning(self) -> None:
+        if not self.service.connected:
+            self.service.error_occurred.emit("Reader not connected")
+            return
+        with QMutexLocker(self.mutex):
+            self.scanned_epcs.clear()
+        self.service._set_scanning(self, True)
+        self.reader_status.emit("Scanning started")
+
+    def stop_scanning(self) -> None:
+        self.service._set_scanning(self, False)
+        self.reader_status.emit("Scanning stopped")
+
+    def forget(self, epc: str) -> None:
+        """Let ``epc`` be delivered again, e.g. after it was removed from the basket"""
+        with QMutexLocker(self.mutex):
+            self.scanned_epcs.discard(epc)
+
+    def close(self) -> None:
+        self.service.unsubscribe(self)
+
+    def _deliver(self, tags: list[dict]) -> None:
+        if self.dedupe:
+            with QMutexLocker(self.mutex):
+                tags = [tag for tag in tags if tag['epc'] not in self.scanned_epcs]
+                self.scanned_epcs.update(tag['epc'] for tag in tags)
+        if tags:
+            self.tags_scanned.emit(tags)
+
+
+class ReaderService(QThread):
+    """The process-wide reader: one transport, one configuration, one inventory loop.
+
+    ``connect_reader()`` opens the port and sets power and work mode once;
+    connecting again to the same port is a no-op, so the connection survives
+    page navigation. Pages ``subscribe()`` and scan through their
+    subscription. The loop runs only while some subscription is scanning:
+    EPC-only active-mode batches, or TID rounds as soon as one scanning
+    subscription wants the TID. Each batch goes to every scanning
+    subscription.
+    """
+
+    connection_changed = pyqtSignal(bool)
+    reader_status = pyqtSignal(str)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, baud_rate: int = 57600, power_level: int = 30) -> None:
+        super().__init__()
+        self.baud_rate = baud_rate
+        self.power_level = power_level
+        self.batch_max_tags = 64  # Emit a batch once it is this big...
+        self.batch_max_delay = 0.05  # ...or once its oldest tag waited this long (s)
+        self.stop_timeout = 2.0  # How long disconnect_reader() waits for the loop's round (s)
+        self.reader: Reader | None = None
+        self.port: str | None = None
+        self._subscriptions: list[ReaderSubscription] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._running = False
+        self._inventory: ContinuousInventory | None = None
+        self._orphans: list[Reader] = []  # Disconnected, still in the loop's hands
+
+    @property
+    def connected(self) -> bool:
+        return self.reader is not None
+
+    def subscribe(self, with_tid: bool = False, dedupe: bool = True) -> ReaderSubscription:
+        subscription = ReaderSubscription(self, with_tid, dedupe)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ReaderSubscription) -> None:
+        self._set_scanning(subscription, False)
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def connect_reader(self, port: str, reader: Reader | None = None) -> bool:
+        """Open and configure the reader; ``reader`` overrides the serial transport (tests)"""
+        if self.connected and port == self.port:
+            return True
+        if self.connected:
+            self.disconnect_reader()
+        try:
+            if reader is None:
+                reader = Reader(SerialTransport(port, self.baud_rate))
+            if reader.set_power(self.power_level).status != 0x00:
+                raise Exception("Failed to set power level")
+            work_mode = reader.work_mode()
+            work_mode.inventory_work_mode = InventoryWorkMode.ANSWER_MODE
+            if reader.set_work_mode(work_mode).status != 0x00:
+                raise Exception("Failed to set work mode")
+        except Exception as e:
+            if reader is not None:
+                reader.close()
+            self.error_occurred.emit(f"Connection failed: {str(e)}")
+            return False
+
+        with self._lock:
+            self.reader = reader
+            self.port = port
+        if not self.isRunning():
+            self._running = True
+            self.start()
+        self.reader_status.emit(f"Connected to {port}")
+        self.connection_changed.emit(True)
+        return True
+
+    def disconnect_reader(self) -> None:
+        """Stop every scan, let the loop finish its round and close the port
+
+        A round that doesn't end within ``stop_timeout`` keeps the reader;
+        the loop closes it once the round returns, never the GUI thread
+        while the loop is still reading from it.
+        """
+        with self._lock:
+            reader, self.reader, self.port = self.reader, None, None
+            for subscription in self._subscriptions:
+                subscription.scanning = False
+            inventory = self._inventory
+        if reader is None:
+            return
+        if inventory is not None:
+            inventory.stop()
+        self._wake.set()
+        if self._idle.wait(self.stop_timeout):
+            reader.close()
+        else:
+            logger.warning("Reader loop still busy; it closes the port when the round ends")
+            with self._lock:
+                self._orphans.append(reader)
+            self._wake.set()
+        self.reader_status.emit("Reader disconnected")
+        self.connection_changed.emit(False)
+
+    def shutdown(self) -> None:
+        self.disconnect_reader()
+        self._running = False
+        self._wake.set()
+        if self.isRunning():
+            self.wait(2000)
+
+    def _set_scanning(self, subscription: ReaderSubscription, scanning: bool) -> None:
+        with self._lock:
+            if subscription.scanning == scanning:
+                return
+            subscription.scanning = scanning
+            inventory = self._inventory
+        # The loop picks its mode from the scanning set; restart it on changes
+        if inventory is not None:
+            inventory.stop()
+        self._wake.set()
+
+    def _scanning(self) -> tuple[Reader | None, list[ReaderSubscription]]:
+        with self._lock:
+            return self.reader, [s for s in self._subscriptions if s.scanning]
+
+    def _close_orphans(self) -> None:
+        with self._lock:
+            orphans, self._orphans = self._orphans, []
+        for reader in orphans:
+            try:
+                reader.close()
+            except Exception as e:
+                logger.debug("Error closing reader: %s", e)
+
+    def run(self):
+        while self._running:
+            # Cleared before reading the state, so only later changes wake us
+            self._wake.clear()
+            self._close_orphans()
+            reader, consumers = self._scanning()
+            if reader is None or not consumers:
+                self._idle.set()
+                self._wake.wait()
+                continue
+            self._idle.clear()
+            try:
+                if any(subscription.with_tid for subscription in consumers):
+                    self._tid_round(reader)
+                else:
+                    self._active_inventory(reader)
+            except Exception as e:
+                if self.reader is reader:
+                    logger.warning("Scanning error: %s", e)
+                    self.error_occurred.emit(f"Scan error: {str(e)}")
+                    self._idle.set()
+                    self.disconnect_reader()
+        self._close_orphans()
+        self._idle.set()
+
+    def _publish(self, tags: list[dict]) -> None:
+        for subscription in self._scanning()[1]:
+            subscription._deliver(tags)
+
+    def _active_inventory(self, reader: Reader) -> None:
+        """Stream EPC batches until the reader or the scanning set changes"""
+        inventory = ContinuousInventory(reader)
+        with self._lock:
+            self._inventory = inventory
+            if self._wake.is_set():  # Changed while we were starting
+                inventory.stop()
+        try:
+            for batch in inventory.run_batched(self.batch_max_tags, self.batch_max_delay):
+                self._publish(batch)
+        finally:
+            with self._lock:
+                self._inventory = None
+
+    def _tid_round(self, reader: Reader) -> None:
+        """One answer-mode inventory, each tag with its TID"""
+        batch = []
+        for tag in reader.inventory_with_tid():
+            tid = hex_readable(tag.tid) if tag.tid else self._read_tid(reader, tag.epc)
+            batch.append({'epc': hex_readable(tag.epc), 'tid': tid, 'uid': tid})
+        if batch:
+            self._publish(batch)
+
+    def _read_tid(self, reader: Reader, epc: bytes) -> str:
+        """Read TID from tag (fallback when the inventory reply carries no TID)"""
+        try:
+            response = reader.read_memory(epc=epc, memory_bank=InventoryMemoryBank.TID.value,
+                                          start_address=2, length=4)
+            return hex_readable(response.data) if response.status == 0x00 else ""
+        except Exception as e:
+            logger.debug("Error reading TID: %s", e)
+            return ""
+
+
+_shared: ReaderService | None = None
+
+
+def reader_service() -> ReaderService:
+    """The reader shared by all pages; first call must come from the GUI thread"""
+    global _shared
+    if _shared is None:
+        _shared = ReaderService()
+    return _shared
+
+
+def shutdown_reader_service() -> None:
+    """Stop the shared reader, if any page ever created it"""
+    if _shared is not None:
+        _shared.shutdown()
+
+# # Contoh penggunaan
+# service = reader_service()
+# service.connect_reader("COM8")  # sekali saja, halaman lain ikut memakai koneksi ini
+# subscription = service.subscribe()
+# subscription.tags_scanned.connect(lambda tags: print(len(tags)))
+# subscription.start_scanning()
+# ...
+# subscription.close()
@@ -3,6 +3,24 @@ from enum import Enum
 from utils import calculate_checksum, hex_readable
  
  
+STATUS_SUCCESS: int = 0x00
+STATUS_INVENTORY_COMPLETE: int = 0x01
+STATUS_INVENTORY_TIMEOUT: int = 0x02
+STATUS_INVENTORY_MORE_FRAMES: int = 0x03  # More tag frames follow for the same inventory
+STATUS_INVENTORY_MEMORY_FULL: int = 0x04
+STATUS_ACCESS_PASSWORD_ERROR: int = 0x05
+STATUS_POOR_COMMUNICATION: int = 0xFA
+STATUS_NO_TAG: int = 0xFB
+STATUS_TAG_ERROR: int = 0xFC  # Data carries the tag's own error code
+STATUS_COMMAND_LENGTH_WRONG: int = 0xFD
+STATUS_ILLEGAL_COMMAND: int = 0xFE
+STATUS_PARAMETER_ERROR: int = 0xFF
+ 
+ 
+class ChecksumError(ValueError):
+    pass
+
+
 class Response:
     def __init__(self, response_bytes: bytes):
         if len(response_bytes) < 6:
@@ -11,7 +29,7 @@ class Response:
         self.response_bytes = response_bytes
         self.length = response_bytes[0]
  
-        if len(response_bytes) < self.length:
+        if len(response_bytes) < self.length + 1:
             raise ValueError("Response length mismatch.")
  
         self.reader_address = response_bytes[1]
@@ -20,11 +38,10 @@ class Response:
         self.data = response_bytes[4: self.length - 1]
         self.checksum = response_bytes[self.length - 1: self.length + 1]
  
-        # Verify checksum
-        data = bytearray(self.response_bytes[0:4])
-        data.extend(self.data)
-        crc_msb, crc_lsb = calculate_checksum(data)
-        assert self.checksum[0] == crc_msb and self.checksum[1] == crc_lsb
+        # Verify checksum over the frame as received, without rebuilding it
+        crc_lsb, crc_msb = calculate_checksum(response_bytes[:self.length - 1])
+        if self.checksum[0] != crc_lsb or self.checksum[1] != crc_msb:
+            raise ChecksumError(f"Response checksum mismatch: {hex_readable(self.checksum)}")
  
     def __str__(self) -> str:
         lines = [
@@ -42,6 +59,59 @@ class Response:
         lines.append(">>> END RESPONSE   ================================")
  
         return "\n".join(lines)
+
+class ResponseView:
+    """Zero-copy response over the original frame buffer.
+
+    Header fields are read eagerly; ``data`` and ``checksum`` are memoryview
+    slices of the buffer. The checksum is verified once, the first time the
+    payload is accessed (or when ``verify()`` is called), and raises
+    ``ChecksumError`` on mismatch.
+    """
+    __slots__ = ("response_bytes", "length", "reader_address", "command", "status", "_verified")
+
+    def __init__(self, response_bytes: bytes | bytearray | memoryview):
+        if len(response_bytes) < 6:
+            raise ValueError("Response data is too short to be valid.")
+
+        self.response_bytes = response_bytes
+        self.length = response_bytes[0]
+
+        if len(response_bytes) < self.length + 1:
+            raise ValueError("Response length mismatch.")
+
+        self.reader_address = response_bytes[1]
+        self.command = response_bytes[2]
+        self.status = response_bytes[3]
+        self._verified = False
+
+    def verify(self) -> None:
+        if self._verified:
+            return
+        end = self.length - 1
+        crc_lsb, crc_msb = calculate_checksum(self.response_bytes[:end])
+        if self.response_bytes[end] != crc_lsb or self.response_bytes[end + 1] != crc_msb:
+            raise ChecksumError("Response checksum mismatch: "
+                                f"{hex_readable(self.response_bytes[end:end + 2])}")
+        self._verified = True
+
+    @property
+    def data(self) -> memoryview:
+        if not self._verified:
+            self.verify()
+        return memoryview(self.response_bytes)[4: self.length - 1]
+
+    @property
+    def checksum(self) -> memoryview:
+        if not self._verified:
+            self.verify()
+        return memoryview(self.response_bytes)[self.length - 1: self.length + 1]
+
+    def to_response(self) -> Response:
+        return Response(bytes(self.response_bytes[:self.length + 1]))
+
+    def __str__(self) -> str:
+        return str(self.to_response())
  
  
  
@@ -152,6 +222,13 @@ class InventoryMemoryBank(Enum):
     EAS_ALARM: int = 6
  
  
+@dataclass(frozen=True)
+class InventoryTag:
+    epc: bytes
+    tid: bytes = b""
+    pc: bytes = b""  # The tag's PC word, when the inventory reports it
+ 
+ 
 class WorkMode:
     def __init__(self, response_bytes: bytes):
         self.wiegand_mode = WiegandMode(response_bytes[0])
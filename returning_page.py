@@ -4,16 +4,17 @@ from PyQt6.QtWidgets import (
     QHeaderView, QStackedWidget, QGroupBox, QScrollArea,
     QProgressDialog, QFormLayout, QComboBox, QApplication
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QThread, QMutex, QMutexLocker
+from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIcon
-from response import hex_readable, Response, WorkMode, InventoryWorkMode, InventoryMemoryBank
-from transport import SerialTransport
-from reader import Reader
-import check_connection
-import requests
-import serial.tools.list_ports
-import time
-from purchasing_page import RFIDInventoryThread
+from port_discovery import port_discovery
+from reader_service import reader_service
+from asset_client import AssetClient
+from api_executor import api_executor
+from auth_service import auth_sessions
+from asset_cache import asset_cache
+from asset_replica import asset_replica
+from transaction_queue import transaction_queue
+from scan_basket import ScanBasket
 
 class ReturningPage(QWidget):
     def __init__(self, db):
@@ -21,8 +22,12 @@ class ReturningPage(QWidget):
         self.db = db
         self.token = None
         self.user_data = None
-        self.scanned_assets = []
-        self.rfid_thread = RFIDInventoryThread()
+        self.scanned_assets = ScanBasket()
+        self.reader = reader_service().subscribe()
+        self.asset_client = AssetClient(api_executor().api_base, session=api_executor().session,
+                                        cache=asset_cache(), replica=asset_replica())
+        transaction_queue().add_listener("return", lambda transaction: api_executor().call_in_gui(
+            self._transaction_settled, transaction))
         self.init_ui()
         self._setup_rfid_connections()
 
@@ -211,94 +216,61 @@ class ReturningPage(QWidget):
         return page
     
     def _setup_rfid_connections(self):
-        """Connect RFID thread signals to slots"""
-        self.rfid_thread.tag_scanned.connect(self._handle_tag_scanned)
-        self.rfid_thread.reader_status.connect(self._update_reader_status)
-        self.rfid_thread.error_occurred.connect(self._handle_rfid_error)
+        """Connect the shared reader's signals to slots"""
+        self.reader.tags_scanned.connect(self._handle_tags_scanned)
+        self.reader.reader_status.connect(self._update_reader_status)
+        service = reader_service()
+        service.reader_status.connect(self._update_reader_status)
+        service.connection_changed.connect(self._update_connection_ui)
+        service.error_occurred.connect(self._handle_rfid_error)
+        # Another page may already have connected the reader
+        self._update_connection_ui(service.connected)
 
-    def _handle_tag_scanned(self, tag_data: dict):
-        """Handle scanned RFID tag"""
-        QApplication.processEvents()
-        
-        # Check if EPC already exists in table
-        epc_exists = any(
-            self.products_table.item(row, 2).text() == tag_data['epc']
-            for row in range(self.products_table.rowCount())
-        )
-        
-        if epc_exists:
+    def _handle_tags_scanned(self, tags: list):
+        """Handle a batch of scanned RFID tags with a single table update"""
+        # Skip EPCs already in the table
+        new_tags = [tag for tag in tags if tag['epc'] not in self.scanned_assets]
+        if not new_tags:
             return
-            
-        # Get asset details from API
-        self._fetch_asset_details(tag_data['epc'], tag_data['uid'])
 
-    def _fetch_asset_details(self, epc: str, uid: str):
-        """Fetch asset details from API and check if borrowed"""
+        # Resolve the whole batch in one request, off the GUI thread
+        api_executor().submit(
+            self.asset_client.lookup, new_tags,
+            on_success=lambda assets: self._add_lookup_results(new_tags, assets),
+            on_error=self._handle_lookup_error
+        )
+
+    def _handle_lookup_error(self, error: Exception):
+        print(f"Error fetching asset: {str(error)}")
+        QMessageBox.critical(self, "Error", f"Failed to check product: {str(error)}")
+
+    def _add_lookup_results(self, tags: list, assets: dict):
+        """Add one resolved batch to the table"""
+        # Table repaints once for the whole batch
+        warnings = []
+        self.products_table.setUpdatesEnabled(False)
         try:
-            progress = QProgressDialog("Checking product status...", None, 0, 0, self)
-            progress.setWindowModality(Qt.WindowModality.WindowModal)
-            progress.setCancelButton(None)
-            progress.show()
-            QApplication.processEvents()
-            
-            # First try to get by UID as it's more unique
-            response = requests.get(
-                f'http://localhost:5000/api/assets',
-                params={'uid': uid},
-                timeout=5
-            )
-            
-            if response.status_code == 200:
-                assets = response.json()
-                if isinstance(assets, list) and len(assets) > 0:
-                    # Find exact match with EPC
-                    matched_asset = None
-                    for asset in assets:
-                        asset_epc = asset.get('rfidTag', {}).get('epc', '')
-                        if asset_epc == epc:
-                            matched_asset = asset
-                            break
-                    
-                    if matched_asset:
-                        # Check if asset is borrowed
-                        if matched_asset.get('status', '').lower() != 'borrowed':
-                            QMessageBox.warning(self, "Not Borrowed", 
-                                f"Product {matched_asset.get('name')} is not currently borrowed")
-                            progress.close()
-                            return
-                            
-                        self._add_asset_to_table(matched_asset)
-                        progress.close()
-                        return
-            
-            # Fallback to search by EPC only
-            response = requests.get(
-                f'http://localhost:5000/api/assets',
-                params={'epc': epc},
-                timeout=5
-            )
-            
-            progress.close()
-            
-            if response.status_code == 200:
-                assets = response.json()
-                if isinstance(assets, list) and len(assets) > 0:
-                    asset = assets[0]
-                    # Check if asset is borrowed
-                    if asset.get('status', '').lower() != 'borrowed':
-                        QMessageBox.warning(self, "Not Borrowed", 
-                            f"Product {asset.get('name')} is not currently borrowed")
-                        return
-                        
-                    self._add_asset_to_table(asset)
-                else:
-                    QMessageBox.warning(self, "Not Found", f"No product found with EPC: {epc}")
-            else:
-                QMessageBox.warning(self, "Error", f"Failed to fetch product: {response.text}")
-                
-        except Exception as e:
-            progress.close()
-            QMessageBox.critical(self, "Error", f"Failed to check product: {str(e)}")
+            for tag_data in tags:
+                # Tags from batches still in flight may have landed meanwhile
+                if tag_data['epc'] in self.scanned_assets:
+                    continue
+                warning = self._accept_asset(tag_data['epc'], assets.get(tag_data['epc']))
+                if warning:
+                    warnings.append(warning)
+        finally:
+            self.products_table.setUpdatesEnabled(True)
+
+        if warnings:
+            QMessageBox.warning(self, "Warning", "\n".join(warnings))
+
+    def _accept_asset(self, epc: str, asset: dict | None) -> str | None:
+        """Add a looked-up asset to the table if it is borrowed; returns a warning otherwise"""
+        if asset is None:
+            return f"No product found with EPC: {epc}"
+        if asset.get('status', '').lower() != 'borrowed':
+            return f"Product {asset.get('name')} is not currently borrowed"
+        self._add_asset_to_table(asset)
+        return None
 
     def _add_asset_to_table(self, asset_data: dict):
         """Add borrowed asset to the table"""
@@ -306,12 +278,10 @@ class ReturningPage(QWidget):
             rfid_tag = asset_data.get('rfidTag', {})
             epc = rfid_tag.get('epc', '')
             
-            if not epc or any(a['rfidTag']['epc'] == epc for a in self.scanned_assets):
+            row = self.scanned_assets.add(asset_data)
+            if row is None:
                 return
-                
-            self.scanned_assets.append(asset_data)
-            
-            row = self.products_table.rowCount()
+
             self.products_table.insertRow(row)
             
             self.products_table.setItem(row, 0, QTableWidgetItem(asset_data.get('name', 'N/A')))
@@ -320,7 +290,7 @@ class ReturningPage(QWidget):
             
             # Add remove button
             btn_remove = QPushButton("Remove")
-            btn_remove.clicked.connect(lambda _, r=row, e=epc: self._remove_asset(r, e))
+            btn_remove.clicked.connect(lambda _, e=epc: self._remove_asset(e))
             self.products_table.setCellWidget(row, 3, btn_remove)
             
             # Enable proceed button if we have items
@@ -329,19 +299,16 @@ class ReturningPage(QWidget):
         except Exception as e:
             print(f"Error adding asset to table: {str(e)}")
 
-    def _remove_asset(self, row: int, epc: str):
+    def _remove_asset(self, epc: str):
         """Remove asset from return list"""
+        # Look the row up now; earlier removals may have shifted it
+        row = self.scanned_assets.remove(epc)
+        if row is None:
+            return
         self.products_table.removeRow(row)
-        self.scanned_assets = [a for a in self.scanned_assets 
-                             if a['rfidTag']['epc'] != epc]
         
         # Allow this EPC to be scanned again
-        if self.rfid_thread:
-            self.rfid_thread.mutex.lock()
-            try:
-                self.rfid_thread.scanned_epcs.discard(epc)
-            finally:
-                self.rfid_thread.mutex.unlock()
+        self.reader.forget(epc)
         
         self.btn_proceed.setEnabled(self.products_table.rowCount() > 0)
 
@@ -358,41 +325,35 @@ class ReturningPage(QWidget):
             QMessageBox.warning(self, "Warning", "Email and password are required")
             return
             
-        try:
-            progress = QProgressDialog("Processing login...", None, 0, 0, self)
-            progress.setWindowModality(Qt.WindowModality.WindowModal)
-            progress.setCancelButton(None)
-            progress.show()
-            QApplication.processEvents()
-            
-            # 1. Login to get token
-            login_response = requests.post(
-                'http://localhost:5000/api/auth/login',
-                json={'email': email, 'password': password},
-                timeout=10
-            )
-            
-            if login_response.status_code != 200:
-                error_msg = login_response.json().get('message', 'Login failed')
-                raise Exception(error_msg)
-                
-            login_data = login_response.json()
+        progress = QProgressDialog("Processing login...", None, 0, 0, self)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setCancelButton(None)
+        progress.show()
+        api = api_executor()
+
+        def login():
+            # 1. Login to get token; an operator still logged in skips the round trip
+            return auth_sessions().login(email, password)
+
+        def done(login_data):
+            progress.close()
             self.token = login_data['token']
             self.user_data = {
                 'username': login_data.get('username'),
                 'role': login_data.get('role'),
+                'email': email,
                 'userId': login_data.get('userId')  # We'll need this to verify ownership
             }
             
-            progress.close()
-            
             # 2. Show confirmation page
             self._prepare_confirmation_page()
             self.stack.setCurrentWidget(self.confirm_page)
-                
-        except Exception as e:
+
+        def failed(error):
             progress.close()
-            QMessageBox.critical(self, "Error", f"Login failed: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Login failed: {str(error)}")
+
+        api.submit(login, on_success=done, on_error=failed)
 
     def _prepare_confirmation_page(self):
         """Prepare confirmation page with scanned items"""
@@ -417,53 +378,38 @@ class ReturningPage(QWidget):
             QMessageBox.warning(self, "Warning", "Invalid return data")
             return
             
-        try:
-            progress = QProgressDialog("Processing return...", None, 0, 0, self)
-            progress.setWindowModality(Qt.WindowModality.WindowModal)
-            progress.setCancelButton(None)
-            progress.show()
-            QApplication.processEvents()
-            
-            # Prepare payload
-            payload = {
-                "rfidTags": [
-                    {
-                        "uid": asset['rfidTag'].get('uid'),
-                        "epc": asset['rfidTag'].get('epc')
-                    }
-                    for asset in self.scanned_assets
-                ]
-            }
-            
-            # Send return request
-            headers = {
-                'Authorization': f'Bearer {self.token}',
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.post(
-                'http://localhost:5000/api/borrowing/return',
-                headers=headers,
-                json=payload,
-                timeout=10
-            )
-            
-            progress.close()
-            
-            if response.status_code == 200:
-                QMessageBox.information(self, "Success", "Return processed successfully")
-                self._reset_return_flow()
-            else:
-                error_msg = response.json().get('message', 'Return failed')
-                raise Exception(error_msg)
-                
-        except Exception as e:
-            progress.close()
-            QMessageBox.critical(self, "Error", f"Return failed: {str(e)}")
+        # Prepare payload
+        payload = {
+            "rfidTags": [
+                {
+                    "uid": asset['rfidTag'].get('uid'),
+                    "epc": asset['rfidTag'].get('epc')
+                }
+                for asset in self.scanned_assets
+            ]
+        }
+        
+        # Journaled locally and POSTed in the background, so this returns at once
+        transaction_queue().submit("return", payload, self.token, operator=self.user_data['email'])
+        for tag in payload['rfidTags']:  # Status is about to change server-side
+            asset_cache().invalidate(tag['epc'], tag['uid'])
+            asset_replica().invalidate(tag['epc'], tag['uid'])
+        QMessageBox.information(self, "Success", "Return saved; it is sent to the server in the background")
+        self._reset_return_flow()
+
+    def _transaction_settled(self, transaction):
+        """A queued transaction reached the backend (GUI thread)"""
+        if transaction.kind != "return":
+            return
+        for tag in transaction.payload['rfidTags']:
+            asset_cache().invalidate(tag['epc'], tag['uid'])
+            asset_replica().invalidate(tag['epc'], tag['uid'])
+        if transaction.status == "rejected" and not transaction.replayed:  # Replayed ones are shown by the app
+            QMessageBox.warning(self, "Warning", f"Return was rejected by the server: {transaction.error}")
 
     def _reset_return_flow(self):
         """Reset the return process"""
-        self.scanned_assets = []
+        self.scanned_assets.clear()
         self.products_table.setRowCount(0)
         self.return_table.setRowCount(0)
         self.txt_email.clear()
@@ -474,17 +420,17 @@ class ReturningPage(QWidget):
 
     # RFID-related methods (similar to other pages)
     def _refresh_com_ports(self):
-        check_connection.testConnect()
         self.cb_com_ports.clear()
-        ports = serial.tools.list_ports.comports()
+        # Known reader USB IDs come first, so the likely reader is preselected
+        ports = port_discovery().ports()
         for port in ports:
-            self.cb_com_ports.addItem(f"{port.device} - {port.description}")
+            self.cb_com_ports.addItem(port.label())
         
         if not ports:
             self.cb_com_ports.addItem("No COM ports found")
 
     def toggle_rfid_connection(self):
-        if self.rfid_thread.connection_established:
+        if self.reader.connected:
             self._disconnect_reader()
         else:
             selected_port = self.cb_com_ports.currentText().split(' - ')[0]
@@ -495,22 +441,16 @@ class ReturningPage(QWidget):
 
     def _connect_reader(self, port: str):
         try:
-            check_connection.testConnect()
             self.btn_connect.setEnabled(False)
             self.btn_connect.setText("Connecting...")
             QApplication.processEvents()
             
-            if not self.rfid_thread.connect_reader(port):
+            if not reader_service().connect_reader(port):
                 raise Exception("Failed to connect reader")
-                
-            if not self.rfid_thread.isRunning():
-                self.rfid_thread.start()
-                
-            time.sleep(0.5)
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to connect: {str(e)}")
-            self.rfid_thread.disconnect_reader()
+            self._update_connection_ui(False)
         finally:
             self.btn_connect.setEnabled(True)
 
@@ -520,16 +460,8 @@ class ReturningPage(QWidget):
             self.btn_connect.setText("Disconnecting...")
             QApplication.processEvents()
             
-            if self.rfid_thread.isRunning():
-                self.rfid_thread.stop_scanning()
-                
-            self.rfid_thread.quit()
-            self.rfid_thread.wait(1000)
-            
-            if self.rfid_thread.isRunning():
-                self.rfid_thread.terminate()
-                
-            self.rfid_thread.disconnect_reader()
+            # Disconnects the reader for every page, stopping their scans too
+            reader_service().disconnect_reader()
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to disconnect: {str(e)}")
@@ -537,16 +469,16 @@ class ReturningPage(QWidget):
             self.btn_connect.setEnabled(True)
 
     def toggle_scanning(self):
-        if not self.rfid_thread.connection_established:
+        if not self.reader.connected:
             QMessageBox.warning(self, "Warning", "Please connect to reader first")
             return
             
-        if self.rfid_thread._should_scan:
-            self.rfid_thread.stop_scanning()
+        if self.reader.scanning:
+            self.reader.stop_scanning()
             self.btn_scan.setText("Start Scanning")
             self.btn_scan.setIcon(QIcon("icons/rfid.png"))
         else:
-            self.rfid_thread.start_scanning()
+            self.reader.start_scanning()
             self.btn_scan.setText("Stop Scanning")
             self.btn_scan.setIcon(QIcon("icons/stop.png"))
 
@@ -575,6 +507,8 @@ class ReturningPage(QWidget):
 
     def go_to_main_menu(self):
         """Return to main menu"""
-        if self.rfid_thread.isRunning():
-            self.rfid_thread.stop_thread()
+        # Stop this page's scan; the reader stays connected for the other pages
+        if self.reader.scanning:
+            self.reader.stop_scanning()
+        self._update_connection_ui(self.reader.connected)
         # Implement navigation to main menu as needed
\ No newline at end of file
@@ -1,5 +1,7 @@
-import serial
 from PyQt6.QtCore import QObject, pyqtSignal
+from lazy_import import lazy_module
+
+serial = lazy_module("serial")  # Loaded on the first connect()
 
 class RFIDReader(QObject):
     tag_scanned = pyqtSignal(dict)  # {'uid': '...', 'epc': '...'}
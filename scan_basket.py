@@ -0,0 +1,58 @@
+class ScanBasket:
+    """Assets scanned in one session, keyed by EPC in scan order.
+
+    Membership, removal and the table row of an EPC are dict lookups, so the
+    pages no longer walk their table or asset list per scanned tag. Rows
+    follow insertion order like the page's table: removing one shifts the
+    rows after it, and ``remove()`` returns the row to delete at that moment,
+    which keeps "Remove" buttons right after earlier rows are gone.
+    """
+
+    def __init__(self) -> None:
+        self._assets: dict[str, dict] = {}
+        self._rows: dict[str, int] = {}
+
+    def __contains__(self, epc: str) -> bool:
+        return epc in self._assets
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def __iter__(self):
+        return iter(self._assets.values())
+
+    def get(self, epc: str) -> dict | None:
+        return self._assets.get(epc)
+
+    def row_of(self, epc: str) -> int | None:
+        return self._rows.get(epc)
+
+    def add(self, asset: dict) -> int | None:
+        """Add an asset by its EPC; returns its new row, or None if it has no EPC or is already in"""
+        epc = asset.get('rfidTag', {}).get('epc', '')
+        if not epc or epc in self._assets:
+            return None
+        self._assets[epc] = asset
+        self._rows[epc] = len(self._rows)
+        return self._rows[epc]
+
+    def remove(self, epc: str) -> int | None:
+        """Drop an EPC; returns the row it had, or None if it wasn't in the basket"""
+        if epc not in self._assets:
+            return None
+        del self._assets[epc]
+        row = self._rows.pop(epc)
+        for other, other_row in self._rows.items():
+            if other_row > row:
+                self._rows[other] = other_row - 1
+        return row
+
+    def clear(self) -> None:
+        self._assets.clear()
+        self._rows.clear()
+
+# # Contoh penggunaan
+# basket = ScanBasket()
+# row = basket.add(asset)  # None kalau EPC sudah ada
+# if epc in basket:
+#     table.removeRow(basket.remove(epc))
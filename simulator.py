@@ -0,0 +1,510 @@
+import os
+import random
+import select
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from socket import socket, AF_INET, SOCK_STREAM, SOL_SOCKET, SO_REUSEADDR
+
+from command import *
+from response import *
+from transport import Transport, ReceiveBuffer, RECEIVE_CHUNK_SIZE
+from utils import calculate_checksum
+
+TAG_ERROR_MEMORY_OVERRUN: int = 0x03
+TAG_ERROR_MEMORY_LOCKED: int = 0x04
+
+MAX_FRAME_DATA: int = 240
+
+
+def build_frame(command: int, status: int, data: bytes = b"", reader_address: int = 0x00) -> bytes:
+    """Build a reader -> host frame the way Response expects to parse it."""
+    frame = bytearray([5 + len(data), reader_address, command, status])
+    frame.extend(data)
+    frame.extend(calculate_checksum(frame))
+    return bytes(frame)
+
+
+@dataclass
+class SimulatedTag:
+    epc: bytes
+    tid: bytes
+    user: bytearray = field(default_factory=lambda: bytearray(64))
+    kill_password: bytes = bytes(4)
+    access_password: bytes = bytes(4)
+    protection: dict = field(default_factory=dict)  # lock select -> protect code
+    pc_flags: int = 0  # Low 11 bits of the PC (UMI, XI, T, AFI/NSI); the top five are the EPC length
+
+    def pc(self) -> bytes:
+        return ((len(self.epc) // 2) << 11 | self.pc_flags).to_bytes(2, "big")
+
+    def bank(self, memory_bank: int) -> bytes:
+        if memory_bank == InventoryMemoryBank.PASSWORD.value:
+            return self.kill_password + self.access_password
+        if memory_bank == InventoryMemoryBank.EPC.value:
+            pc = self.pc()
+            return bytes(calculate_checksum(pc + self.epc)) + pc + self.epc
+        if memory_bank == InventoryMemoryBank.TID.value:
+            return self.tid
+        if memory_bank == InventoryMemoryBank.USER.value:
+            return bytes(self.user)
+        raise KeyError(memory_bank)
+
+    def bank_capacity(self, memory_bank: int) -> int:
+        if memory_bank == InventoryMemoryBank.EPC.value:
+            return 4 + 62  # CRC + PC + up to 31 EPC words
+        return len(self.bank(memory_bank))
+
+    def write_bank(self, memory_bank: int, offset: int, data: bytes) -> None:
+        if memory_bank == InventoryMemoryBank.PASSWORD.value:
+            passwords = bytearray(self.kill_password + self.access_password)
+            passwords[offset:offset + len(data)] = data
+            self.kill_password, self.access_password = bytes(passwords[:4]), bytes(passwords[4:8])
+        elif memory_bank == InventoryMemoryBank.EPC.value:
+            # Words 0-1 are CRC and PC (derived here); the EPC starts at word 2
+            skip = max(4 - offset, 0)
+            start = max(offset - 4, 0)
+            epc = bytearray(self.epc)
+            epc[start:start + len(data) - skip] = data[skip:]
+            if offset <= 2 < offset + len(data) - 1:
+                # A written PC sets the EPC length (its top five bits, in words) and the flags
+                pc = int.from_bytes(data[2 - offset:4 - offset], "big")
+                words, self.pc_flags = pc >> 11, pc & 0x07FF
+                epc = epc[:words * 2].ljust(words * 2, b"\x00")
+            self.epc = bytes(epc)
+        elif memory_bank == InventoryMemoryBank.USER.value:
+            self.user[offset:offset + len(data)] = data
+        else:
+            raise KeyError(memory_bank)
+
+
+def make_population(count: int, seed: int = 0, epc_length: int = 12) -> list[SimulatedTag]:
+    rng = random.Random(seed)
+    return [SimulatedTag(epc=rng.randbytes(epc_length), tid=b"\xE2\x80\x11\x70" + rng.randbytes(8))
+            for _ in range(count)]
+
+
+class ReaderSimulator:
+    """Protocol side of a simulated reader: command frames in, response frames out.
+
+    Everything random (tag churn, injected errors) is drawn from one seeded
+    generator, so the same seed and command sequence give the same frames.
+    """
+
+    def __init__(self, tags: list[SimulatedTag] | None = None, reader_address: int = 0x00,
+                 seed: int = 0, churn_rate: float = 0.0, drop_rate: float = 0.0,
+                 corrupt_rate: float = 0.0, error_rate: float = 0.0) -> None:
+        self.tags: list[SimulatedTag] = list(tags or [])
+        self.in_field: list[bool] = [True] * len(self.tags)
+        self.reader_address = reader_address
+        self.random = random.Random(seed)
+        self.churn_rate = churn_rate
+        self.drop_rate = drop_rate
+        self.corrupt_rate = corrupt_rate
+        self.error_rate = error_rate
+        self.power = 30
+        # Same layout WorkMode parses: wiegand x4, inventory mode, state, bank,
+        # first address, word number, single tag time, accuracy, offset time
+        self.work_mode = bytearray([0, 10, 10, 15,
+                                    InventoryWorkMode.ANSWER_MODE.value, 0b00010,
+                                    InventoryMemoryBank.EPC.value, 0, 6, 1, 0, 0])
+        self.commands_handled = 0
+        self._handlers = {
+            CMD_INVENTORY: self._inventory,
+            CMD_READ_MEMORY: self._read_memory,
+            CMD_WRITE_MEMORY: self._write_memory,
+            CMD_WRITE_EPC: self._write_epc,
+            CMD_SET_LOCK: self._set_lock,
+            CMD_SET_READER_POWER: self._set_power,
+            CMD_GET_WORK_MODE: self._get_work_mode,
+            CMD_SET_WORK_MODE: self._set_work_mode,
+        }
+
+    @property
+    def active_mode(self) -> bool:
+        return self.work_mode[4] == InventoryWorkMode.ACTIVE_MODE.value
+
+    def add_tag(self, tag: SimulatedTag) -> None:
+        self.tags.append(tag)
+        self.in_field.append(True)
+
+    def visible_tags(self) -> list[SimulatedTag]:
+        return [tag for tag, present in zip(self.tags, self.in_field) if present]
+
+    def handle_frame(self, frame: bytes) -> list[bytes]:
+        if len(frame) < 5 or calculate_checksum(frame[:-2]) != frame[-2:]:
+            return []  # Readers stay silent on frames they cannot decode
+        if frame[1] not in (0xFF, self.reader_address):
+            return []
+        self.commands_handled += 1
+        command, data = frame[2], bytes(frame[3:-2])
+
+        if self.drop_rate and self.random.random() < self.drop_rate:
+            return []
+        handler = self._handlers.get(command)
+        if handler is None:
+            return [self._frame(command, STATUS_ILLEGAL_COMMAND)]
+        if self.error_rate and self.random.random() < self.error_rate:
+            frames = [self._frame(command, STATUS_POOR_COMMUNICATION)]
+        else:
+            frames = handler(data)
+        if self.corrupt_rate and frames and self.random.random() < self.corrupt_rate:
+            corrupted = bytearray(frames[-1])
+            corrupted[-1] ^= 0xFF
+            frames[-1] = bytes(corrupted)
+        return frames
+
+    def active_round(self) -> list[bytes]:
+        """Frames an active-mode reader sends by itself for one inventory cycle."""
+        self._churn()
+        return [self._frame(CMD_ACTIVE_INVENTORY, STATUS_SUCCESS, tag.epc) for tag in self.visible_tags()]
+
+    def _frame(self, command: int, status: int, data: bytes = b"") -> bytes:
+        return build_frame(command, status, data, self.reader_address)
+
+    def _churn(self) -> None:
+        if not self.churn_rate:
+            return
+        for index in range(len(self.tags)):
+            if self.random.random() < self.churn_rate:
+                self.in_field[index] = not self.in_field[index]
+
+    def _find(self, epc: bytes) -> SimulatedTag | None:
+        for tag in self.visible_tags():
+            if tag.epc == epc:
+                return tag
+        return None
+
+    @staticmethod
+    def _split_epc(data: bytes) -> tuple[bytes, bytes]:
+        epc_end = 1 + data[0] * 2
+        return data[1:epc_end], data[epc_end:]
+
+    def _inventory(self, data: bytes) -> list[bytes]:
+        if len(data) not in (0, 2):
+            return [self._frame(CMD_INVENTORY, STATUS_PARAMETER_ERROR)]
+        self._churn()
+        blocks = []
+        for tag in self.visible_tags():
+            if not data:
+                blocks.append(tag.epc)
+                continue
+            # With a TID requested each block is PC + EPC + TID; a short TID is left out
+            tid = tag.tid[data[0] * 2:(data[0] + data[1]) * 2]
+            blocks.append(tag.pc() + tag.epc + (tid if len(tid) == data[1] * 2 else b""))
+
+        frames, payload, count = [], bytearray(), 0
+        for block in blocks:
+            if payload and 1 + len(payload) + 1 + len(block) > MAX_FRAME_DATA:
+                frames.append(self._frame(CMD_INVENTORY, STATUS_INVENTORY_MORE_FRAMES, bytes([count]) + payload))
+                payload, count = bytearray(), 0
+            payload.append(len(block))
+            payload.extend(block)
+            count += 1
+        frames.append(self._frame(CMD_INVENTORY, STATUS_INVENTORY_COMPLETE, bytes([count]) + payload))
+        return frames
+
+    @staticmethod
+    def _wrong_password(tag: SimulatedTag, password: bytes) -> bool:
+        # The reader only runs Access for a non-zero password, which must then match
+        return any(password) and password != tag.access_password
+
+    def _check_access(self, tag: SimulatedTag, lock_select: int, password: bytes) -> bool:
+        protect = tag.protection.get(lock_select, PROTECT_WRITABLE)
+        if protect == PROTECT_NEVER_WRITABLE:
+            return False
+        if protect == PROTECT_SECURED:
+            return password == tag.access_password
+        return True
+
+    def _read_memory(self, data: bytes) -> list[bytes]:
+        epc, rest = self._split_epc(data)
+        if len(rest) < 7:
+            return [self._frame(CMD_READ_MEMORY, STATUS_COMMAND_LENGTH_WRONG)]
+        memory_bank, word_pointer, word_count, password = rest[0], rest[1], rest[2], rest[3:7]
+        tag = self._find(epc)
+        if tag is None:
+            return [self._frame(CMD_READ_MEMORY, STATUS_NO_TAG)]
+        if self._wrong_password(tag, password):
+            return [self._frame(CMD_READ_MEMORY, STATUS_ACCESS_PASSWORD_ERROR)]
+        if memory_bank == InventoryMemoryBank.PASSWORD.value and not self._check_access(
+                tag, LOCK_SELECT_ACCESS_PASSWORD, password):
+            return [self._frame(CMD_READ_MEMORY, STATUS_TAG_ERROR, bytes([TAG_ERROR_MEMORY_LOCKED]))]
+        try:
+            bank = tag.bank(memory_bank)
+        except KeyError:
+            return [self._frame(CMD_READ_MEMORY, STATUS_PARAMETER_ERROR)]
+        start, end = word_pointer * 2, (word_pointer + word_count) * 2
+        if end > len(bank):
+            return [self._frame(CMD_READ_MEMORY, STATUS_TAG_ERROR, bytes([TAG_ERROR_MEMORY_OVERRUN]))]
+        return [self._frame(CMD_READ_MEMORY, STATUS_SUCCESS, bank[start:end])]
+
+    def _write_memory(self, data: bytes) -> list[bytes]:
+        word_count = data[0]
+        epc, rest = self._split_epc(data[1:])
+        if len(rest) != 2 + word_count * 2 + 4:
+            return [self._frame(CMD_WRITE_MEMORY, STATUS_COMMAND_LENGTH_WRONG)]
+        memory_bank, word_pointer = rest[0], rest[1]
+        to_write, password = rest[2:2 + word_count * 2], rest[-4:]
+        tag = self._find(epc)
+        if tag is None:
+            return [self._frame(CMD_WRITE_MEMORY, STATUS_NO_TAG)]
+        if self._wrong_password(tag, password):
+            return [self._frame(CMD_WRITE_MEMORY, STATUS_ACCESS_PASSWORD_ERROR)]
+        lock_select = {InventoryMemoryBank.PASSWORD.value: LOCK_SELECT_ACCESS_PASSWORD,
+                       InventoryMemoryBank.EPC.value: LOCK_SELECT_EPC,
+                       InventoryMemoryBank.TID.value: LOCK_SELECT_TID,
+                       InventoryMemoryBank.USER.value: LOCK_SELECT_USER}.get(memory_bank)
+        if lock_select is None or lock_select == LOCK_SELECT_TID:
+            return [self._frame(CMD_WRITE_MEMORY, STATUS_TAG_ERROR, bytes([TAG_ERROR_MEMORY_LOCKED]))]
+        if not self._check_access(tag, lock_select, password):
+            return [self._frame(CMD_WRITE_MEMORY, STATUS_TAG_ERROR, bytes([TAG_ERROR_MEMORY_LOCKED]))]
+        offset = word_pointer * 2
+        if offset + len(to_write) > tag.bank_capacity(memory_bank):
+            return [self._frame(CMD_WRITE_MEMORY, STATUS_TAG_ERROR, bytes([TAG_ERROR_MEMORY_OVERRUN]))]
+        tag.write_bank(memory_bank, offset, to_write)
+        return [self._frame(CMD_WRITE_MEMORY, STATUS_SUCCESS)]
+
+    def _write_epc(self, data: bytes) -> list[bytes]:
+        if not data or len(data) != 1 + 4 + data[0] * 2:
+            return [self._frame(CMD_WRITE_EPC, STATUS_COMMAND_LENGTH_WRONG)]
+        password, new_epc = data[1:5], data[5:]
+        tags = self.visible_tags()
+        if not tags:
+            return [self._frame(CMD_WRITE_EPC, STATUS_NO_TAG)]
+        tag = tags[0]  # The command addresses whichever single tag is in the field
+        if self._wrong_password(tag, password):
+            return [self._frame(CMD_WRITE_EPC, STATUS_ACCESS_PASSWORD_ERROR)]
+        if not self._check_access(tag, LOCK_SELECT_EPC, password):
+            return [self._frame(CMD_WRITE_EPC, STATUS_TAG_ERROR, bytes([TAG_ERROR_MEMORY_LOCKED]))]
+        tag.epc = new_epc
+        return [self._frame(CMD_WRITE_EPC, STATUS_SUCCESS)]
+
+    def _set_lock(self, data: bytes) -> list[bytes]:
+        epc, rest = self._split_epc(data)
+        if len(rest) != 6:
+            return [self._frame(CMD_SET_LOCK, STATUS_COMMAND_LENGTH_WRONG)]
+        lock_select, set_protect, password = rest[0], rest[1], rest[2:6]
+        if lock_select > LOCK_SELECT_USER or set_protect > PROTECT_NEVER_WRITABLE:
+            return [self._frame(CMD_SET_LOCK, STATUS_PARAMETER_ERROR)]
+        tag = self._find(epc)
+        if tag is None:
+            return [self._frame(CMD_SET_LOCK, STATUS_NO_TAG)]
+        if password != tag.access_password or tag.access_password == bytes(4):
+            return [self._frame(CMD_SET_LOCK, STATUS_ACCESS_PASSWORD_ERROR)]
+        current = tag.protection.get(lock_select, PROTECT_WRITABLE)
+        if current in (PROTECT_PERMANENTLY_WRITABLE, PROTECT_NEVER_WRITABLE) and set_protect != current:
+            return [self._frame(CMD_SET_LOCK, STATUS_TAG_ERROR, bytes([TAG_ERROR_MEMORY_LOCKED]))]
+        tag.protection[lock_select] = set_protect
+        return [self._frame(CMD_SET_LOCK, STATUS_SUCCESS)]
+
+    def _set_power(self, data: bytes) -> list[bytes]:
+        if len(data) != 1 or data[0] > 30:
+            return [self._frame(CMD_SET_READER_POWER, STATUS_PARAMETER_ERROR)]
+        self.power = data[0]
+        return [self._frame(CMD_SET_READER_POWER, STATUS_SUCCESS)]
+
+    def _get_work_mode(self, data: bytes) -> list[bytes]:
+        return [self._frame(CMD_GET_WORK_MODE, STATUS_SUCCESS, bytes(self.work_mode))]
+
+    def _set_work_mode(self, data: bytes) -> list[bytes]:
+        if len(data) != 6:
+            return [self._frame(CMD_SET_WORK_MODE, STATUS_COMMAND_LENGTH_WRONG)]
+        self.work_mode[4:10] = data
+        return [self._frame(CMD_SET_WORK_MODE, STATUS_SUCCESS)]
+
+
+class SimulatedTransport(Transport):
+    """Transport backed by a ReaderSimulator instead of hardware.
+
+    Responses become readable only after the command and response have
+    crossed the emulated serial line (10 bits per byte at ``baud_rate``, 0
+    disables it) plus ``latency`` seconds of reader turnaround. Several
+    commands in one write are handled one after another, each as it has
+    arrived and the previous one is done. In active mode the reader pushes
+    one inventory round every ``active_interval``.
+    """
+
+    def __init__(self, simulator: ReaderSimulator | None = None, baud_rate: int = 57600,
+                 latency: float = 0.0, timeout: float = 1, active_interval: float = 0.05) -> None:
+        self.simulator = simulator or ReaderSimulator()
+        self.baud_rate = baud_rate
+        self.latency = latency
+        self.timeout = timeout
+        self.active_interval = active_interval
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self._receive_buffer = ReceiveBuffer()
+        self._commands = ReceiveBuffer()
+        self._output: deque[tuple[float, bytes]] = deque()
+        self._line_free_at = 0.0
+        self._reader_free_at = 0.0
+        self._next_active_at = 0.0
+        self._closed = False
+
+    @property
+    def round_trips(self) -> int:
+        return self.simulator.commands_handled
+
+    def _wire_time(self, size: int) -> float:
+        return size * 10 / self.baud_rate if self.baud_rate else 0.0
+
+    def _schedule(self, frames: list[bytes], start: float) -> None:
+        ready_at = max(start, self._line_free_at)
+        for frame in frames:
+            ready_at += self._wire_time(len(frame))
+            self._output.append((ready_at, frame))
+        self._line_free_at = ready_at
+
+    def write_bytes(self, buffer: bytes) -> None:
+        if self._closed:
+            raise ConnectionError("Simulated reader is closed")
+        self.bytes_written += len(buffer)
+        now = time.monotonic()
+        self._commands.feed(buffer)
+        received = 0
+        for frame in self._commands.pop_frames():
+            received = min(received + len(frame), len(buffer))
+            arrived_at = now + self._wire_time(received)
+            self._reader_free_at = max(arrived_at, self._reader_free_at) + self.latency
+            self._schedule(self.simulator.handle_frame(bytes(frame)), self._reader_free_at)
+
+    def _generate_active(self, now: float) -> None:
+        if self.simulator.active_mode and not self._output and now >= self._next_active_at:
+            self._schedule(self.simulator.active_round(), now)
+            self._next_active_at = max(self._line_free_at, now) + self.active_interval
+
+    def next_output_at(self) -> float | None:
+        """Monotonic time the next queued byte becomes readable, if any."""
+        if self._output:
+            return self._output[0][0]
+        if self.simulator.active_mode:
+            return self._next_active_at
+        return None
+
+    def poll_output(self, max_length: int = RECEIVE_CHUNK_SIZE) -> bytes:
+        """Non-blocking: every response byte that has already 'arrived'."""
+        now = time.monotonic()
+        self._generate_active(now)
+        chunk = bytearray()
+        while self._output and self._output[0][0] <= now and len(chunk) < max_length:
+            chunk.extend(self._output.popleft()[1])
+        self.bytes_read += len(chunk)
+        return bytes(chunk)
+
+    def read_available(self, max_length: int = RECEIVE_CHUNK_SIZE, min_length: int = 1) -> bytes:
+        deadline = time.monotonic() + self.timeout
+        while not self._closed:
+            chunk = self.poll_output(max_length)
+            if chunk:
+                return chunk
+            now = time.monotonic()
+            ready_at = self.next_output_at()
+            if now >= deadline:
+                return b""
+            time.sleep(max(min(ready_at if ready_at is not None else deadline, deadline) - now, 0))
+        return b""
+
+    def read_bytes(self, length: int) -> bytes:
+        return self._read_exact(length)
+
+    def close(self) -> None:
+        self._closed = True
+
+
+class _SimulatorBridge:
+    """Pumps bytes between a file-like endpoint and a SimulatedTransport."""
+
+    def __init__(self, transport: SimulatedTransport) -> None:
+        self.transport = transport
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _pump(self, endpoint, receive, send) -> None:
+        while not self._stop.is_set():
+            ready_at = self.transport.next_output_at()
+            wait = 0.05 if ready_at is None else min(max(ready_at - time.monotonic(), 0), 0.05)
+            readable, _, _ = select.select([endpoint], [], [], wait)
+            if readable:
+                data = receive()
+                if not data:
+                    return
+                self.transport.write_bytes(data)
+            output = self.transport.poll_output()
+            if output:
+                send(output)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1)
+
+
+class SimulatorTcpServer(_SimulatorBridge):
+    """Serves a simulated reader on a local TCP port for TcpTransport."""
+
+    def __init__(self, transport: SimulatedTransport, host: str = "127.0.0.1", port: int = 0) -> None:
+        super().__init__(transport)
+        self.server = socket(AF_INET, SOCK_STREAM)
+        self.server.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
+        self.server.bind((host, port))
+        self.server.listen(1)
+        self.address: tuple[str, int] = self.server.getsockname()
+
+    def start(self) -> tuple[str, int]:
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self.address
+
+    def _serve(self) -> None:
+        self.server.settimeout(0.1)
+        while not self._stop.is_set():
+            try:
+                connection, _ = self.server.accept()
+            except TimeoutError:
+                continue
+            with connection:
+                self._pump(connection, lambda: connection.recv(RECEIVE_CHUNK_SIZE), connection.sendall)
+
+    def stop(self) -> None:
+        super().stop()
+        self.server.close()
+
+
+class SimulatorPty(_SimulatorBridge):
+    """Exposes a simulated reader as a pseudo-terminal for SerialTransport."""
+
+    def __init__(self, transport: SimulatedTransport) -> None:
+        if sys.platform.startswith('win'):
+            raise EnvironmentError('Pseudo-terminals are not available on Windows')
+        super().__init__(transport)
+        import tty
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        self.device: str = os.ttyname(self.slave_fd)
+
+    def start(self) -> str:
+        self._thread = threading.Thread(
+            target=self._pump,
+            args=(self.master_fd, lambda: os.read(self.master_fd, RECEIVE_CHUNK_SIZE),
+                  lambda data: os.write(self.master_fd, data)),
+            daemon=True)
+        self._thread.start()
+        return self.device
+
+    def stop(self) -> None:
+        super().stop()
+        os.close(self.master_fd)
+        os.close(self.slave_fd)
+
+# # Simulated reader dengan 80 tag
+# transport = SimulatedTransport(ReaderSimulator(make_population(80)), baud_rate=57600)
+# reader = Reader(transport)
+# print(len(list(reader.inventory_with_tid())))
+#
+# # Lewat TCP
+# server = SimulatorTcpServer(SimulatedTransport(ReaderSimulator(make_population(10))))
+# host, port = server.start()
+# reader = Reader(TcpTransport(host, port))
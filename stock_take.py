@@ -0,0 +1,106 @@
+from array import array
+from typing import Iterable, NamedTuple
+
+
+class StockTakeDelta(NamedTuple):
+    """What one batch of reads changed; only first sightings are listed"""
+    found: list[str]  # Expected here, seen for the first time
+    misplaced: list[str]  # Known assets that belong elsewhere
+    unexpected: list[str]  # EPCs the asset store does not know
+
+
+class StockTake:
+    """Cycle count of one location: the tags read there against the assets that belong there.
+
+    ``tags`` are (EPC, location, name) rows of every known asset. Each EPC
+    gets a position in flat arrays; the seen-set is one byte per position,
+    so 50k assets take 50 kB and a read costs one dict lookup. ``add()``
+    takes read batches as they stream in, duplicates included, and returns
+    only what changed, so a page can update its lists and counters live.
+    ``missing()`` walks the expected positions once, when asked.
+    """
+
+    def __init__(self, tags: Iterable[tuple[str, str, str]], location: str) -> None:
+        self.location = location
+        self._index: dict[str, int] = {}
+        self._epcs: list[str] = []
+        self._homes: list[str] = []
+        self._names: list[str] = []
+        wanted = location.strip().casefold()
+        expected = array('I')
+        for epc, home, name in tags:
+            if not epc or epc in self._index:
+                continue
+            position = len(self._epcs)
+            self._index[epc] = position
+            self._epcs.append(epc)
+            self._homes.append(home or '')
+            self._names.append(name or '')
+            if (home or '').strip().casefold() == wanted:
+                expected.append(position)
+        self._expected = expected
+        self._is_expected = bytearray(len(self._epcs))
+        for position in expected:
+            self._is_expected[position] = 1
+        self.reset()
+
+    @classmethod
+    def from_replica(cls, replica, location: str) -> "StockTake":
+        """Expected set from the local asset replica (see ``AssetReplica.tag_locations``)"""
+        return cls(replica.tag_locations(), location)
+
+    def reset(self) -> None:
+        self._seen = bytearray(len(self._epcs))
+        self.found = 0
+        self.reads = 0
+        self.misplaced: dict[str, str] = {}  # EPC -> location it belongs to
+        self.unexpected: set[str] = set()
+
+    @property
+    def expected(self) -> int:
+        return len(self._expected)
+
+    def add(self, epcs: Iterable[str]) -> StockTakeDelta:
+        delta = StockTakeDelta([], [], [])
+        index, seen, is_expected = self._index, self._seen, self._is_expected
+        reads = 0
+        for epc in epcs:
+            reads += 1
+            position = index.get(epc)
+            if position is None:
+                if epc not in self.unexpected:
+                    self.unexpected.add(epc)
+                    delta.unexpected.append(epc)
+            elif not seen[position]:
+                seen[position] = 1
+                if is_expected[position]:
+                    delta.found.append(epc)
+                else:
+                    self.misplaced[epc] = self._homes[position]
+                    delta.misplaced.append(epc)
+        self.reads += reads
+        self.found += len(delta.found)
+        return delta
+
+    def missing(self) -> list[str]:
+        seen, epcs = self._seen, self._epcs
+        return [epcs[position] for position in self._expected if not seen[position]]
+
+    def name(self, epc: str) -> str:
+        position = self._index.get(epc)
+        return self._names[position] if position is not None else ''
+
+    def home(self, epc: str) -> str:
+        position = self._index.get(epc)
+        return self._homes[position] if position is not None else ''
+
+    def summary(self) -> dict:
+        return {'expected': self.expected, 'found': self.found, 'missing': self.expected - self.found,
+                'misplaced': len(self.misplaced), 'unexpected': len(self.unexpected), 'reads': self.reads}
+
+# # Contoh penggunaan
+# count = StockTake.from_replica(asset_replica(), "Gudang A")
+# for batch in ContinuousInventory(reader).run_batched():
+#     delta = count.add(tag['epc'] for tag in batch)
+#     print(count.summary(), delta.misplaced, delta.unexpected)
+# print(count.missing())
@@ -0,0 +1,312 @@
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QMessageBox, QHeaderView,
+    QGroupBox, QComboBox, QTabWidget, QApplication
+)
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QIcon
+from api_executor import api_executor
+from port_discovery import port_discovery
+from reader_service import reader_service
+from asset_replica import asset_replica
+from stock_take import StockTake
+
+MISSING_ROWS_SHOWN = 1000  # The missing list can be tens of thousands long; show the first ones
+
+
+class StockTakePage(QWidget):
+    """Walk a room with the reader and reconcile what is there against the asset store"""
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+        self.stock_take = None
+        self._missing_dirty = False
+        # Every read counts towards the tally; StockTake drops the repeats
+        self.reader = reader_service().subscribe(dedupe=False)
+        self._missing_timer = QTimer(self)
+        self._missing_timer.setInterval(1000)
+        self._missing_timer.timeout.connect(self._refresh_missing)
+        self.init_ui()
+        self._setup_rfid_connections()
+
+    def init_ui(self):
+        self.layout = QVBoxLayout(self)
+
+        # Tombol kembali
+        self.back_button = QPushButton("Back to Main Menu")
+        self.back_button.setIcon(QIcon("icons/back.png"))
+        self.back_button.setStyleSheet("""
+            QPushButton {
+                padding: 5px 10px;
+                background-color: #f0f0f0;
+                border: 1px solid #ccc;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #e0e0e0;
+            }
+        """)
+        self.back_button.clicked.connect(self.go_to_main_menu)
+        self.layout.addWidget(self.back_button, alignment=Qt.AlignmentFlag.AlignLeft)
+
+        title = QLabel("Stock Take")
+        title.setStyleSheet("font-size: 18px; font-weight: bold;")
+        self.layout.addWidget(title, alignment=Qt.AlignmentFlag.AlignCenter)
+
+        # RFID Connection Group
+        connection_group = QGroupBox("RFID Connection")
+        connection_layout = QVBoxLayout(connection_group)
+        port_layout = QHBoxLayout()
+        self.cb_com_ports = QComboBox()
+        self._refresh_com_ports()
+        port_layout.addWidget(QLabel("COM Port:"))
+        port_layout.addWidget(self.cb_com_ports)
+        refresh_btn = QPushButton("Refresh Ports")
+        refresh_btn.clicked.connect(self._refresh_com_ports)
+        port_layout.addWidget(refresh_btn)
+        connection_layout.addLayout(port_layout)
+
+        self.btn_connect = QPushButton("Connect to Reader")
+        self.btn_connect.setIcon(QIcon("icons/connect.png"))
+        self.btn_connect.clicked.connect(self.toggle_rfid_connection)
+        connection_layout.addWidget(self.btn_connect)
+        self.lbl_connection_status = QLabel("Status: Not connected")
+        connection_layout.addWidget(self.lbl_connection_status)
+        self.layout.addWidget(connection_group)
+
+        # Lokasi yang dihitung
+        location_layout = QHBoxLayout()
+        self.cb_location = QComboBox()
+        self.cb_location.setEditable(True)
+        location_layout.addWidget(QLabel("Location:"))
+        location_layout.addWidget(self.cb_location, 1)
+        reload_btn = QPushButton("Reload Locations")
+        reload_btn.clicked.connect(self._refresh_locations)
+        location_layout.addWidget(reload_btn)
+        self.layout.addLayout(location_layout)
+        self._refresh_locations()
+
+        self.btn_count = QPushButton("Start Count")
+        self.btn_count.setIcon(QIcon("icons/rfid.png"))
+        self.btn_count.setEnabled(False)
+        self.btn_count.clicked.connect(self.toggle_count)
+        self.layout.addWidget(self.btn_count)
+
+        self.lbl_summary = QLabel("Expected: 0   Found: 0   Missing: 0   Misplaced: 0   Unexpected: 0")
+        self.lbl_summary.setStyleSheet("font-size: 14px; font-weight: bold;")
+        self.layout.addWidget(self.lbl_summary)
+
+        self.tabs = QTabWidget()
+        self.missing_table = self._make_table(["Name", "RFID EPC"])
+        self.misplaced_table = self._make_table(["Name", "RFID EPC", "Belongs In"])
+        self.unexpected_table = self._make_table(["RFID EPC"])
+        self.tabs.addTab(self.missing_table, "Missing")
+        self.tabs.addTab(self.misplaced_table, "Misplaced")
+        self.tabs.addTab(self.unexpected_table, "Unexpected")
+        self.layout.addWidget(self.tabs)
+
+    def _make_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        return table
+
+    def _refresh_locations(self):
+        def fill(locations):
+            current = self.cb_location.currentText()
+            self.cb_location.clear()
+            self.cb_location.addItems(locations)
+            if current:
+                self.cb_location.setCurrentText(current)
+
+        # Not on the GUI thread: a full sync holds the replica's lock until it is written
+        api_executor().submit(asset_replica().locations, on_success=fill,
+                              on_error=lambda error: QMessageBox.warning(self, "Warning",
+                                                                         f"Could not load locations: {error}"))
+
+    def _setup_rfid_connections(self):
+        """Connect the shared reader's signals to slots"""
+        self.reader.tags_scanned.connect(self._handle_tags_scanned)
+        self.reader.reader_status.connect(self._update_reader_status)
+        service = reader_service()
+        service.reader_status.connect(self._update_reader_status)
+        service.connection_changed.connect(self._update_connection_ui)
+        service.error_occurred.connect(self._handle_rfid_error)
+        # Another page may already have connected the reader
+        self._update_connection_ui(service.connected)
+
+    def toggle_count(self):
+        if self._missing_timer.isActive():
+            self._stop_count()
+            return
+        location = self.cb_location.currentText().strip()
+        if not location:
+            QMessageBox.warning(self, "Warning", "Please choose the location to count")
+            return
+
+        def load():
+            replica = asset_replica()
+            return StockTake.from_replica(replica, location) if replica.ready else None
+
+        def loaded(stock_take):
+            self.btn_count.setEnabled(True)
+            if stock_take is None:
+                QMessageBox.warning(self, "Warning", "The asset list is not synced yet; try again shortly")
+                return
+            self._start_count(stock_take)
+
+        def failed(error):
+            self.btn_count.setEnabled(True)
+            QMessageBox.critical(self, "Error", f"Could not load the assets of {location}: {error}")
+
+        # Off the GUI thread, like _refresh_locations
+        self.btn_count.setEnabled(False)
+        api_executor().submit(load, on_success=loaded, on_error=failed)
+
+    def _start_count(self, stock_take):
+        self.stock_take = stock_take
+        for table in (self.missing_table, self.misplaced_table, self.unexpected_table):
+            table.setRowCount(0)
+        self._refresh_missing(force=True)
+        self._update_summary()
+        self._missing_timer.start()
+        self.btn_count.setText("Stop Count")
+        self.btn_count.setIcon(QIcon("icons/stop.png"))
+        self.reader.start_scanning()  # Last: a reader error stops the count again right away
+
+    def _stop_count(self):
+        self.reader.stop_scanning()
+        self._missing_timer.stop()
+        self._refresh_missing()
+        self.btn_count.setText("Start Count")
+        self.btn_count.setIcon(QIcon("icons/rfid.png"))
+
+    def _handle_tags_scanned(self, tags: list):
+        """Fold a batch of reads into the count; only first sightings touch the tables"""
+        if self.stock_take is None:
+            return
+        delta = self.stock_take.add(tag['epc'] for tag in tags)
+        for epc in delta.misplaced:
+            self._append_row(self.misplaced_table, [self.stock_take.name(epc), epc, self.stock_take.home(epc)])
+        for epc in delta.unexpected:
+            self._append_row(self.unexpected_table, [epc])
+        if delta.found:
+            self._missing_dirty = True  # Rebuilt by the timer, not per batch
+        if delta.found or delta.misplaced or delta.unexpected:
+            self._update_summary()
+
+    def _append_row(self, table, values):
+        row = table.rowCount()
+        table.insertRow(row)
+        for column, value in enumerate(values):
+            table.setItem(row, column, QTableWidgetItem(value))
+
+    def _refresh_missing(self, force=False):
+        if self.stock_take is None or not (self._missing_dirty or force):
+            return
+        self._missing_dirty = False
+        missing = self.stock_take.missing()
+        shown = missing[:MISSING_ROWS_SHOWN]
+        self.missing_table.setUpdatesEnabled(False)
+        self.missing_table.setRowCount(len(shown))
+        for row, epc in enumerate(shown):
+            self.missing_table.setItem(row, 0, QTableWidgetItem(self.stock_take.name(epc)))
+            self.missing_table.setItem(row, 1, QTableWidgetItem(epc))
+        self.missing_table.setUpdatesEnabled(True)
+        more = f" (first {len(shown)})" if len(missing) > len(shown) else ""
+        self.tabs.setTabText(0, f"Missing{more}")
+
+    def _update_summary(self):
+        summary = self.stock_take.summary()
+        self.lbl_summary.setText(
+            f"Expected: {summary['expected']}   Found: {summary['found']}   Missing: {summary['missing']}   "
+            f"Misplaced: {summary['misplaced']}   Unexpected: {summary['unexpected']}")
+
+    # RFID-related methods (similar to BorrowingPage)
+    def _refresh_com_ports(self):
+        self.cb_com_ports.clear()
+        # Known reader USB IDs come first, so the likely reader is preselected
+        ports = port_discovery().ports()
+        for port in ports:
+            self.cb_com_ports.addItem(port.label())
+
+        if not ports:
+            self.cb_com_ports.addItem("No COM ports found")
+
+    def toggle_rfid_connection(self):
+        if self.reader.connected:
+            self._disconnect_reader()
+        else:
+            selected_port = self.cb_com_ports.currentText().split(' - ')[0]
+            if selected_port and "No COM ports" not in selected_port:
+                self._connect_reader(selected_port)
+            else:
+                QMessageBox.warning(self, "Warning", "Please select a valid COM port")
+
+    def _connect_reader(self, port: str):
+        try:
+            self.btn_connect.setEnabled(False)
+            self.btn_connect.setText("Connecting...")
+            QApplication.processEvents()
+
+            if not reader_service().connect_reader(port):
+                raise Exception("Failed to connect reader")
+
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to connect: {str(e)}")
+            self._update_connection_ui(False)
+        finally:
+            self.btn_connect.setEnabled(True)
+
+    def _disconnect_reader(self):
+        try:
+            self.btn_connect.setEnabled(False)
+            self.btn_connect.setText("Disconnecting...")
+            QApplication.processEvents()
+
+            # Disconnects the reader for every page, stopping their scans too
+            reader_service().disconnect_reader()
+
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to disconnect: {str(e)}")
+        finally:
+            self.btn_connect.setEnabled(True)
+
+    def _update_reader_status(self, message: str):
+        self.lbl_connection_status.setText(f"Status: {message}")
+
+        if "Connected" in message:
+            self._update_connection_ui(True)
+        elif "disconnected" in message.lower():
+            self._update_connection_ui(False)
+
+    def _update_connection_ui(self, connected: bool):
+        if connected:
+            self.btn_connect.setText("Disconnect Reader")
+            self.btn_connect.setIcon(QIcon("icons/disconnect.png"))
+            self.btn_count.setEnabled(True)
+        else:
+            self.btn_connect.setText("Connect to Reader")
+            self.btn_connect.setIcon(QIcon("icons/connect.png"))
+            self.btn_count.setEnabled(False)
+            if self.reader.scanning or self._missing_timer.isActive():
+                self._stop_count()
+
+    def _handle_rfid_error(self, error_msg: str):
+        print(f"RFID Error: {error_msg}")
+        self._update_connection_ui(False)
+
+    def go_to_main_menu(self):
+        """Stop this page's count; the reader stays connected for the other pages"""
+        if self._missing_timer.isActive():
+            self._stop_count()
+
+    def closeEvent(self, event):
+        try:
+            self.reader.close()
+        except Exception as e:
+            print(f"Error during cleanup: {str(e)}")
+        super().closeEvent(event)
@@ -0,0 +1,247 @@
+from time import perf_counter
+from typing import Callable, Iterable, NamedTuple, Sequence
+
+from command import LOCK_SELECT_EPC, PROTECT_SECURED
+from reader import Reader
+from response import (Response, InventoryTag, InventoryMemoryBank, STATUS_SUCCESS, STATUS_NO_TAG,
+                      STATUS_TAG_ERROR, STATUS_ACCESS_PASSWORD_ERROR, STATUS_POOR_COMMUNICATION)
+
+PC_WORD: int = 1  # EPC bank: word 0 is the CRC, word 1 the PC, the EPC follows
+ACCESS_PASSWORD_WORD: int = 2  # Password bank: kill password in words 0-1, access password in 2-3
+
+_STATUS_TEXT = {
+    STATUS_NO_TAG: "tag not found",
+    STATUS_ACCESS_PASSWORD_ERROR: "wrong access password",
+    STATUS_POOR_COMMUNICATION: "poor communication",
+}
+
+
+class LockProfile(NamedTuple):
+    """Access password to set, then (lock select, protect) pairs to apply with it"""
+    access_password: bytes
+    locks: tuple[tuple[int, int], ...] = ((LOCK_SELECT_EPC, PROTECT_SECURED),)
+
+
+class EncodeJob(NamedTuple):
+    epc: bytes  # Target EPC
+    user_data: bytes | None = None  # Written from word 0 of the user bank
+    lock: LockProfile | None = None
+
+
+class EncodeResult(NamedTuple):
+    job: EncodeJob
+    source_epc: bytes  # EPC the tag had before; empty when no tag was found for the job
+    tid: bytes
+    ok: bool
+    step: str  # Failing step when not ok
+    error: str
+    seconds: float  # First command sent to the last reply for this tag
+
+
+class _Step(NamedTuple):
+    name: str
+    frame: bytes
+    expect: bytes | None = None  # Read-back data that must come back
+
+
+def _pc(epc: bytes, current: bytes) -> bytes:
+    # Only the length field (top five bits) changes; UMI, XI and the AFI/NSI bits stay as the tag has them
+    return ((len(epc) // 2) << 11 | int.from_bytes(current, "big") & 0x07FF).to_bytes(2, "big")
+
+
+def _status_error(response: Response) -> str:
+    if response.status == STATUS_TAG_ERROR and response.data:
+        return f"tag error 0x{response.data[0]:02X}"
+    return _STATUS_TEXT.get(response.status, f"status 0x{response.status:02X}")
+
+
+def _check(step: _Step, response: Response) -> str:
+    if response.status != STATUS_SUCCESS:
+        return _status_error(response)
+    if step.expect is not None and bytes(response.data) != step.expect:
+        return "read-back mismatch"
+    return ""
+
+
+class TagEncoder:
+    """Encodes a batch of tags on a station: target EPC, user memory, access password and locks.
+
+    ``encode()`` takes one inventory with TID and pairs the jobs with the
+    tags found, in TID order; a tag already carrying a job's EPC is that
+    job's tag, so a batch can simply be run again after a failure.
+    ``blank`` decides which other tags may be overwritten (default: all).
+    CMD_WRITE_EPC cannot pick a tag, so the EPC (with its PC word) goes
+    through Write Data selected by the tag's current EPC; the steps after it
+    select by the new one. The new PC keeps the flags of the tag's current
+    one (from the inventory, else read first). A tag resumed from an earlier
+    run is asked which access password opens it, since that run may have
+    failed before writing it. Every write is checked by reading it back, and
+    locks are only applied to tags that passed, since a permanent lock on a
+    bad write cannot be undone.
+
+    With ``pipeline`` the frames of ``window`` tags go to the reader in one
+    write and the replies are matched afterwards: write and read-back
+    steps in one write, the locks in a second. A failed step then does not
+    stop the ones after it for that tag, they just fail too. Without it each
+    step is a request/reply of its own and a tag stops at its first error.
+    A lost or out-of-order reply fails the whole window, locks none of its
+    tags, and the reader is drained until the line is quiet before the
+    next window.
+    """
+
+    def __init__(self, reader: Reader, pipeline: bool = True, window: int = 4,
+                 blank: Callable[[InventoryTag], bool] | None = None) -> None:
+        self.reader = reader
+        self.pipeline = pipeline
+        self.window = window if pipeline else 1
+        self.blank = blank
+
+    @staticmethod
+    def validate(jobs: Sequence[EncodeJob]) -> None:
+        targets = set()
+        for job in jobs:
+            if not job.epc or len(job.epc) % 2 or len(job.epc) > 62:
+                raise ValueError(f"EPC must be 1-31 words: {job.epc.hex()}")
+            if job.epc in targets:
+                raise ValueError(f"EPC {job.epc.hex()} is in the batch twice")
+            targets.add(job.epc)
+            if job.user_data is not None and len(job.user_data) % 2:
+                raise ValueError("User data must be whole words")
+            if job.lock is not None and (len(job.lock.access_password) != 4 or not any(job.lock.access_password)):
+                raise ValueError("Locking needs a non-zero 4-byte access password")
+
+    def assign(self, jobs: Sequence[EncodeJob],
+               tags: Iterable[InventoryTag]) -> list[tuple[EncodeJob, InventoryTag | None]]:
+        """Pair every job with a tag, or None when the field ran out of blank tags"""
+        by_epc = {}
+        for tag in tags:
+            by_epc.setdefault(tag.epc, tag)
+        targets = {job.epc for job in jobs}
+        blanks = iter(sorted((tag for epc, tag in by_epc.items()
+                              if epc not in targets and (self.blank is None or self.blank(tag))),
+                             key=lambda tag: tag.tid))
+        return [(job, by_epc.get(job.epc) or next(blanks, None)) for job in jobs]
+
+    def _request(self, frames: list[bytes]) -> list[Response]:
+        if self.pipeline:
+            return self.reader.request_many(frames) if frames else []
+        return [self.reader.request_many([frame])[0] for frame in frames]
+
+    def _probe(self, pairs: list[tuple[EncodeJob, InventoryTag]]) -> list[tuple[bytes, bytes, tuple[str, str]]]:
+        """(current PC word, access password to write with, failure) per tag"""
+        zero = bytes(4)
+        found = [[tag.pc, zero, ("", "")] for _, tag in pairs]
+        probes = []
+        for index, (job, tag) in enumerate(pairs):
+            if len(tag.pc) != 2:
+                probes.append((index, "read pc", Reader._read_memory_frame(
+                    tag.epc, InventoryMemoryBank.EPC.value, PC_WORD, 1, zero)))
+            if tag.epc == job.epc and job.lock is not None:
+                # Resumed: the earlier run may or may not have got as far as writing the password
+                probes.append((index, "read password", Reader._read_memory_frame(
+                    tag.epc, InventoryMemoryBank.PASSWORD.value, ACCESS_PASSWORD_WORD, 2, zero)))
+        for (index, name, _), response in zip(probes, self._request([frame for _, _, frame in probes])):
+            if name == "read pc":
+                if response.status == STATUS_SUCCESS:
+                    found[index][0] = bytes(response.data)
+                else:
+                    found[index][2] = (name, _status_error(response))
+            elif response.status != STATUS_SUCCESS or any(response.data):
+                # Written, or the password bank is read-locked under it
+                found[index][1] = pairs[index][0].lock.access_password
+        return [tuple(item) for item in found]
+
+    def _plan(self, job: EncodeJob, tag: InventoryTag, pc: bytes,
+              write_password: bytes) -> tuple[list[_Step], list[_Step]]:
+        """Write and read-back steps, then lock steps"""
+        resumed = tag.epc == job.epc
+        password = job.lock.access_password if job.lock is not None else bytes(4)
+        pc = _pc(job.epc, pc)
+        epc_bank, user_bank = InventoryMemoryBank.EPC.value, InventoryMemoryBank.USER.value
+        writes, reads = [], []
+        if not resumed:
+            writes.append(_Step("write epc", Reader._write_memory_frame(
+                tag.epc, epc_bank, PC_WORD, pc + job.epc, write_password)))
+        reads.append(_Step("verify epc", Reader._read_memory_frame(
+            job.epc, epc_bank, PC_WORD, 1 + len(job.epc) // 2, write_password), pc + job.epc))
+        if job.user_data:
+            writes.append(_Step("write user", Reader._write_memory_frame(
+                job.epc, user_bank, 0, job.user_data, write_password)))
+            reads.append(_Step("verify user", Reader._read_memory_frame(
+                job.epc, user_bank, 0, len(job.user_data) // 2, write_password), job.user_data))
+        locks = []
+        if job.lock is not None:
+            password_bank = InventoryMemoryBank.PASSWORD.value
+            writes.append(_Step("write password", Reader._write_memory_frame(
+                job.epc, password_bank, ACCESS_PASSWORD_WORD, password, write_password)))
+            reads.append(_Step("verify password", Reader._read_memory_frame(
+                job.epc, password_bank, ACCESS_PASSWORD_WORD, 2, password), password))
+            locks = [_Step(f"lock {select}", Reader._lock_frame(job.epc, select, protect, password))
+                     for select, protect in job.lock.locks]
+        return writes + reads, locks
+
+    def _run(self, plans: list[list[_Step]]) -> list[tuple[str, str]]:
+        """(failing step, error) per tag, ("", "") for those that went through"""
+        outcomes = []
+        if self.pipeline:
+            frames = [step.frame for steps in plans for step in steps]
+            responses = iter(self.reader.request_many(frames) if frames else [])
+            for steps in plans:
+                failure = ("", "")
+                for step in steps:
+                    error = _check(step, next(responses))
+                    if error and not failure[1]:
+                        failure = (step.name, error)
+                outcomes.append(failure)
+            return outcomes
+        for steps in plans:
+            failure = ("", "")
+            for step in steps:
+                error = _check(step, self.reader.request_many([step.frame])[0])
+                if error:
+                    failure = (step.name, error)
+                    break
+            outcomes.append(failure)
+        return outcomes
+
+    def _encode_window(self, pairs: list[tuple[EncodeJob, InventoryTag]]) -> list[EncodeResult]:
+        start = perf_counter()
+        try:
+            probes = self._probe(pairs)
+            plans = [self._plan(job, tag, pc, password) if not failure[1] else ([], [])
+                     for (job, tag), (pc, password, failure) in zip(pairs, probes)]
+            outcomes = [probe[2] if probe[2][1] else outcome
+                        for probe, outcome in zip(probes, self._run([writes for writes, _ in plans]))]
+            # Only tags whose data checked out get locked
+            lock_plans = [locks if not failure[1] else [] for (_, locks), failure in zip(plans, outcomes)]
+            for index, failure in enumerate(self._run(lock_plans)):
+                if failure[1]:
+                    outcomes[index] = failure
+        except (TimeoutError, ValueError) as e:
+            # Lost or garbled reply: the window's outcome is unknown, and late
+            # replies would otherwise answer the next window's commands
+            self.reader.drain()
+            outcomes = [("reply", str(e))] * len(pairs)
+        seconds = perf_counter() - start
+        return [EncodeResult(job, tag.epc, tag.tid, not error, step, error, seconds)
+                for (job, tag), (step, error) in zip(pairs, outcomes)]
+
+    def encode(self, jobs: Sequence[EncodeJob]) -> list[EncodeResult]:
+        """Encode the tags in the field; one result per job, in job order"""
+        self.validate(jobs)
+        pairs = self.assign(jobs, self.reader.inventory_with_tid())
+        found = [(job, tag) for job, tag in pairs if tag is not None]
+        results = {}
+        for start in range(0, len(found), self.window):
+            for result in self._encode_window(found[start:start + self.window]):
+                results[result.job.epc] = result
+        return [results.get(job.epc) or EncodeResult(job, b"", b"", False, "select", "no blank tag in the field", 0.0)
+                for job in jobs]
+
+# # Contoh penggunaan
+# reader = Reader(SerialTransport("/dev/ttyUSB0", 57600))
+# profile = LockProfile(access_password=bytes.fromhex("1234ABCD"))
+# jobs = [EncodeJob(bytes.fromhex("300833B2DDD9014000000001"), b"LAB-001\x00", profile),
+#         EncodeJob(bytes.fromhex("300833B2DDD9014000000002"), b"LAB-002\x00", profile)]
+# for result in TagEncoder(reader).encode(jobs):
+#     print(result.job.epc.hex(), result.ok, result.step, result.error, f"{result.seconds * 1000:.1f} ms")
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+import requests
+
+from asset_client import AssetClient
+from asset_replica import AssetReplica, AssetSync, asset_version
+
+
+class _Client:
+    """Backend answering the way AssetClient.changes() reports it"""
+
+    def __init__(self, assets):
+        self.assets = assets
+        self.asked = []
+
+    def changes(self, since=None, cursor=None, limit=1000):
+        self.asked.append(since)
+        chunk = [asset for asset in self.assets if not since or asset.get('updatedAt', '') >= since]
+        return chunk, [], None, False
+
+
+def _asset(n, updated=None, **fields):
+    asset = {'_id': f"id{n}", 'rfidTag': {'epc': f"E{n}", 'uid': f"U{n}"}, 'name': f"Asset {n}",
+             'location': 'Gudang', 'tanggalPendataan': '31/12/2099', **fields}
+    if updated:
+        asset['updatedAt'] = updated
+    return asset
+
+
+def test_watermark_uses_updated_at_only():
+    assert asset_version(_asset(1, '2025-01-01T00:00:00.000Z')) == '2025-01-01T00:00:00.000Z'
+    assert asset_version(_asset(2)) == ''  # tanggalPendataan is another format, never a watermark
+    replica = AssetReplica(":memory:")
+    client = _Client([_asset(1, '2025-01-01T00:00:00.000Z'), _asset(2)])
+    sync = AssetSync(replica, client)
+    sync.full_sync()
+    assert replica.watermark == '2025-01-01T00:00:00.000Z'
+    client.assets.append(_asset(3, '2025-01-02T00:00:00.000Z'))
+    sync.delta_sync()
+    assert client.asked[-1] == '2025-01-01T00:00:00.000Z'
+    assert replica.get("E3") is not None and replica.watermark == '2025-01-02T00:00:00.000Z'
+
+
+def test_put_leaves_sync_metadata_alone():
+    replica = AssetReplica(":memory:")
+    replica.put(_asset(1, '2030-01-01T00:00:00.000Z'))
+    assert replica.get("E1")['name'] == "Asset 1"
+    assert not replica.ready and replica.watermark == ''
+
+    replica.apply([_asset(2, '2025-01-01T00:00:00.000Z')], watermark='2025-01-01T00:00:00.000Z', replace=True)
+    synced_at = replica._meta('synced_at')
+    replica.put(_asset(3, '2030-01-01T00:00:00.000Z', name="Baru"))
+    assert replica._meta('synced_at') == synced_at
+    assert replica.watermark == '2025-01-01T00:00:00.000Z'
+    assert [asset['name'] for asset in replica.search("name", "baru")] == ["Baru"]
+
+
+def test_invalidated_row_is_stale_not_gone():
+    replica = AssetReplica(":memory:")
+    replica.apply([_asset(1, '2025-01-01T00:00:00.000Z', status="Tersedia")], replace=True)
+    replica.invalidate("E1", "U1")
+    assert replica.get("E1") is None  # Looked up again while online
+    assert replica.get("E1", stale=True)['name'] == "Asset 1"
+    assert len(replica.search("name", "asset 1")) == 1 and replica.tag_locations() == [("E1", "Gudang", "Asset 1")]
+    replica.put(_asset(1, '2025-01-02T00:00:00.000Z', status="Dipinjam"))
+    assert replica.get("E1")['status'] == "Dipinjam"
+    replica.invalidate(uid="U1")
+    replica.apply([_asset(1, '2025-01-03T00:00:00.000Z', status="Tersedia")])
+    assert replica.get("E1")['status'] == "Tersedia"
+
+
+class _Session:
+    """Backend stand-in for AssetClient: raises ``error`` or answers ``status``"""
+
+    def __init__(self, error=None, status=200, assets=()):
+        self.error, self.status, self.assets = error, status, list(assets)
+
+    def post(self, url, **kwargs):
+        if self.error is not None:
+            raise self.error
+        response = requests.Response()
+        response.status_code = self.status
+        response._content = json.dumps({'assets': self.assets}).encode()
+        return response
+
+
+def test_offline_lookup_falls_back_to_stale_rows():
+    replica = AssetReplica(":memory:")
+    replica.apply([_asset(1, '2025-01-01T00:00:00.000Z'), _asset(2, '2025-01-01T00:00:00.000Z')], replace=True)
+    replica.invalidate("E1")  # Just borrowed
+    client = AssetClient("http://backend", session=_Session(requests.ConnectionError("offline")), replica=replica)
+    found = client.lookup([{'epc': "E1", 'uid': "U1"}, {'epc': "E2", 'uid': "U2"}, {'epc': "E9"}])
+    assert found["E1"]['name'] == "Asset 1" and found["E2"]['name'] == "Asset 2" and found["E9"] is None
+
+    # Online, the stale row is fetched again and replaced
+    client.session = _Session(assets=[_asset(1, '2025-01-02T00:00:00.000Z', status="Dipinjam")])
+    assert client.lookup([{'epc': "E1", 'uid': "U1"}])["E1"]['status'] == "Dipinjam"
+    assert replica.get("E1")['status'] == "Dipinjam"
+
+
+def test_backend_error_is_not_offline():
+    replica = AssetReplica(":memory:")
+    replica.apply([_asset(1, '2025-01-01T00:00:00.000Z')], replace=True)
+    client = AssetClient("http://backend", session=_Session(status=500), replica=replica)
+    with pytest.raises(requests.HTTPError):
+        client.lookup([{'epc': "E9"}])
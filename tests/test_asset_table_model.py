@@ -0,0 +1,46 @@
+from PyQt6.QtCore import Qt
+
+from asset_table_model import (AssetTableModel, ASSET_COLUMNS, NAME_COLUMN, PRICE_COLUMN, QUANTITY_COLUMN,
+                               asset_row)
+
+NULL_ASSET = {'_id': 'a1', 'name': None, 'rfidTag': None, 'kategori': None, 'status': None, 'jumlah': None,
+              'unit': None, 'price': None, 'tanggalPembelian': None, 'location': None,
+              'masaGaransi': {'from': None, 'to': '2026-01-01'}}
+
+
+def _assets():
+    return [NULL_ASSET,
+            {'_id': 'a2', 'name': 'Laptop', 'rfidTag': {'uid': 'E2 80'}, 'location': 'Gudang', 'price': 1500,
+             'jumlah': 3},
+            {'_id': 'a3', 'name': 'Meja', 'location': None, 'price': '250', 'jumlah': 'x'}]
+
+
+def test_null_fields_become_empty_text():
+    row = asset_row(NULL_ASSET)
+    assert len(row) == len(ASSET_COLUMNS)
+    assert all(isinstance(value, str) for value in row)
+    assert row[NAME_COLUMN] == "" and row[PRICE_COLUMN] == "Rp 0"
+
+
+def test_set_assets_and_sort_with_nulls():
+    model = AssetTableModel()
+    model.set_assets(_assets())
+    assert model.rowCount() == 3
+    assert "laptop" in model.search_text(model.row_of('a2'))
+    for column in range(len(ASSET_COLUMNS)):
+        for order in (Qt.SortOrder.AscendingOrder, Qt.SortOrder.DescendingOrder):
+            model.sort(column, order)
+    model.sort(NAME_COLUMN)
+    assert [model.value(row, 0) for row in range(3)] == ['a1', 'a2', 'a3']
+    model.sort(PRICE_COLUMN, Qt.SortOrder.DescendingOrder)
+    assert [model.value(row, 0) for row in range(3)] == ['a2', 'a3', 'a1']
+
+
+def test_upsert_and_add_with_nulls_while_sorted():
+    model = AssetTableModel()
+    model.sort(QUANTITY_COLUMN)
+    model.add_assets(_assets())
+    model.upsert_asset(dict(NULL_ASSET, _id='a4', location=None))
+    model.upsert_asset(dict(NULL_ASSET, name='Kursi'))
+    assert model.rowCount() == 4
+    assert model.value(model.row_of('a1'), NAME_COLUMN) == 'Kursi'
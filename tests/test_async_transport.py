@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from async_transport import AsyncSerialTransport
+from command import CMD_GET_WORK_MODE, fixed_frame
+from response import Response, STATUS_SUCCESS
+from simulator import ReaderSimulator, SimulatedTransport, SimulatorPty
+
+
+@pytest.fixture
+def pty_device():
+    try:
+        pty = SimulatorPty(SimulatedTransport(ReaderSimulator(), baud_rate=0, latency=0.02))
+    except EnvironmentError as e:
+        pytest.skip(str(e))
+    yield pty.start()
+    pty.stop()
+
+
+@pytest.mark.parametrize("pollable", [True, False], ids=["fd-watch", "reader-thread"])
+def test_idle_timeouts_do_not_eat_replies(pty_device, pollable):
+    async def exchange():
+        transport = AsyncSerialTransport(pty_device, 57600, timeout=0.02, pollable=pollable)
+        try:
+            replies = []
+            for _ in range(5):
+                # Idle reads that time out, as active_frames does between inventory rounds
+                for _ in range(3):
+                    with pytest.raises(TimeoutError):
+                        await transport.read_frames()
+                await transport.write_bytes(fixed_frame(CMD_GET_WORK_MODE))
+                transport.timeout = 1
+                replies.append(Response(await transport.read_frame()))
+                transport.timeout = 0.02
+            return replies
+        finally:
+            await transport.close()
+
+    replies = asyncio.run(exchange())
+    assert [(reply.command, reply.status) for reply in replies] == [(CMD_GET_WORK_MODE, STATUS_SUCCESS)] * 5
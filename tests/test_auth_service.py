@@ -0,0 +1,54 @@
+import subprocess
+import sys
+
+import pytest
+
+from asset_server import AssetStubServer
+from auth_service import AuthError, AuthSessions
+from conftest import ROOT
+
+
+@pytest.fixture
+def server():
+    stub = AssetStubServer([], passwords={"op@example.com": "rahasia"}, token_ttl=3600)
+    stub.api_base = stub.start()
+    yield stub
+    stub.stop()
+
+
+def _sessions(server, **options):
+    return AuthSessions(server.api_base, **options)
+
+
+def test_requests_is_imported_lazily():
+    check = "import sys, auth_service; assert 'requests.adapters' not in sys.modules"
+    subprocess.run([sys.executable, "-c", check], cwd=ROOT, check=True)
+
+
+def test_password_is_not_kept(server):
+    sessions = _sessions(server)
+    data = sessions.login("Op@Example.com ", "rahasia")
+    assert sessions.token("op@example.com") == data['token']
+    operator = sessions._sessions["op@example.com"]
+    assert not any(value == "rahasia" for value in vars(operator).values())
+    assert not any(value == "rahasia" for value in vars(operator.auth).values())
+    assert sessions.login("op@example.com", "rahasia") is operator.auth.login_data
+    with pytest.raises(AuthError):
+        sessions.login("op@example.com", "salah")
+    sessions.stop()
+
+
+def test_refresh_uses_the_refresh_token(server):
+    sessions = _sessions(server, refresh_margin=7200)  # Every token is due
+    token = sessions.login("op@example.com", "rahasia")['token']
+    server.token_ttl = 3601
+    assert sessions.refresh_due() == 1
+    assert server.logins == 1 and server.refreshes == 1
+    assert sessions.token("op@example.com") not in (None, token)
+    # The old refresh token was rotated away; once refused the operator has to log in again
+    server.refresh_tokens.clear()
+    assert sessions.refresh_due() == 0
+    assert sessions.token("op@example.com") is None
+    sessions.login("op@example.com", "rahasia")
+    assert server.logins == 2
+    sessions.stop()
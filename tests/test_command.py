@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from command import (Command, CommandTemplate, fixed_frame, CMD_INVENTORY, CMD_READ_MEMORY, CMD_WRITE_MEMORY,
+                     CMD_WRITE_EPC, CMD_SET_LOCK, CMD_SET_READER_POWER, CMD_GET_WORK_MODE, LOCK_SELECT_EPC,
+                     PROTECT_SECURED)
+from reader import Reader
+from utils import calculate_checksum
+
+RNG = random.Random(11)
+EPC = RNG.randbytes(12)
+PASSWORD = bytes.fromhex("1234ABCD")
+
+
+def _frame(command: int, data: bytes, address: int = 0xFF) -> bytes:
+    body = bytes([4 + len(data), address, command]) + data
+    return body + bytes(calculate_checksum(body))
+
+
+# (command, template parts, field values, the same data laid out by hand)
+TEMPLATED = [
+    (CMD_INVENTORY, [bytes([2, 4])], [], bytes([2, 4])),
+    (CMD_READ_MEMORY, [bytes([6]), 12, bytes([2, 2, 4]), bytes(4)], [EPC],
+     bytes([6]) + EPC + bytes([2, 2, 4]) + bytes(4)),
+    (CMD_WRITE_MEMORY, [bytes([2, 6]), 12, bytes([3, 0]), 4, 4], [EPC, b"\x01\x02\x03\x04", PASSWORD],
+     bytes([2, 6]) + EPC + bytes([3, 0]) + b"\x01\x02\x03\x04" + PASSWORD),
+    (CMD_WRITE_EPC, [bytes([6]), 4, 12], [PASSWORD, EPC], bytes([6]) + PASSWORD + EPC),
+    (CMD_SET_LOCK, [bytes([6]), 12, bytes([LOCK_SELECT_EPC, PROTECT_SECURED]), 4], [EPC, PASSWORD],
+     bytes([6]) + EPC + bytes([LOCK_SELECT_EPC, PROTECT_SECURED]) + PASSWORD),
+    (CMD_SET_READER_POWER, [1], [bytes([30])], bytes([30])),
+    (CMD_GET_WORK_MODE, [], [], b""),
+]
+
+
+@pytest.mark.parametrize("command, parts, values, data", TEMPLATED)
+def test_template_matches_command(command, parts, values, data):
+    template = CommandTemplate(command, parts)
+    assert template.render(*values) == Command(command, data=bytearray(data)).serialize() == _frame(command, data)
+
+
+@pytest.mark.parametrize("command, parts, values, data", TEMPLATED)
+def test_serialize_twice_gives_the_same_frame(command, parts, values, data):
+    request = Command(command, data=bytearray(data))
+    first = request.serialize()
+    assert request.serialize() == first == _frame(command, data)
+    assert bytes(request.base_data) == _frame(command, data)[:-2]  # serialize() leaves base_data alone
+    template = CommandTemplate(command, parts)
+    assert template.render(*values) == template.render(*values)
+
+
+def test_template_renders_many_values():
+    template = Reader._read_memory_template(12, 2, 2, 4, bytes(4))
+    for _ in range(200):
+        epc = RNG.randbytes(12)
+        data = bytes([6]) + epc + bytes([2, 2, 4]) + bytes(4)
+        assert template.render(epc) == _frame(CMD_READ_MEMORY, data)
+
+
+def test_reader_frames_match_command():
+    assert Reader._read_memory_frame(EPC, 2, 2, 4, bytes(4)) == _frame(
+        CMD_READ_MEMORY, bytes([6]) + EPC + bytes([2, 2, 4]) + bytes(4))
+    assert Reader._write_epc_frame(EPC, PASSWORD) == _frame(CMD_WRITE_EPC, bytes([6]) + PASSWORD + EPC)
+    assert Reader._lock_frame(EPC, LOCK_SELECT_EPC, PROTECT_SECURED, PASSWORD) == _frame(
+        CMD_SET_LOCK, bytes([6]) + EPC + bytes([LOCK_SELECT_EPC, PROTECT_SECURED]) + PASSWORD)
+    assert Reader._set_power_frame(30) == fixed_frame(CMD_SET_READER_POWER, bytes([30]))
+    assert fixed_frame(CMD_INVENTORY) is fixed_frame(CMD_INVENTORY)
+
+
+def test_template_rejects_wrong_field_sizes():
+    template = CommandTemplate(CMD_READ_MEMORY, [bytes([6]), 12, bytes([2, 2, 4]), bytes(4)])
+    with pytest.raises(ValueError):
+        template.render(EPC + b"\x00")  # Oversized
+    with pytest.raises(ValueError):
+        template.render(EPC[:-1])
+    with pytest.raises(ValueError):
+        template.render()
+    with pytest.raises(ValueError):
+        template.render(EPC, EPC)
+
+
+def test_command_rejects_frames_too_long_for_the_length_byte():
+    Command(CMD_WRITE_MEMORY, data=bytearray(251)).serialize()  # Length byte 255: the largest frame
+    with pytest.raises(ValueError):
+        Command(CMD_WRITE_MEMORY, data=bytearray(252))
@@ -0,0 +1,81 @@
+import time
+
+import inventory_pipeline
+from inventory_pipeline import SeenWindow, dedupe
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_dedupe_window(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(inventory_pipeline.time, "monotonic", clock)
+
+    def reads():
+        yield b"A"
+        clock.now = 0.5
+        yield b"A"  # Repeat within the window
+        yield b"B"
+        yield None
+        clock.now = 1.4
+        yield b"A"  # 0.9 s after its last sighting: still a repeat
+        clock.now = 2.5
+        yield b"A"
+        yield b"B"
+
+    assert list(dedupe(reads(), window=1.0)) == [b"A", b"B", None, b"A", b"B"]
+
+
+def test_seen_window_evicts_tags_that_left():
+    seen = SeenWindow(1.0)
+    for i in range(1000):
+        assert seen.first_sighting(i.to_bytes(4, "big"), now=i * 0.01)
+    assert len(seen) == 100  # Only the last second's tags
+    seen.expire(now=100.0)
+    assert len(seen) == 0
+
+
+def test_lone_tag_is_batched_within_max_delay():
+    from reader import Reader
+    from simulator import ReaderSimulator, SimulatedTransport, make_population
+
+    reader = Reader(SimulatedTransport(ReaderSimulator(make_population(1, seed=5)), baud_rate=0,
+                                      active_interval=0.5))  # No frames to act as heartbeats
+    inventory = inventory_pipeline.ContinuousInventory(
+        reader, enricher=lambda epc: {'epc': epc.hex(), 'at': time.monotonic()})
+    for tags in inventory.run_batched(max_tags=64, max_delay=0.05):
+        delay = time.monotonic() - tags[0]['at']
+        inventory.stop()
+    # Not held until the next 100 ms heartbeat
+    assert 0.045 <= delay < 0.08, delay
+
+
+def test_reader_error_is_not_masked_by_answer_mode_restore(caplog):
+    import pytest
+    from reader import Reader
+    from response import InventoryWorkMode
+    from simulator import ReaderSimulator, SimulatedTransport, make_population
+
+    reader = Reader(SimulatedTransport(ReaderSimulator(make_population(1, seed=5)), baud_rate=0))
+    set_work_mode = reader.set_work_mode
+
+    def lost_link(stop=None):
+        raise ConnectionError("link lost")
+        yield
+
+    def restore(work_mode):
+        if work_mode.inventory_work_mode == InventoryWorkMode.ANSWER_MODE:
+            raise OSError("port closed")
+        return set_work_mode(work_mode)
+
+    reader.active_frames = lost_link
+    reader.set_work_mode = restore
+    inventory = inventory_pipeline.ContinuousInventory(reader)
+    with pytest.raises(ConnectionError):
+        list(inventory.run())
+    assert "answer mode" in caplog.text
@@ -0,0 +1,57 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt6.QtWidgets import QApplication, QMessageBox
+
+import purchasing_page
+from transaction_queue import Transaction
+
+APP = QApplication.instance() or QApplication([])  # Kept for the whole session; the shared reader lives in it
+
+
+class _Progress:
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def page(monkeypatch):
+    shown = []
+    for kind in ("information", "warning", "critical"):
+        monkeypatch.setattr(QMessageBox, kind, staticmethod(lambda parent, title, text, kind=kind: shown.append(
+            (kind, title, text))))
+    page = purchasing_page.PurchasingPage(None)
+    page.shown = shown
+    page.user_data = {'username': 'op'}
+    page._checkout_progress = _Progress()
+    yield page
+    page.deleteLater()
+    APP.processEvents()
+
+
+def _await(page, status):
+    transaction = Transaction("checkout", {'rfidTags': []})
+    transaction.status = status
+    page._awaited_checkout = transaction.key
+    return transaction
+
+
+def test_queued_checkout_with_bad_prices(page):
+    for index, price in enumerate([None, "abc", "2500", 1000]):
+        page.scanned_assets.add({'name': f"Item {index}", 'price': price, 'rfidTag': {'epc': f"E{index}"}})
+    page._checkout_queued(_await(page, "pending"))
+    assert page.lbl_total.text() == "Total Amount: Rp 3,500"
+    assert [page.checkout_table.item(row, 2).text() for row in range(4)] == ["Rp 0", "Rp 0", "Rp 2,500", "Rp 1,000"]
+    assert page.shown[-1][1] == "Checkout queued"
+
+
+def test_checkout_held_for_login_asks_for_it(page):
+    page._checkout_queued(_await(page, "auth"))
+    assert page.shown[-1][:2] == ("warning", "Login required")
+
+
+def test_backend_summary_with_bad_total(page):
+    page._show_checkout_summary({'username': 'op', 'items': [{'name': 'X', 'price': None}], 'totalAmount': 'n/a'})
+    assert page.lbl_total.text() == "Total Amount: Rp 0"
@@ -0,0 +1,37 @@
+from reader import Reader
+from response import InventoryTag
+from simulator import ReaderSimulator, SimulatedTag, SimulatedTransport, make_population
+
+
+def _pc(epc: bytes) -> bytes:
+    return ((len(epc) // 2) << 11).to_bytes(2, "big")
+
+
+def test_split_tid_uses_pc_for_epc_length():
+    epc, tid = bytes(range(12)), bytes(range(100, 108))
+    blocks = [_pc(epc) + epc + tid, _pc(epc) + epc]
+    pc = _pc(epc)
+    assert list(Reader._split_tid(blocks, 4)) == [InventoryTag(epc=epc, tid=tid, pc=pc), InventoryTag(epc=epc, pc=pc)]
+
+
+def test_split_tid_short_and_partial_blocks():
+    epc = bytes(range(4))
+    # A TID cut short is not a TID; a block shorter than its PC says keeps what it has
+    assert list(Reader._split_tid([_pc(epc) + epc + b"\x01\x02"], 4)) == [InventoryTag(epc=epc, pc=_pc(epc))]
+    assert list(Reader._split_tid([_pc(bytes(12)) + epc], 4)) == [InventoryTag(epc=epc, pc=_pc(bytes(12)))]
+
+
+def test_inventory_with_tid_against_simulator():
+    tags = make_population(30, seed=4) + [SimulatedTag(epc=bytes(range(16)), tid=b"\xE2\x80")]
+    reader = Reader(SimulatedTransport(ReaderSimulator(tags), baud_rate=0))
+    found = {tag.epc: tag.tid for tag in reader.inventory_with_tid()}
+    assert found == {tag.epc: tag.tid[4:12] for tag in tags}
+
+
+def test_inventory_tags_are_hashable():
+    reader = Reader(SimulatedTransport(ReaderSimulator(make_population(5, seed=4)), baud_rate=0))
+    tags = list(reader.inventory_with_tid())
+    assert all(type(value) is bytes for tag in tags for value in (tag.epc, tag.tid, tag.pc))
+    assert len(set(tags)) == 5
+    blocks = [bytearray(_pc(bytes(4)) + bytes(4))]  # Reply buffers are bytearrays
+    assert hash(next(Reader._split_tid(blocks, 4)))
@@ -0,0 +1,150 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from reader import Reader
+from reader_group import ReaderGroup
+from response import hex_readable
+from simulator import ReaderSimulator, SimulatedTransport, make_population
+
+TIMEOUT = 10  # Seconds before a test's group is stopped regardless
+
+
+class _UnpluggedTransport(SimulatedTransport):
+    """Reads fail like a serial port whose cable was pulled, once ``unplug()`` is called"""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.unplugged = threading.Event()
+
+    def unplug(self) -> None:
+        self.unplugged.set()
+
+    def read_available(self, *args, **kwargs) -> bytes:
+        if self.unplugged.is_set():
+            raise ConnectionError("Reader unplugged")
+        return super().read_available(*args, **kwargs)
+
+    def write_bytes(self, buffer: bytes) -> None:
+        if self.unplugged.is_set():
+            raise ConnectionError("Reader unplugged")
+        super().write_bytes(buffer)
+
+
+def _fields(readers: int = 3, tags: int = 12, overlap: int = 4):
+    population = make_population(readers * tags, seed=5)
+    step = tags - overlap
+    return [population[i * step:i * step + tags] for i in range(readers)]
+
+
+def _reader(field, transport_class=SimulatedTransport) -> Reader:
+    return Reader(transport_class(ReaderSimulator(field), baud_rate=0, active_interval=0.01))
+
+
+def _collect(group: ReaderGroup, until) -> list[dict]:
+    watchdog = threading.Timer(TIMEOUT, group.stop)
+    watchdog.start()
+    tags = []
+    try:
+        for tag in group.run():
+            tags.append(tag)
+            if until(tags):
+                group.stop()
+    finally:
+        watchdog.cancel()
+    return tags
+
+
+@pytest.fixture
+def fields():
+    return _fields()
+
+
+def test_tags_seen_by_several_readers_come_out_once(fields):
+    expected = {hex_readable(tag.epc) for field in fields for tag in field}
+    group = ReaderGroup({f"dock-{i}": _reader(field) for i, field in enumerate(fields)}, dedupe_window=60)
+    tags = _collect(group, lambda tags: {tag['epc'] for tag in tags} == expected)
+    epcs = [tag['epc'] for tag in tags]
+    assert set(epcs) == expected
+    assert len(epcs) == len(set(epcs))
+
+
+def test_tags_are_labelled_with_a_reader_that_saw_them(fields):
+    in_field = {f"dock-{i}": {hex_readable(tag.epc) for tag in field} for i, field in enumerate(fields)}
+    expected = set().union(*in_field.values())
+    group = ReaderGroup({name: _reader(field) for name, field in zip(in_field, fields)}, dedupe_window=60)
+    tags = _collect(group, lambda tags: {tag['epc'] for tag in tags} == expected)
+    for tag in tags:
+        assert tag['epc'] in in_field[tag['reader']]
+
+
+def test_stats_per_reader(fields):
+    expected = {hex_readable(tag.epc) for field in fields for tag in field}
+    group = ReaderGroup({f"dock-{i}": _reader(field) for i, field in enumerate(fields)}, dedupe_window=60)
+    tags = _collect(group, lambda tags: {tag['epc'] for tag in tags} == expected)
+    stats = group.stats()
+    assert set(stats) == {"dock-0", "dock-1", "dock-2"}
+    assert sum(reader['first_seen'] for reader in stats.values()) == len(tags)
+    for name, reader in stats.items():
+        assert reader['error'] is None
+        assert reader['frames'] > 0 and reader['tags'] > 0
+        assert reader['first_seen'] == sum(tag['reader'] == name for tag in tags)
+        assert reader['tags_per_second'] > 0
+
+
+def test_reader_that_cannot_start_leaves_the_others_running(fields):
+    broken = _reader(fields[0])
+    broken.transport.close()  # Switching it to active mode fails right away
+    readers = {"broken": broken, "dock-1": _reader(fields[1]), "dock-2": _reader(fields[2])}
+    expected = {hex_readable(tag.epc) for field in fields[1:] for tag in field}
+    group = ReaderGroup(readers, dedupe_window=60)
+    tags = _collect(group, lambda tags: {tag['epc'] for tag in tags} == expected)
+    assert {tag['epc'] for tag in tags} == expected
+    stats = group.stats()
+    assert isinstance(stats["broken"]['error'], ConnectionError)
+    assert stats["broken"]['first_seen'] == 0
+    assert stats["dock-1"]['error'] is None and stats["dock-2"]['error'] is None
+
+
+def test_reader_unplugged_mid_scan_leaves_the_others_running(fields):
+    unplugged = _reader(fields[0], _UnpluggedTransport)
+    readers = {"dock-0": unplugged, "dock-1": _reader(fields[1]), "dock-2": _reader(fields[2])}
+    later = {hex_readable(tag.epc) for tag in fields[2]}
+    group = ReaderGroup(readers, dedupe_window=0)  # Every read comes out, so reads after the unplug show
+
+    marks = []
+
+    def until(tags):
+        if len(tags) == 1:
+            unplugged.transport.unplug()
+        if not marks and group.stats()["dock-0"]['error'] is not None:
+            marks.append(len(tags))  # dock-0 is gone from here on
+        return bool(marks) and later <= {tag['epc'] for tag in tags[marks[0]:]}
+
+    tags = _collect(group, until)
+    stats = group.stats()
+    assert isinstance(stats["dock-0"]['error'], ConnectionError)
+    assert marks and later <= {tag['epc'] for tag in tags[marks[0]:]}
+    assert stats["dock-2"]['error'] is None
+
+
+class _StampingQueue(queue.Queue):
+    """Notes when each tag reached the group"""
+
+    def put(self, item, *args, **kwargs) -> None:
+        if isinstance(item, dict):
+            item['queued_at'] = time.monotonic()
+        super().put(item, *args, **kwargs)
+
+
+def test_lone_tag_is_batched_within_max_delay():
+    reader = Reader(SimulatedTransport(ReaderSimulator(make_population(1, seed=6)), baud_rate=0,
+                                       active_interval=0.5))  # No frames to act as heartbeats
+    group = ReaderGroup({"dock-0": reader})
+    group._queue = _StampingQueue()
+    for tags in group.run_batched(max_tags=64, max_delay=0.05):
+        delay = time.monotonic() - tags[0]['queued_at']
+        group.stop()
+    assert 0.045 <= delay < 0.08, delay
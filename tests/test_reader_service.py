@@ -0,0 +1,44 @@
+import os
+import threading
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QThread
+from PyQt6.QtWidgets import QApplication
+
+from reader import Reader
+from reader_service import ReaderService
+from simulator import ReaderSimulator, SimulatedTransport, make_population
+
+APP = QApplication.instance() or QApplication([])
+
+
+def test_stuck_round_keeps_the_reader_until_it_returns():
+    reader = Reader(SimulatedTransport(ReaderSimulator(make_population(3, seed=2)), baud_rate=0))
+    in_round, release, closed = threading.Event(), threading.Event(), threading.Event()
+    closed_by = []
+
+    def stuck_round():
+        in_round.set()
+        release.wait(5.0)
+        yield from ()
+
+    def close():
+        closed_by.append(QThread.currentThread())
+        closed.set()
+
+    reader.inventory_with_tid = stuck_round
+    reader.close = close
+    service = ReaderService()
+    service.stop_timeout = 0.1
+    assert service.connect_reader("SIM", reader)
+    service.subscribe(with_tid=True).start_scanning()
+    assert in_round.wait(2.0)
+
+    service.disconnect_reader()
+    assert not service.connected and not closed.is_set()  # Not pulled from under the loop
+
+    release.set()
+    assert closed.wait(2.0)
+    assert closed_by == [service]  # The loop's own thread
+    service.shutdown()
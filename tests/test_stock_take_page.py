@@ -0,0 +1,40 @@
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+import asset_replica
+import stock_take_page
+
+APP = QApplication.instance() or QApplication([])  # Kept for the whole session; the shared reader lives in it
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        APP.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+def test_replica_is_read_off_the_gui_thread(monkeypatch):
+    replica = asset_replica.AssetReplica(":memory:")
+    replica.apply([{'_id': str(i), 'name': f"A{i}", 'location': "R1" if i % 2 else "R2", 'rfidTag': {'epc': f"E{i}"}}
+                   for i in range(10)], replace=True)
+    monkeypatch.setattr(stock_take_page, "asset_replica", lambda: replica)
+    with replica._lock:  # As during a full sync: the page must still come up
+        page = stock_take_page.StockTakePage(None)
+        assert page.cb_location.count() == 0
+    assert _wait_for(lambda: page.cb_location.count() == 2)
+
+    page.reader.start_scanning = lambda: None
+    page.cb_location.setCurrentText("R1")
+    with replica._lock:
+        page.toggle_count()
+        assert page.stock_take is None and not page.btn_count.isEnabled()
+    assert _wait_for(lambda: page.stock_take is not None)
+    assert page.stock_take.expected == 5 and page.btn_count.isEnabled()
+    page._stop_count()
+    page.deleteLater()
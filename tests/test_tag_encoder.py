@@ -0,0 +1,82 @@
+from reader import Reader
+from response import InventoryTag
+from simulator import ReaderSimulator, SimulatedTransport, make_population
+from tag_encoder import EncodeJob, LockProfile, TagEncoder
+
+PASSWORD = bytes.fromhex("1234ABCD")
+PROFILE = LockProfile(access_password=PASSWORD)
+
+
+def _jobs(count, lock=PROFILE):
+    return [EncodeJob(bytes.fromhex(f"300833B2DDD90140{i:08X}"), f"AST-{i:04d}".encode(), lock) for i in range(count)]
+
+
+def _encoder(tags, transport_class=SimulatedTransport, **options):
+    transport = transport_class(ReaderSimulator(tags), baud_rate=0, timeout=0.2)
+    return TagEncoder(Reader(transport), **options)
+
+
+def _written(tag, job):
+    return tag.epc == job.epc and bytes(tag.user[:len(job.user_data)]) == job.user_data
+
+
+class _LateReplyTransport(SimulatedTransport):
+    """Holds back the reply to one command until after the host gave up on it"""
+
+    def __init__(self, *args, late_at: int, delay: float = 0.3, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.late_at = late_at
+        self.delay = delay
+        self.scheduled = 0
+
+    def _schedule(self, frames, start):
+        self.scheduled += 1
+        super()._schedule(frames, start + self.delay if self.scheduled == self.late_at else start)
+
+
+def test_pc_flags_are_kept():
+    tags = make_population(3, seed=1)
+    for tag in tags:
+        tag.pc_flags = 0x0401  # UMI and an AFI bit
+    jobs = _jobs(2)
+    encoder = _encoder(tags)
+    assert all(result.ok for result in encoder.encode(jobs[:1]))
+    # Without a PC from the inventory the encoder reads it from the tag first
+    tag = next(tag for tag in tags if tag.epc != jobs[0].epc)
+    [result] = encoder._encode_window([(jobs[1], InventoryTag(epc=tag.epc, tid=tag.tid))])
+    assert result.ok, result
+    by_epc = {tag.epc: tag for tag in tags}
+    for job in jobs:
+        assert _written(by_epc[job.epc], job) and by_epc[job.epc].pc() == bytes([0x30 | 0x04, 0x01])
+
+
+def test_resumed_tag_without_password_is_finished():
+    tags = make_population(2, seed=2)
+    jobs = _jobs(2)
+    # The earlier run wrote the EPC of the first job, then failed before the password
+    tags[0].epc = jobs[0].epc
+    encoder = _encoder(tags)
+    results = encoder.encode(jobs)
+    assert all(result.ok for result in results), results
+    for tag in tags:
+        assert tag.access_password == PASSWORD and tag.protection == dict(PROFILE.locks)
+    # And once more: now the password is on the tags
+    assert all(result.ok for result in encoder.encode(jobs))
+
+
+def test_late_reply_fails_its_window_only():
+    tags = make_population(8, seed=3)
+    jobs = _jobs(8)
+    late = lambda *args, **kwargs: _LateReplyTransport(*args, late_at=3, **kwargs)
+    encoder = _encoder(tags, late, window=4)
+    results = encoder.encode(jobs)
+    assert [result.step for result in results[:4]] == ["reply"] * 4
+    assert all(result.ok for result in results[4:]), results[4:]
+    by_epc = {tag.epc: tag for tag in tags}
+    for result in results[4:]:
+        assert _written(by_epc[result.job.epc], result.job)
+        assert by_epc[result.job.epc].protection == dict(PROFILE.locks)
+    # Nothing in the window whose replies went out of sync was locked
+    assert sum(not tag.protection for tag in tags) == 4
+    assert all(result.ok for result in encoder.encode(jobs))
+    assert all(tag.protection == dict(PROFILE.locks) for tag in tags)
@@ -0,0 +1,227 @@
+import json
+import os
+import stat
+import time
+
+import pytest
+import requests
+
+from asset_server import AssetStubServer, make_assets
+from transaction_queue import TransactionQueue
+
+
+class _Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body if body is not None else {}
+        self.text = json.dumps(self._body)
+
+    def json(self):
+        return self._body
+
+
+class _Backend:
+    """Session stand-in accepting only the tokens in ``valid``"""
+
+    def __init__(self, valid=("good",)):
+        self.valid = set(valid)
+        self.applied = []
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        if headers.get('Authorization') not in {f"Bearer {token}" for token in self.valid}:
+            return _Response(401, {'message': 'Token expired'})
+        if json.get('reject'):
+            return _Response(400, {'message': 'Asset is not available'})
+        self.applied.append((headers['Idempotency-Key'], headers['Authorization']))
+        return _Response(201, {'ok': True})
+
+
+class _Flaky:
+    """Real session to the stub that refuses the first ``refuse`` POSTs and loses the next ``lose`` replies"""
+
+    def __init__(self, refuse=0, lose=0):
+        self.session = requests.Session()
+        self.refuse = refuse
+        self.lose = lose
+        self.posts = []  # (monotonic time, Idempotency-Key, payload)
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        self.posts.append((time.monotonic(), headers['Idempotency-Key'], json))
+        if self.refuse:
+            self.refuse -= 1
+            raise requests.ConnectionError("Connection refused")
+        response = self.session.post(url, headers=headers, json=json, timeout=timeout)
+        if self.lose:
+            self.lose -= 1
+            raise requests.ConnectionError("Connection reset by peer")  # Applied, but the reply never came
+        return response
+
+
+@pytest.fixture
+def stub():
+    server = AssetStubServer(make_assets(10, seed=3))
+    server.api_base = server.start()
+    yield server
+    server.stop()
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _payload(epc, **fields):
+    return {'rfidTags': [{'epc': epc, 'uid': f"U{epc}"}], **fields}
+
+
+def _asset_payload(asset):
+    return {'rfidTags': [{'epc': asset['rfidTag']['epc'], 'uid': asset['rfidTag']['uid']}]}
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+def test_journal_is_private(tmp_path):
+    path = tmp_path / "queue" / "transactions.journal"
+    path.parent.mkdir()
+    path.write_text("")
+    os.chmod(path, 0o644)  # Left by an older version
+    queue = TransactionQueue("http://backend", session=_Backend(), path=str(path))
+    queue.submit("borrow", _payload("E1"), "good")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    queue.close()
+    fresh = tmp_path / "fresh" / "transactions.journal"
+    TransactionQueue("http://backend", session=_Backend(), path=str(fresh)).close()
+    assert stat.S_IMODE(os.stat(fresh).st_mode) == 0o600
+
+
+def test_expired_token_is_held_until_the_operator_has_a_new_one(tmp_path):
+    path = str(tmp_path / "transactions.journal")
+    backend = _Backend(valid=("fresh",))
+    tokens = {"op@example.com": "stale"}
+    settled = []
+    queue = TransactionQueue("http://backend", session=backend, path=path, backoff=0.01,
+                             reauth=tokens.get, reauth_interval=0.05)
+    queue.add_listener("test", settled.append)
+    queue.start()
+    held = queue.submit("borrow", _payload("E1"), "stale", operator="op@example.com")
+    after = queue.submit("return", _payload("E1"), "fresh", operator="op@example.com")  # Same tag: waits
+    other = queue.submit("borrow", _payload("E2"), "fresh", operator="op@example.com")
+    assert _wait_until(lambda: held.status == "auth" and other.status == "sent")
+    time.sleep(0.1)
+    assert held.status == "auth" and after.status == "pending" and settled == [other]
+    queue.close()
+
+    # Still in the journal after a restart, and sent once the operator logs in again
+    queue = TransactionQueue("http://backend", session=backend, path=path, backoff=0.01,
+                             reauth=tokens.get, reauth_interval=0.05)
+    queue.add_listener("test", settled.append)
+    assert [transaction.key for transaction in queue.pending()] == [held.key, after.key]
+    queue.start()
+    assert _wait_until(lambda: queue.pending()[0].status == "auth")
+    tokens["op@example.com"] = "fresh"
+    assert _wait_until(lambda: not queue.pending())
+    assert [key for key, _ in backend.applied] == [other.key, held.key, after.key]
+    assert backend.applied[1][1] == "Bearer fresh"
+    assert all(transaction.replayed and transaction.status == "sent" for transaction in settled[1:])
+    queue.close()
+
+
+def test_replayed_rejection_reaches_listeners_added_before_start(tmp_path):
+    path = str(tmp_path / "transactions.journal")
+    queue = TransactionQueue("http://backend", session=_Backend(), path=path)
+    queue.submit("checkout", _payload("E1", reject=True), "good")
+    queue.close()
+
+    settled = []
+    queue = TransactionQueue("http://backend", session=_Backend(), path=path)
+    queue.add_listener("app", settled.append)
+    queue.start()
+    assert _wait_until(lambda: settled)
+    assert settled[0].replayed and settled[0].status == "rejected" and settled[0].error == "Asset is not available"
+    queue.close()
+
+
+def test_retry_after_a_lost_reply_reuses_the_idempotency_key(tmp_path, stub):
+    session = _Flaky(lose=1)
+    queue = TransactionQueue(stub.api_base, session=session, path=str(tmp_path / "transactions.journal"),
+                             backoff=0.01)
+    queue.start()
+    transaction = queue.submit("borrow", _asset_payload(stub.assets[0]), "token")
+    assert _wait_until(lambda: transaction.status == "sent")
+    assert [key for _, key, _ in session.posts] == [transaction.key, transaction.key]
+    assert stub.transactions_applied == 1 and stub.assets[0]['status'] == "borrowed"
+    queue.close()
+
+
+def test_connection_errors_back_off_exponentially(tmp_path, stub):
+    session = _Flaky(refuse=5)
+    queue = TransactionQueue(stub.api_base, session=session, path=str(tmp_path / "transactions.journal"),
+                             backoff=0.04, max_backoff=0.16)
+    queue.start()
+    transaction = queue.submit("checkout", _asset_payload(stub.assets[0]), "token")
+    assert _wait_until(lambda: transaction.status == "sent")
+    times = [at for at, _, _ in session.posts]
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    assert len(gaps) == 5 and transaction.attempts == 6
+    for failures, gap in enumerate(gaps, 1):
+        delay = min(0.16, 0.04 * 2 ** (failures - 1))
+        assert delay * 0.5 - 0.005 <= gap <= delay + 0.1, (failures, gaps)  # Jittered down to half
+    assert stub.transactions_applied == 1
+    queue.close()
+
+
+def test_replay_keeps_per_tag_order(tmp_path, stub):
+    path = str(tmp_path / "transactions.journal")
+    first, second = stub.assets[:2]
+    queue = TransactionQueue(stub.api_base, session=_Flaky(), path=path)  # Not started: all stay queued
+    kinds = ["borrow", "return", "borrow", "checkout"]
+    submitted = {}
+    for kind in kinds:
+        for asset in (first, second):
+            transaction = queue.submit(kind, _asset_payload(asset), "token")
+            submitted.setdefault(asset['rfidTag']['epc'], []).append(transaction.key)
+    queue.close()
+
+    stub.latency = 0.02  # Keep POSTs in flight long enough to overlap
+    session = _Flaky()
+    queue = TransactionQueue(stub.api_base, session=session, path=path)
+    assert len(queue.pending()) == 8
+    queue.start()
+    assert _wait_until(lambda: not queue.pending())
+    for epc, keys in submitted.items():
+        assert [key for _, key, payload in session.posts if payload['rfidTags'][0]['epc'] == epc] == keys
+    assert first['status'] == second['status'] == "sold"
+    queue.close()
+
+
+def test_journal_is_compacted_once_everything_settled(tmp_path, stub):
+    path = tmp_path / "transactions.journal"
+    queue = TransactionQueue(stub.api_base, session=_Flaky(), path=str(path))
+    queue.start()
+    for asset in stub.assets[:5]:
+        queue.submit("borrow", _asset_payload(asset), "token")
+    assert _wait_until(lambda: not queue.pending())
+    assert _wait_until(lambda: path.stat().st_size == 0)
+    queue.close()
+    assert TransactionQueue(stub.api_base, session=_Flaky(), path=str(path)).pending() == []
+
+
+def test_torn_last_line_is_dropped_on_recovery(tmp_path, stub):
+    path = tmp_path / "transactions.journal"
+    queue = TransactionQueue(stub.api_base, session=_Flaky(), path=str(path))
+    kept = queue.submit("borrow", _asset_payload(stub.assets[0]), "token")
+    queue.close()
+    record = json.dumps({"op": "add", "id": "torn", "kind": "borrow", "payload": _asset_payload(stub.assets[1])})
+    with open(path, "a", encoding="utf-8") as journal:
+        journal.write(record[:len(record) // 2])  # Crash in the middle of an append
+
+    queue = TransactionQueue(stub.api_base, session=_Flaky(), path=str(path))
+    assert [transaction.key for transaction in queue.pending()] == [kept.key]
+    assert [json.loads(line)["id"] for line in path.read_text().splitlines()] == [kept.key]
+    queue.start()
+    assert _wait_until(lambda: not queue.pending())
+    assert stub.transactions_applied == 1 and stub.assets[1]['status'] == "available"
+    queue.close()
@@ -0,0 +1,45 @@
+import pytest
+
+from transport import Transport
+
+
+class _ChunkTransport(Transport):
+    """Delivers the given chunks, one per read"""
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    def read_available(self, max_length=4096, min_length=1):
+        return self.chunks.pop(0) if self.chunks else b""
+
+    def read_bytes(self, length):
+        return self._read_exact(length)  # Built on read_available, as the in-tree transports do
+
+    def write_bytes(self, buffer):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_read_available_has_no_default():
+    class _ExactReads(Transport):
+        def read_bytes(self, length):
+            return self._read_exact(length)
+
+        def write_bytes(self, buffer):
+            pass
+
+        def close(self):
+            pass
+
+    with pytest.raises(TypeError):
+        _ExactReads()  # Used to recurse read_available -> read_bytes -> read_available
+
+
+def test_frames_split_across_reads():
+    transport = _ChunkTransport([b"\x04\x00", b"\x01\x02\x03\x03", b"\x00\x05\x06"])
+    assert transport.read_frame() == b"\x04\x00\x01\x02\x03"
+    assert transport.read_bytes(2) == b"\x03\x00"
+    assert transport.read_frames() == []  # b"\x05\x06" is still short of its frame
+    assert transport.read_frame() is None
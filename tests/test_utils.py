@@ -0,0 +1,68 @@
+import importlib.util
+import os
+import random
+
+import pytest
+
+from conftest import ROOT
+
+
+def _load(path: str, name: str):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# readerRfid/ ships its own copy; both must agree with the reference loop
+MODULES = [_load("utils.py", "utils_root"), _load(os.path.join("readerRfid", "utils.py"), "utils_reader_rfid")]
+
+
+def crc16_bitwise(data: bytes) -> bytearray:
+    """The original bit-loop CRC-16, the reference the table must match"""
+    value = 0xFFFF
+    for d in data:
+        value ^= d
+        for _ in range(8):
+            value = (value >> 1) ^ 0x8408 if value & 0x0001 else (value >> 1)
+    return bytearray([value & 0xFF, value >> 0x08])
+
+
+def _inputs() -> list[bytes]:
+    rng = random.Random(20240601)
+    edge = [b"", b"\x00", b"\xff", bytes(range(256)), b"\xff" * 64, b"\x00" * 64]
+    singles = [bytes([byte]) for byte in range(256)]
+    randoms = [rng.randbytes(rng.randrange(1, 300)) for _ in range(500)]
+    return edge + singles + randoms
+
+
+@pytest.fixture(params=MODULES, ids=["utils", "readerRfid.utils"])
+def utils(request):
+    return request.param
+
+
+def test_table_matches_bit_loop(utils):
+    for data in _inputs():
+        assert utils.calculate_checksum(data) == crc16_bitwise(data), data.hex()
+
+
+def test_empty_input_is_preset(utils):
+    assert utils.calculate_checksum(b"") == bytearray([0xFF, 0xFF])
+
+
+def test_incremental_matches_one_shot(utils):
+    rng = random.Random(7)
+    for data in _inputs():
+        value = utils.crc16_init()
+        cut = rng.randrange(len(data) + 1)
+        value = utils.crc16_update(value, data[:cut])
+        value = utils.crc16_update(value, data[cut:])
+        assert utils.crc16_finalize(value) == crc16_bitwise(data)
+
+
+def test_verify_checksums(utils):
+    frames = [data + bytes(crc16_bitwise(data)) for data in _inputs() if data]
+    assert utils.verify_checksums(frames) == [True] * len(frames)
+    broken = [frame[:-1] + bytes([frame[-1] ^ 0x01]) for frame in frames]
+    assert utils.verify_checksums(broken) == [False] * len(broken)
+    assert utils.verify_checksums([b"", b"\x01", b"\x01\x02"]) == [False, False, False]
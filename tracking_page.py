@@ -5,13 +5,15 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIcon
-import requests
+from api_executor import api_executor
+from asset_replica import asset_replica
 
 class TrackingPage(QWidget):
     def __init__(self, db):
         super().__init__()
         self.db = db
-        self.base_url = "http://localhost:5000/api/assets"
+        self.base_url = api_executor().url("/api/assets")
+        self._search_id = 0
         self.init_ui()
 
     def init_ui(self):
@@ -90,17 +92,42 @@ class TrackingPage(QWidget):
             self.result_table.setSpan(0, 0, 1, self.result_table.columnCount())
             return
 
+        self._search_id += 1
+        search_id = self._search_id
+        api = api_executor()
+
+        def failed(error):
+            if search_id == self._search_id:
+                self.show_error_message(f"Request failed: {str(error)}")
+
+        replica = asset_replica()
+        if replica.ready:  # Answer from the local copy; works offline too
+            def found(assets):
+                if search_id == self._search_id:
+                    self.display_results(assets)
+
+            # Not on the GUI thread: a full sync holds the replica's lock until it is written
+            api.submit(replica.search, criterion, value, on_success=found, on_error=failed)
+            return
+
         url = f"{self.base_url}/track/tags?{criterion}={value}"
 
-        try:
-            response = requests.get(url)
+        def search():
+            response = api.session.get(url, timeout=10)
             if response.status_code == 200:
-                data = response.json()
-                self.display_results(data)
+                return response.status_code, response.json()
+            return response.status_code, response.text
+
+        def done(result):
+            if search_id != self._search_id:  # Drop answers to superseded searches
+                return
+            status_code, body = result
+            if status_code == 200:
+                self.display_results(body)
             else:
-                self.show_error_message(f"Error {response.status_code}: {response.text}")
-        except Exception as e:
-            self.show_error_message(f"Request failed: {str(e)}")
+                self.show_error_message(f"Error {status_code}: {body}")
+
+        api.submit(search, on_success=done, on_error=failed)
 
     def display_results(self, data):
         """Display search results in table format"""
@@ -0,0 +1,369 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from lazy_import import lazy_module
+
+requests = lazy_module("requests")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = os.path.join(os.path.expanduser("~"), ".asset-management", "transactions.journal")
+
+ENDPOINTS = {
+    "borrow": "/api/borrowing/borrow",
+    "return": "/api/borrowing/return",
+    "checkout": "/api/checkout/checkout",
+}
+
+# Answers worth sending again later; any other non-2xx is the backend saying no
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+# The token expired or was revoked: held until its operator has a new one
+AUTH_STATUS = {401, 403}
+
+
+def _private(path: str, flags: int) -> int:
+    """Opener for files holding bearer tokens: readable and writable by the user only"""
+    return os.open(path, flags, 0o600)
+
+
+class Transaction:
+    """One queued borrow, return or checkout; ``key`` doubles as the Idempotency-Key.
+
+    ``operator`` is the email the token belongs to, so a token the backend
+    no longer accepts can be swapped for the operator's current one.
+    ``replayed`` marks transactions loaded from the journal of an earlier run.
+    """
+
+    def __init__(self, kind: str, payload: dict, token: str | None = None, key: str | None = None,
+                 created: float | None = None, operator: str | None = None, replayed: bool = False) -> None:
+        self.kind = kind
+        self.payload = payload
+        self.token = token
+        self.key = key or uuid.uuid4().hex
+        self.created = created or time.time()
+        self.operator = operator
+        self.replayed = replayed
+        self.attempts = 0
+        self.status = "pending"  # -> "sent" | "rejected"; "auth" while waiting for a new login
+        self.status_code: int | None = None
+        self.response = None
+        self.error: str | None = None
+
+    def record(self) -> dict:
+        return {"op": "add", "id": self.key, "kind": self.kind, "payload": self.payload,
+                "token": self.token, "operator": self.operator, "created": self.created}
+
+    def __repr__(self) -> str:
+        return f"Transaction({self.kind!r}, key={self.key!r}, status={self.status!r})"
+
+
+def _independent(queued: list[Transaction], limit: int) -> list[Transaction]:
+    """Up to ``limit`` transactions that share no tag, so their order does not matter.
+
+    A transaction on a tag an earlier one (sendable or waiting for a login)
+    also touches waits for that one, keeping per-tag order.
+    """
+    seen: set[str] = set()
+    run = []
+    for transaction in queued:
+        if len(run) == limit:
+            break
+        tags = {value for tag in transaction.payload.get('rfidTags', [])
+                for value in (tag.get('epc'), tag.get('uid')) if value}
+        if not tags & seen and transaction.status == "pending":
+            run.append(transaction)
+        seen |= tags
+    return run
+
+
+class TransactionQueue:
+    """Durable outbound queue for borrow, return and checkout requests.
+
+    ``submit()`` appends the transaction to an append-only JSON-lines journal
+    and returns once it is on disk; the POST happens on a background thread.
+    Appends racing each other share one fsync (group commit). The backend
+    takes one transaction per POST, so a flush sends the queued ones that
+    touch different tags concurrently (up to ``max_workers``) and records
+    their completions with one fsync; a transaction on a tag still in
+    flight waits for the next flush, keeping per-tag order. Each POST
+    carries the transaction's ``Idempotency-Key`` header, so a retried POST
+    that did reach the backend is not applied twice. Network errors and
+    408/429/5xx answers are retried with exponential backoff (jittered, up
+    to ``max_backoff`` seconds). A 401/403 means the token is no longer
+    good, not that the backend refused the transaction: it is resent with
+    the token ``reauth(operator)`` returns once that differs, and held in
+    the journal until then (checked every ``reauth_interval`` seconds and
+    on each submit). Any other answer settles the transaction as "sent" or
+    "rejected". On start the journal is replayed, so what was queued before
+    a crash or while offline is sent once the backend is back. The bearer
+    token goes into the journal with the payload, so the journal is
+    readable by the user only; passwords never go in it.
+    """
+
+    def __init__(self, api_base: str, session=None, path: str = DEFAULT_JOURNAL_PATH, batch_size: int = 32,
+                 max_workers: int = 4, timeout: float = 10, backoff: float = 1.0,
+                 max_backoff: float = 60.0, reauth: Callable[[str], str | None] | None = None,
+                 reauth_interval: float = 30.0) -> None:
+        self.api_base = api_base
+        self.session = session if session is not None else requests.Session()
+        self.path = path
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.reauth = reauth
+        self.reauth_interval = reauth_interval
+        self.fsyncs = 0
+        self.last_error: str | None = None
+        self._pending: list[Transaction] = []
+        self._listeners: dict[str, Callable[[Transaction], None]] = {}
+        self._lock = threading.Lock()  # Journal writes and the pending list
+        self._sync_lock = threading.Lock()  # One fsync at a time; waiters piggyback on it
+        self._written = 0
+        self._synced = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
+        self._replay()
+        self._journal = open(path, "a", encoding="utf-8", opener=_private)
+
+    def _replay(self) -> None:
+        """Load unsettled transactions and rewrite the journal with only those"""
+        pending: dict[str, Transaction] = {}
+        try:
+            with open(self.path, encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line from a crash mid-append
+                    if record["op"] == "add":
+                        pending[record["id"]] = Transaction(record["kind"], record["payload"], record.get("token"),
+                                                            record["id"], record.get("created"),
+                                                            record.get("operator"), replayed=True)
+                    elif record["op"] == "token":
+                        if record["id"] in pending:
+                            pending[record["id"]].token = record["token"]
+                    else:
+                        pending.pop(record["id"], None)
+        except FileNotFoundError:
+            pass
+        self._pending = list(pending.values())
+        self._rewrite()
+
+    def _rewrite(self) -> None:
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8", opener=_private) as journal:
+            os.chmod(temporary, 0o600)  # Left over from a crash with other permissions
+            for transaction in self._pending:
+                journal.write(json.dumps(transaction.record()) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(temporary, self.path)
+
+    def _append(self, records: list[dict], transaction: Transaction | None = None) -> None:
+        """Write records and return once they are durable"""
+        with self._lock:
+            self._journal.write("".join(json.dumps(record) + "\n" for record in records))
+            if transaction is not None:
+                # Queued under the same lock, so compaction cannot drop its record
+                self._pending.append(transaction)
+            self._written += 1
+            sequence = self._written
+        with self._sync_lock:
+            if self._synced >= sequence:
+                return  # Another thread's fsync already covered our write
+            with self._lock:
+                self._journal.flush()
+                target = self._written
+            os.fsync(self._journal.fileno())
+            self.fsyncs += 1
+            self._synced = target
+
+    def submit(self, kind: str, payload: dict, token: str | None = None,
+               operator: str | None = None) -> Transaction:
+        if kind not in ENDPOINTS:
+            raise ValueError(f"Unknown transaction kind: {kind}")
+        transaction = Transaction(kind, payload, token, operator=operator)
+        self._append([transaction.record()], transaction)
+        self._wake.set()
+        return transaction
+
+    def pending(self) -> list[Transaction]:
+        with self._lock:
+            return list(self._pending)
+
+    def add_listener(self, name: str, callback: Callable[[Transaction], None]) -> None:
+        """Call ``callback(transaction)`` from the flush thread whenever one settles"""
+        self._listeners[name] = callback
+
+    def remove_listener(self, name: str) -> None:
+        self._listeners.pop(name, None)
+
+    def _renew(self, transaction: Transaction) -> bool:
+        """Swap in the operator's current token if it is a new one; True when it was"""
+        token = self.reauth(transaction.operator) if self.reauth is not None and transaction.operator else None
+        if not token or token == transaction.token:
+            return False
+        self._append([{"op": "token", "id": transaction.key, "token": token}])
+        transaction.token, transaction.status = token, "pending"
+        return True
+
+    def _send(self, transaction: Transaction) -> bool:
+        """POST one transaction; False when it should be tried again later"""
+        transaction.attempts += 1
+        headers = {'Content-Type': 'application/json', 'Idempotency-Key': transaction.key}
+        if transaction.token:
+            headers['Authorization'] = f'Bearer {transaction.token}'
+        try:
+            response = self.session.post(f"{self.api_base}{ENDPOINTS[transaction.kind]}", headers=headers,
+                                         json=transaction.payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            transaction.error = self.last_error = str(e)
+            return False
+        if response.status_code in RETRY_STATUS:
+            transaction.error = self.last_error = f"HTTP {response.status_code}"
+            return False
+        if response.status_code in AUTH_STATUS:
+            transaction.error = self.last_error = f"HTTP {response.status_code}"
+            if self._renew(transaction):
+                return False
+            logger.warning("%s %s waits for %s to log in again", transaction.kind, transaction.key,
+                           transaction.operator or "its operator")
+            transaction.status = "auth"
+            return True  # Nothing to retry until the token changes
+        transaction.status_code = response.status_code
+        try:
+            transaction.response = response.json()
+        except ValueError:
+            transaction.response = response.text
+        if 200 <= response.status_code < 300:
+            transaction.status, transaction.error = "sent", None
+        else:
+            transaction.status = "rejected"
+            message = transaction.response.get('message') if isinstance(transaction.response, dict) else None
+            transaction.error = message or f"HTTP {response.status_code}"
+        return True
+
+    def flush(self) -> bool:
+        """Send the next batch of queued transactions; False if one of them must be retried"""
+        with self._lock:
+            batch = _independent(self._pending, self.batch_size)
+        if not batch or self._stop.is_set():
+            return not batch
+        if len(batch) == 1:
+            delivered = [self._send(batch[0])]
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="transaction")
+            delivered = list(self._executor.map(self._send, batch))
+        settled = [transaction for transaction, sent in zip(batch, delivered) if sent and transaction.status != "auth"]
+        if settled:
+            self._append([{"op": "done", "id": transaction.key, "status": transaction.status,
+                           "code": transaction.status_code} for transaction in settled])
+            keys = {transaction.key for transaction in settled}
+            with self._lock:
+                self._pending = [transaction for transaction in self._pending if transaction.key not in keys]
+                if not self._pending:
+                    self._compact()
+            for transaction in settled:
+                for callback in list(self._listeners.values()):
+                    try:
+                        callback(transaction)
+                    except Exception:
+                        logger.exception("Transaction listener failed")
+        return all(delivered)
+
+    def _compact(self) -> None:
+        # Called with _lock held and nothing pending: the journal can start over
+        if self._journal.tell() > 0:
+            self._journal.truncate(0)
+            self._journal.flush()
+
+    def _run(self) -> None:
+        failures = 0
+        while not self._stop.is_set():
+            queued = self.pending()
+            for transaction in queued:
+                if transaction.status == "auth":
+                    self._renew(transaction)
+            if not _independent(queued, 1):
+                # Empty, or everything waits (on its tags) for an operator to log in again
+                self._wake.wait(self.reauth_interval if queued else None)
+                self._wake.clear()
+                continue
+            if self.flush():
+                failures = 0
+                continue
+            failures += 1
+            delay = min(self.max_backoff, self.backoff * 2 ** (failures - 1))
+            self._stop.wait(delay * random.uniform(0.5, 1.0))
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="transaction-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        """Stop sending; whatever is still queued stays in the journal for next time"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def close(self, timeout: float = 5) -> None:
+        self.stop(timeout)
+        if self._thread is not None and self._thread.is_alive():
+            return  # Still inside a POST; its transaction is resent (same key) next start
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        with self._lock:
+            self._journal.close()
+
+
+_shared: TransactionQueue | None = None
+
+
+def _current_token(operator: str) -> str | None:
+    from auth_service import auth_sessions
+    return auth_sessions().token(operator)
+
+
+def transaction_queue(start: bool = True) -> TransactionQueue:
+    """The queue shared by all pages, sending through the API executor's session.
+
+    Tokens the backend turned down are renewed from the shared operator
+    sessions. ``start=False`` leaves the sending thread off, so listeners can
+    be added before the replayed transactions go out.
+    """
+    global _shared
+    if _shared is None:
+        from api_executor import api_executor
+        _shared = TransactionQueue(api_executor().api_base, session=api_executor().session, reauth=_current_token)
+    if start:
+        _shared.start()
+    return _shared
+
+
+def shutdown_transaction_queue() -> None:
+    if _shared is not None:
+        _shared.close(timeout=1)  # Don't hold up the window closing for a slow backend
+
+# # Contoh penggunaan
+# queue = TransactionQueue("http://localhost:5000")
+# queue.add_listener("log", lambda t: print(t.kind, t.status, t.error))
+# queue.start()
+# queue.submit("borrow", {"rfidTags": [{"uid": "...", "epc": "..."}], "returnDate": "2025-01-31"}, token,
+#              operator="operator@example.com")
+# # submit() kembali setelah tercatat di journal; POST dikirim di background
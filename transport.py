@@ -6,7 +6,65 @@ import serial
 T = TypeVar('T', bound='Parent')
  
  
+RECEIVE_CHUNK_SIZE: int = 4096
+MIN_FRAME_LENGTH: int = 4  # Len byte of the shortest frame: Adr, Cmd, CRC-16
+ 
+ 
+class ReceiveBuffer:
+    """Accumulates raw received bytes and splits them into complete frames.
+
+    Bytes are consumed from the front of a single bytearray, which CPython
+    handles without moving the remaining data on every frame, so it behaves
+    like a ring buffer without a fixed capacity.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def feed(self, data: bytes) -> None:
+        self._buffer.extend(data)
+
+    def take(self, length: int) -> bytes:
+        data = bytes(self._buffer[:length])
+        del self._buffer[:length]
+        return data
+
+    def pop_frame(self) -> bytearray | None:
+        buffer = self._buffer
+        # Drop bytes that cannot start a frame so a corrupted stream resyncs
+        while buffer and buffer[0] < MIN_FRAME_LENGTH:
+            del buffer[0]
+        if not buffer or len(buffer) < buffer[0] + 1:
+            return None
+        frame_size = buffer[0] + 1
+        frame = buffer[:frame_size]
+        del buffer[:frame_size]
+        return frame
+
+    def pop_frames(self) -> list[bytearray]:
+        frames = []
+        frame = self.pop_frame()
+        while frame is not None:
+            frames.append(frame)
+            frame = self.pop_frame()
+        return frames
+
+    def missing(self) -> int:
+        """Bytes still needed to complete the frame at the head of the buffer."""
+        if not self._buffer:
+            return 1
+        return max(self._buffer[0] + 1 - len(self._buffer), 1)
+
+    def clear(self) -> None:
+        self._buffer.clear()
+ 
+ 
 class Transport(ABC):
+    _receive_buffer: ReceiveBuffer | None = None
+
     @abstractmethod
     def read_bytes(self, length: int) -> bytes:
         raise NotImplementedError
@@ -14,14 +72,54 @@ class Transport(ABC):
     @abstractmethod
     def write_bytes(self, buffer: bytes) -> None:
         raise NotImplementedError
+
+    @property
+    def receive_buffer(self) -> ReceiveBuffer:
+        if self._receive_buffer is None:
+            self._receive_buffer = ReceiveBuffer()
+        return self._receive_buffer
+
+    @abstractmethod
+    def read_available(self, max_length: int = RECEIVE_CHUNK_SIZE, min_length: int = 1) -> bytes:
+        """Return whatever one read can deliver, or b"" on timeout.
+
+        ``min_length`` is a hint for transports that can block until a known
+        number of bytes arrived. The frame readers are built on this, so it
+        must read from the device itself, never through ``read_bytes()``.
+        """
+        raise NotImplementedError
+
+    def _read_exact(self, length: int) -> bytes:
+        # Partial data stays buffered on timeout instead of being returned short
+        buffer = self.receive_buffer
+        while len(buffer) < length:
+            chunk = self.read_available(RECEIVE_CHUNK_SIZE, length - len(buffer))
+            if not chunk:
+                return b""
+            buffer.feed(chunk)
+        return buffer.take(length)
  
     def read_frame(self) -> bytes | None:
-        length_bytes = self.read_bytes(1)
-        if not length_bytes:
-            return
-        frame_length = ord(chr(length_bytes[0]))
-        data = length_bytes + self.read_bytes(frame_length)
-        return bytearray(data)
+        buffer = self.receive_buffer
+        frame = buffer.pop_frame()
+        while frame is None:
+            chunk = self.read_available(RECEIVE_CHUNK_SIZE, buffer.missing())
+            if not chunk:
+                return
+            buffer.feed(chunk)
+            frame = buffer.pop_frame()
+        return frame
+
+    def read_frames(self) -> list[bytearray]:
+        """Return every complete frame buffered after at most one read."""
+        buffer = self.receive_buffer
+        frames = buffer.pop_frames()
+        if frames:
+            return frames
+        chunk = self.read_available(RECEIVE_CHUNK_SIZE, buffer.missing())
+        if chunk:
+            buffer.feed(chunk)
+        return buffer.pop_frames()
  
     @abstractmethod
     def close(self) -> None:
@@ -33,9 +131,21 @@ class TcpTransport(Transport):
         self.socket = socket(AF_INET, SOCK_STREAM)
         self.socket.settimeout(timeout)
         self.socket.connect((ip_address, port))
+        self._receive_buffer = ReceiveBuffer()
+        self._chunk = memoryview(bytearray(RECEIVE_CHUNK_SIZE))
  
     def read_bytes(self, length: int) -> bytes:
-        return self.socket.recv(length)
+        return self._read_exact(length)
+
+    def read_available(self, max_length: int = RECEIVE_CHUNK_SIZE, min_length: int = 1) -> bytes:
+        # The returned view is only valid until the next read
+        try:
+            received = self.socket.recv_into(self._chunk, min(max_length, len(self._chunk)))
+        except TimeoutError:
+            return b""
+        if received == 0:
+            raise ConnectionError("Connection closed by reader")
+        return self._chunk[:received]
  
     def write_bytes(self, buffer: bytes) -> None:
         self.socket.sendall(buffer)
@@ -48,9 +158,16 @@ class SerialTransport(Transport):
     def __init__(self, serial_port: str, baud_rate: int, timeout: int = 1) -> None:
         self.serial = serial.Serial(serial_port, baud_rate,
                                     timeout=timeout, write_timeout=timeout)
+        self._receive_buffer = ReceiveBuffer()
  
     def read_bytes(self, length: int) -> bytes:
-        return self.serial.read(length)
+        return self._read_exact(length)
+
+    def read_available(self, max_length: int = RECEIVE_CHUNK_SIZE, min_length: int = 1) -> bytes:
+        # Block only for the bytes the current frame still needs, then take
+        # everything else that is already queued in the same read
+        waiting = self.serial.in_waiting
+        return self.serial.read(min(max(waiting, min_length), max_length))
  
     def write_bytes(self, buffer: bytes) -> None:
         self.serial.write(buffer)